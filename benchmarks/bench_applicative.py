@@ -0,0 +1,43 @@
+import time
+
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.semantics import beta_reduce_applicative_order
+from lambda_calculus.encodings import PLUS, MULT, church_numeral
+
+
+def independent_redexes(n):
+    # g ((λx.x) a) ((λx.x) a) ... — n unrelated redexes along a long spine,
+    # so each contraction is O(1) once the engine stops searching from the root.
+    identity = Abstraction("x", Variable("x"))
+    expr = Variable("g")
+    for _ in range(n):
+        expr = Application(expr, Application(identity, Variable("a")))
+    return expr
+
+
+def workloads():
+    for n in (250, 500, 1000, 2000, 4000):
+        yield f"{n} redexes", independent_redexes(n)
+
+    for n in (100, 200, 400, 800, 1600):
+        yield f"numeral {n}", church_numeral(n)
+
+    for n in (10, 20, 40, 80):
+        yield f"PLUS {n} {n}", Application(Application(PLUS, church_numeral(n)), church_numeral(n))
+
+    for n in (5, 10, 20, 40):
+        yield f"MULT {n} {n}", Application(Application(MULT, church_numeral(n)), church_numeral(n))
+
+
+def main():
+    print(f"{'workload':<22}{'steps':>8}{'total s':>12}{'µs/step':>12}")
+    for name, expr in workloads():
+        start = time.perf_counter()
+        _, steps, _ = beta_reduce_applicative_order(expr, max_steps=10**6)
+        elapsed = time.perf_counter() - start
+        per_step = elapsed / steps * 1e6 if steps else 0.0
+        print(f"{name:<22}{steps:>8}{elapsed:>12.4f}{per_step:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
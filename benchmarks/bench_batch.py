@@ -0,0 +1,70 @@
+import pickle
+import sys
+import time
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import PLUS, MULT, church_numeral
+from lambda_calculus.serialize import dumps, loads
+from lambda_calculus.batch import evaluate_batch
+
+
+def measure_transfer(label, expr, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = dumps(expr)
+    encode = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        loads(data)
+    decode = (time.perf_counter() - start) / repeat
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pickled = pickle.dumps(expr)
+    pickle_encode = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(pickled)
+    pickle_decode = (time.perf_counter() - start) / repeat
+
+    print(f"{label:<20}{len(data):>10}{encode * 1e3:>9.2f}{decode * 1e3:>9.2f}"
+          f"{len(pickled):>10}{pickle_encode * 1e3:>9.2f}{pickle_decode * 1e3:>9.2f}")
+
+
+def corpus(size):
+    for i in range(size):
+        m, n = i % 7, (i * 3) % 5
+        op = PLUS if i % 2 else MULT
+        yield Application(Application(op, church_numeral(m)), church_numeral(n))
+
+
+def main():
+    print("serialized size (bytes) and time (ms): compact format vs pickle")
+    print(f"{'term':<20}{'bytes':>10}{'enc':>9}{'dec':>9}{'pickle':>10}{'enc':>9}{'dec':>9}")
+    measure_transfer("numeral 100", church_numeral(100))
+    measure_transfer("numeral 1000", church_numeral(1000))
+    result, _, _ = reduce_to_normal_form(
+        Application(Application(MULT, church_numeral(30)), church_numeral(30)), "machine", 10**6)
+    measure_transfer("normal form 900", result)
+
+    print()
+    items = list(corpus(400))
+    start = time.perf_counter()
+    for item in items:
+        reduce_to_normal_form(item)
+    sequential = time.perf_counter() - start
+
+    for workers in (1, 2, 4):
+        start = time.perf_counter()
+        results = list(evaluate_batch(items, workers=workers))
+        elapsed = time.perf_counter() - start
+        compute = sum(result.elapsed for result in results)
+        print(f"{workers} worker(s): {elapsed:.3f} s wall, {compute:.3f} s in workers, "
+              f"{elapsed - compute / workers:.3f} s transfer/scheduling overhead "
+              f"(sequential in-process: {sequential:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import time
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.semantics import beta_reduce_normal_order
+from lambda_calculus.compiler import normalize
+from lambda_calculus.encodings import MULT, POW, PRED, church_numeral, extract_church_numeral
+
+
+def _apply(*terms):
+    expr = terms[0]
+    for term in terms[1:]:
+        expr = Application(expr, term)
+    return expr
+
+
+def workloads():
+    for m, n in ((4, 4), (8, 8), (12, 12), (16, 16)):
+        yield f"MULT {m} {n}", _apply(MULT, church_numeral(m), church_numeral(n)), m * n
+    for b, e in ((2, 3), (2, 4), (3, 3), (2, 6)):
+        yield f"POW {b} {e}", _apply(POW, church_numeral(b), church_numeral(e)), b ** e
+    for n in (10, 20, 40, 80):
+        yield f"PRED {n}", _apply(PRED, church_numeral(n)), n - 1
+
+
+def best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(repeat=3):
+    print(f"{'workload':<14}{'steps':>8}{'normal s':>12}{'compiled s':>12}{'speedup':>10}")
+    for name, expr, expected in workloads():
+        reduced_time, (reduced, steps, _) = best_time(
+            lambda: beta_reduce_normal_order(expr, max_steps=10**6), repeat)
+        compiled_time, compiled = best_time(lambda: normalize(expr), repeat)
+        if extract_church_numeral(reduced) != expected or extract_church_numeral(compiled) != expected:
+            raise AssertionError(f"{name}: expected {expected}")
+        print(f"{name:<14}{steps:>8}{reduced_time:>12.4f}{compiled_time:>12.6f}"
+              f"{reduced_time / compiled_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
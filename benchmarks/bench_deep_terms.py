@@ -0,0 +1,53 @@
+import sys
+import time
+
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.parser import parse
+from lambda_calculus.semantics import beta_reduce_once, is_normal_form
+from lambda_calculus.encodings import church_numeral
+
+
+def nested_source(depth):
+    return "λf.λx." + "f (" * depth + "x" + ")" * depth
+
+
+def redex_chain(depth):
+    # (λy.y) (g (g (... (g z)))) — one redex at the root above a deep spine.
+    body = Variable("z")
+    for _ in range(depth):
+        body = Application(Variable("g"), body)
+    return Application(Abstraction("y", Variable("y")), body)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22}{elapsed:>10.3f} s")
+    return result
+
+
+def run(depth):
+    print(f"depth {depth}")
+    source = nested_source(depth)
+    expr = timed("parse", lambda: parse(source))
+    timed("str", lambda: str(expr))
+    timed("free_variables", lambda: Application(expr, Variable("y")).free_variables())
+    timed("is_normal_form", lambda: is_normal_form(expr))
+    timed("== (copy)", lambda: expr == parse(source))
+    timed("church_numeral", lambda: church_numeral(depth))
+    term = redex_chain(depth)
+    timed("beta step (root)", lambda: beta_reduce_once(term))
+    numeral = church_numeral(depth)
+    timed("beta step (SUCC)", lambda: beta_reduce_once(numeral))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    depths = [int(arg) for arg in argv] or [10**4, 10**5, 10**6]
+    for depth in depths:
+        run(depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import time
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define, expand
+from lambda_calculus.semantics import reduce_to_normal_form
+from benchmarks.suite import _NodeCounter
+
+PROGRAMS = [
+    "PLUS THREE TWO",
+    "SUB (MULT THREE THREE) TWO",
+    "EQ (PLUS ONE TWO) THREE",
+    "HEAD (TAIL (CONS ONE (CONS TWO NIL)))",
+    "IF_THEN_ELSE (IS_ZERO (SUB TWO THREE)) (POW TWO THREE) ZERO",
+]
+
+
+def standard_definitions():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+    return definitions
+
+
+def run(expr, strategy):
+    with _NodeCounter() as counter:
+        start = time.perf_counter()
+        _, steps, _ = reduce_to_normal_form(expr, strategy, max_steps=100000)
+        elapsed = time.perf_counter() - start
+    return steps, counter.count, elapsed
+
+
+def main():
+    definitions = standard_definitions()
+    print(f"{'program':<60}{'strategy':>12}{'size':>14}{'nodes built':>18}{'ms':>16}")
+    print(f"{'':<60}{'':>12}{'eager/lazy':>14}{'eager/lazy':>18}{'eager/lazy':>16}")
+    for source in PROGRAMS:
+        lazy = link(parse(source), definitions)
+        # What pasting every definition into the input used to produce.
+        eager = expand(lazy)
+        for strategy in ("normal", "applicative", "need"):
+            eager_steps, eager_nodes, eager_time = run(eager, strategy)
+            lazy_steps, lazy_nodes, lazy_time = run(lazy, strategy)
+            if eager_steps != lazy_steps and strategy != "need":
+                raise AssertionError(f"{source}: step counts differ ({eager_steps}, {lazy_steps})")
+            print(f"{source:<60}{strategy:>12}"
+                  f"{eager.size():>8}/{lazy.size():<5}"
+                  f"{eager_nodes:>11}/{lazy_nodes:<6}"
+                  f"{eager_time * 1e3:>9.2f}/{lazy_time * 1e3:<6.2f}")
+
+
+if __name__ == "__main__":
+    main()
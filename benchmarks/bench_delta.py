@@ -0,0 +1,56 @@
+import time
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import (
+    TRUE, FALSE, SUCC, PLUS, MULT, POW, PRED, IS_ZERO,
+    church_numeral, extract_church_numeral
+)
+
+
+def apply(*terms):
+    result = terms[0]
+    for term in terms[1:]:
+        result = Application(result, term)
+    return result
+
+
+def check_against_beta(limit=5):
+    is_zero = IS_ZERO.substitute('FALSE', FALSE).substitute('TRUE', TRUE)
+    checked = 0
+    for n in range(limit):
+        cases = [apply(op, church_numeral(n)) for op in (SUCC, PRED, is_zero)]
+        for m in range(limit):
+            cases += [apply(op, church_numeral(m), church_numeral(n)) for op in (PLUS, MULT, POW)]
+        for expr in cases:
+            expected, _, _ = reduce_to_normal_form(expr, "normal", 10**6)
+            actual, _, converged = reduce_to_normal_form(expr, "delta")
+            if not converged or not expected.is_alpha_equivalent(actual):
+                raise AssertionError(f"delta result differs from beta for {expr}: {actual} != {expected}")
+            checked += 1
+    return checked
+
+
+def timed(label, expr, strategy, max_steps=10**7):
+    start = time.perf_counter()
+    result, steps, _ = reduce_to_normal_form(expr, strategy, max_steps)
+    elapsed = time.perf_counter() - start
+    value = extract_church_numeral(result)
+    shown = value if value is None or value.bit_length() < 64 else f"<{value.bit_length()} bits>"
+    print(f"  {label:<28}{strategy:<9}{steps:>9}{elapsed:>10.4f} s  = {shown}")
+
+
+def main():
+    print(f"checked {check_against_beta()} terms against pure β-reduction")
+    for n in (10, 20, 40):
+        expr = apply(MULT, church_numeral(n), church_numeral(n))
+        timed(f"MULT {n} {n}", expr, "normal")
+        timed(f"MULT {n} {n}", expr, "delta")
+    for n in (1000, 100000):
+        expr = apply(PRED, apply(MULT, church_numeral(n), church_numeral(n)))
+        timed(f"PRED (MULT {n} {n})", expr, "delta")
+    timed("POW 3 1000", apply(POW, church_numeral(3), church_numeral(1000)), "delta")
+
+
+if __name__ == "__main__":
+    main()
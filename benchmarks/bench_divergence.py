@@ -0,0 +1,52 @@
+import time
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.limits import evaluate
+from lambda_calculus.encodings import ChurchNumeral
+
+Y = "(λf.(λx.f (x x)) (λx.f (x x)))"
+PROGRAMS = [
+    ("Ω", "(λx.x x) (λx.x x)"),
+    ("Y (λf.λx.f x)", f"{Y} (λf.λx.f x)"),
+    ("Y (λf.λx.f x x) z", f"{Y} (λf.λx.f x x) z"),
+    ("(λx.x x x) (λx.x x x)", "(λx.x x x) (λx.x x x)"),
+    # Programs that terminate, to show what detection costs.
+    ("POW TWO (MULT TWO THREE)", "POW TWO (MULT TWO THREE)"),
+    ("PRED (POW THREE THREE)", "PRED (POW THREE THREE)"),
+    # Its redexes hold chains as long as the numeral.
+    ("PRED 400", f"PRED ({ChurchNumeral(400)})"),
+]
+
+
+def run(expr, max_steps, detect_divergence):
+    # A deadline keeps growing terms from running for minutes without
+    # detection; it is far above what detection needs.
+    start = time.perf_counter()
+    result = evaluate(expr, "normal", max_steps, timeout=10.0,
+                      detect_divergence=detect_divergence)
+    return result, time.perf_counter() - start
+
+
+def main(max_steps=10**5):
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+
+    print(f"{'program':<28}{'plain steps':>12}{'limit':>10}{'ms':>10}"
+          f"{'detect steps':>14}{'limit':>10}{'ms':>10}")
+    for label, source in PROGRAMS:
+        expr = link(parse(source), definitions)
+        plain, plain_time = run(expr, max_steps, False)
+        detected, detected_time = run(expr, max_steps, True)
+        limit = detected.limit
+        if detected.cycle is not None:
+            limit = f"cycle {detected.cycle}"
+        print(f"{label:<28}{plain.steps:>12}{str(plain.limit):>10}{plain_time * 1e3:>10.1f}"
+              f"{detected.steps:>14}{str(limit):>10}{detected_time * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import time
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import church_numeral
+from benchmarks.suite import _NodeCounter
+
+# The last program has a free x and a free f, the names every numeral
+# binds, so substituting into the numerals renames their binders.
+PROGRAMS = [
+    "MULT # #",
+    "POW TWO #",
+    "PRED (MULT # #)",
+    "# (λn.PLUS n n) ONE",
+    "# (λg.λy.g (g y)) f x",
+]
+SIZES = (4, 8)
+STRATEGIES = ("normal", "explicit")
+
+
+def run(expr, strategy):
+    stats = {}
+    with _NodeCounter() as counter:
+        start = time.perf_counter()
+        result, steps, _ = reduce_to_normal_form(expr, strategy, 10**6, stats)
+        elapsed = time.perf_counter() - start
+    # Delayed terms and substitutions are allocations of their own.
+    allocated = counter.count + stats.get('delayed', 0) + stats.get('environments', 0)
+    return result, steps, allocated, elapsed
+
+
+def main():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+
+    print(f"{'program':<26}{'steps':>8}" + "".join(f"{s + ' allocs':>18}{'ms':>9}" for s in STRATEGIES))
+    for source in PROGRAMS:
+        for n in SIZES:
+            label = source.replace("#", str(n))
+            expr = link(parse(source.replace("#", f"({church_numeral(n)})")), definitions)
+            row = ""
+            results = []
+            for strategy in STRATEGIES:
+                result, steps, allocated, elapsed = run(expr, strategy)
+                results.append((result, steps))
+                row += f"{allocated:>18}{elapsed * 1e3:>9.1f}"
+            if len({(str(result), steps) for result, steps in results}) > 1:
+                raise AssertionError(f"{label}: results differ")
+            print(f"{label:<26}{results[0][1]:>8}" + row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import io
+import time
+
+from lambda_calculus.repl import LambdaREPL
+
+# Each session defines a program out of parts, evaluates it, then edits one
+# part and evaluates the program again.
+SESSIONS = [
+    ("pair, edit one side", [
+        "let LEFT POW THREE THREE",
+        "let RIGHT MULT TWO THREE",
+        "let PROGRAM PAIR LEFT RIGHT",
+    ], "let RIGHT MULT THREE THREE"),
+    ("list, edit the last item", [
+        "let A POW TWO FOUR",
+        "let B MULT (POW TWO THREE) THREE",
+        "let C PLUS TWO THREE",
+        "let PROGRAM CONS A (CONS B (CONS C NIL))",
+    ], "let C PLUS THREE THREE"),
+    ("shared helper, edit the helper", [
+        "let BIG POW THREE THREE",
+        "let SQUARE λn.MULT n n",
+        "let PROGRAM PAIR BIG (SQUARE THREE)",
+    ], "let SQUARE λn.PLUS n n"),
+]
+
+
+def session(setup, edit, keep_cache):
+    repl = LambdaREPL()
+    repl.out = io.StringIO()
+    repl.execute("let FOUR SUCC THREE")
+    for line in setup:
+        repl.execute(line)
+    repl.execute("normal PROGRAM")
+    repl.execute(edit)
+    if not keep_cache:
+        repl.cache.clear()
+
+    start = time.perf_counter()
+    repl.execute("normal PROGRAM")
+    elapsed = time.perf_counter() - start
+    return repl.record['result'], repl.record['steps'], elapsed
+
+
+def main():
+    print(f"{'session':<34}{'steps':>8}{'cold ms':>12}{'warm ms':>12}{'speedup':>10}")
+    for name, setup, edit in SESSIONS:
+        cold_result, steps, cold_time = session(setup, edit, keep_cache=False)
+        warm_result, warm_steps, warm_time = session(setup, edit, keep_cache=True)
+        if (warm_result, warm_steps) != (cold_result, steps):
+            raise AssertionError(f"{name}: results differ")
+        print(f"{name:<34}{steps:>8}{cold_time * 1e3:>12.2f}{warm_time * 1e3:>12.2f}"
+              f"{cold_time / warm_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
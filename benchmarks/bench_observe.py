@@ -0,0 +1,77 @@
+import time
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.semantics import reduce_to_normal_form, observe_boolean, observe_numeral
+from lambda_calculus.encodings import extract_church_numeral
+from lambda_calculus.debruijn import to_debruijn
+
+BOOLEANS = [
+    "IS_ZERO (POW TWO THREE)",
+    "LEQ (MULT THREE THREE) (POW TWO THREE)",
+    "EQ (PLUS THREE THREE) (MULT TWO THREE)",
+    "IS_ZERO (SUB (POW TWO THREE) (MULT TWO (PLUS TWO TWO)))",
+    "AND (IS_ZERO (PRED ONE)) (NOT (IS_ZERO (MULT THREE THREE)))",
+    # Not a boolean: the normal form is computed in full to find out.
+    "PAIR (POW THREE THREE) (MULT THREE THREE)",
+]
+NUMERALS = [
+    "PLUS (MULT THREE THREE) TWO",
+    "POW TWO (PLUS TWO TWO)",
+    "PRED (MULT THREE THREE)",
+    "SUB (POW TWO THREE) THREE",
+    "HEAD (TAIL (CONS ONE (CONS (MULT THREE THREE) NIL)))",
+    # Not a numeral.
+    "CONS (POW THREE THREE) NIL",
+]
+
+
+def normal_form_boolean(expr, true, false, max_steps):
+    reduced, steps, _ = reduce_to_normal_form(expr, "normal", max_steps)
+    term = to_debruijn(reduced)
+    return (True if term is true else False if term is false else None), steps
+
+
+def normal_form_numeral(expr, max_steps):
+    reduced, steps, _ = reduce_to_normal_form(expr, "normal", max_steps)
+    return extract_church_numeral(reduced), steps
+
+
+def observed(observe, expr, max_steps):
+    stats = {}
+    value = observe(expr, max_steps, stats)
+    return value, stats['steps']
+
+
+def timed(run):
+    start = time.perf_counter()
+    value, steps = run()
+    return value, steps, time.perf_counter() - start
+
+
+def main(max_steps=10**5):
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+    true = to_debruijn(definitions['TRUE'])
+    false = to_debruijn(definitions['FALSE'])
+
+    print(f"{'program':<58}{'value':>7}{'nf steps':>10}{'ms':>9}{'observe steps':>15}{'ms':>9}")
+    cases = [(source, lambda e: normal_form_boolean(e, true, false, max_steps), observe_boolean)
+             for source in BOOLEANS]
+    cases += [(source, lambda e: normal_form_numeral(e, max_steps), observe_numeral)
+              for source in NUMERALS]
+    for source, full, observe in cases:
+        expr = link(parse(source), definitions)
+        value, steps, elapsed = timed(lambda: full(expr))
+        seen, seen_steps, seen_elapsed = timed(lambda: observed(observe, expr, max_steps))
+        if seen != value:
+            raise AssertionError(f"{source}: observed {seen}, normal form gives {value}")
+        print(f"{source:<58}{str(value):>7}{steps:>10}{elapsed * 1e3:>9.1f}"
+              f"{seen_steps:>15}{seen_elapsed * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import time
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import church_numeral
+
+# Each family applies n copies of the doubling combinator, so it performs
+# 2^n applications of its base function. The copies of the composed
+# function are shared under their λs only by optimal reduction.
+FAMILIES = [
+    ("n TWO (λx.x) y", "{n} TWO (λx.x) y"),
+    ("n TWICE NOT TRUE", "{n} (λf.λx.f (f x)) NOT TRUE"),
+]
+SIZES = (4, 8, 12, 16, 20)
+STRATEGIES = ("normal", "need", "optimal")
+
+
+def main(max_steps=10**5):
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+
+    print(f"{'program':<20}{'n':>4}" + "".join(f"{s + ' steps':>16}{'ms':>10}" for s in STRATEGIES))
+    for label, source in FAMILIES:
+        # A strategy that runs out of steps is not tried on larger sizes.
+        exhausted = set()
+        for n in SIZES:
+            expr = link(parse(source.format(n=f"({church_numeral(n)})")), definitions)
+            row = f"{label:<20}{n:>4}"
+            results = {}
+            for strategy in STRATEGIES:
+                if strategy in exhausted:
+                    row += f"{'-':>16}{'-':>10}"
+                    continue
+                start = time.perf_counter()
+                result, steps, converged = reduce_to_normal_form(expr, strategy, max_steps)
+                elapsed = time.perf_counter() - start
+                if not converged:
+                    exhausted.add(strategy)
+                    row += f"{'> ' + str(max_steps):>16}{elapsed * 1e3:>10.1f}"
+                    continue
+                results[strategy] = result
+                row += f"{steps:>16}{elapsed * 1e3:>10.1f}"
+            if len({str(result) for result in results.values()}) > 1:
+                raise AssertionError(f"{label}, n={n}: normal forms differ")
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import io
+import sys
+import time
+
+from lambda_calculus.parser import parse, iter_definitions
+
+
+def generated_program(definitions, width):
+    lines = []
+    for i in range(definitions):
+        body = " ".join(f"(λx{j}.x{j} D{i - 1 if i else 0})" for j in range(width))
+        lines.append(f"D{i} = λf.λx.f ({body}) x;\n")
+    return "".join(lines)
+
+
+def generated_expression(width):
+    return " ".join(f"(λx{j}.λy.x{j} y (y x{j}))" for j in range(width))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    scales = [int(arg) for arg in argv] or [1000, 10000, 50000]
+
+    print(f"{'expression atoms':<20}{'bytes':>12}{'seconds':>10}{'MB/s':>8}")
+    for width in scales:
+        source = generated_expression(width)
+        start = time.perf_counter()
+        parse(source)
+        elapsed = time.perf_counter() - start
+        print(f"{width:<20}{len(source.encode()):>12}{elapsed:>10.3f}{len(source.encode()) / elapsed / 1e6:>8.2f}")
+
+    print()
+    print(f"{'definitions':<20}{'bytes':>12}{'seconds':>10}{'MB/s':>8}")
+    for definitions in scales:
+        source = generated_program(definitions, 10)
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_definitions(io.StringIO(source)))
+        elapsed = time.perf_counter() - start
+        assert count == definitions
+        print(f"{definitions:<20}{len(source.encode()):>12}{elapsed:>10.3f}{len(source.encode()) / elapsed / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
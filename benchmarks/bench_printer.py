@@ -0,0 +1,82 @@
+import tempfile
+import time
+import tracemalloc
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import ChurchNumeral, church_numeral, create_church_list
+from lambda_calculus.printer import write_expr
+
+
+def doubled(definitions, times):
+    # Applicative order shares each argument's normal form, so the result
+    # is a DAG whose printed form doubles with every application of D.
+    source = "D (" * times + "POW TWO THREE" + ")" * times
+    expr = link(parse(source), definitions)
+    reduced, _, _ = reduce_to_normal_form(expr, "applicative", 10**6)
+    return reduced
+
+
+def timed(run, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def to_file(expr, **options):
+    with tempfile.TemporaryFile("w", encoding="utf-8") as out:
+        return write_expr(expr, out, **options)
+
+
+def main():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+    define(definitions, "D", parse("λx.PAIR x x"))
+
+    workloads = [
+        ("ChurchNumeral(10^6)", ChurchNumeral(10**6)),
+        ("parsed numeral 10^5", parse(str(ChurchNumeral(10**5)))),
+        ("list of 300 numerals", create_church_list(list(range(300)), church_numeral)),
+        ("D applied 16 times", doubled(definitions, 16)),
+    ]
+
+    print(f"{'workload':<24}{'chars':>10}{'str ms':>9}{'str peak KB':>13}"
+          f"{'file ms':>9}{'file peak KB':>14}{'200 chars ms':>14}{'shared chars':>14}{'ms':>8}")
+    for name, expr in workloads:
+        text = str(expr)
+        written = to_file(expr)
+        if written != len(text):
+            raise AssertionError(f"{name}: wrote {written} characters, str gives {len(text)}")
+        shared = to_file(expr, share=True)
+        # Timed before tracemalloc runs, which slows down what follows it.
+        str_time = timed(lambda: str(expr))
+        file_time = timed(lambda: to_file(expr))
+        short_time = timed(lambda: to_file(expr, max_width=200))
+        shared_time = timed(lambda: to_file(expr, share=True))
+        str_peak = peak_memory(lambda: str(expr))
+        file_peak = peak_memory(lambda: to_file(expr))
+        print(f"{name:<24}{len(text):>10}{str_time * 1e3:>9.1f}{str_peak / 1024:>13.0f}"
+              f"{file_time * 1e3:>9.1f}{file_peak / 1024:>14.0f}{short_time * 1e3:>14.2f}"
+              f"{shared:>14}{shared_time * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import json
+import os
+import time
+
+from lambda_calculus.server import EvaluationServer, encode_frame, read_frame
+
+LIGHT = ["PLUS TWO THREE", "MULT THREE THREE", "IS_ZERO (PRED ONE)", "AND TRUE (NOT FALSE)"]
+# Ω never finishes, so its step limit sets how long it keeps a worker busy.
+FOREVER = "(λx.x x) (λx.x x)"
+HEAVY_STEPS = 300000
+
+
+class Client:
+    """A WebSocket client session; requests are matched to replies by id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.progress = {}
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET /ws HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        response = await reader.readuntil(b"\r\n\r\n")
+        if not response.startswith(b"HTTP/1.1 101"):
+            raise ConnectionError(response.decode("latin-1"))
+        return cls(reader, writer)
+
+    def send(self, message):
+        self.writer.write(encode_frame(0x1, json.dumps(message).encode(), os.urandom(4)))
+
+    def request(self, message):
+        self.next_id += 1
+        self.waiting[self.next_id] = asyncio.get_running_loop().create_future()
+        self.send(dict(message, id=self.next_id))
+        return self.next_id, self.waiting[self.next_id]
+
+    async def evaluate(self, expression, **options):
+        _, reply = self.request(dict(options, type='evaluate', expression=expression))
+        return await reply
+
+    async def _listen(self):
+        while True:
+            _, _, payload = await read_frame(self.reader)
+            message = json.loads(payload)
+            if message['type'] == 'progress':
+                self.progress[message['id']] = self.progress.get(message['id'], 0) + 1
+            else:
+                self.waiting.pop(message['id']).set_result(message)
+
+    async def close(self):
+        self.listener.cancel()
+        self.writer.write(encode_frame(0x8, b"\x03\xe8", os.urandom(4)))
+        self.writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def light_load(port, sessions, requests):
+    clients = [await Client.connect(port) for _ in range(sessions)]
+    latencies = []
+
+    async def run(client, offset):
+        for i in range(requests):
+            start = time.perf_counter()
+            reply = await client.evaluate(LIGHT[(offset + i) % len(LIGHT)])
+            if reply['type'] != 'result':
+                raise AssertionError(reply)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(client, i) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return latencies, elapsed
+
+
+async def light_under_heavy(port, heavy_sessions, requests):
+    # Light requests from one session while others reduce a heavy term.
+    heavy = [await Client.connect(port) for _ in range(heavy_sessions)]
+    pending = [asyncio.ensure_future(client.evaluate(FOREVER, max_steps=HEAVY_STEPS))
+               for client in heavy]
+    await asyncio.sleep(0.2)
+    light = await Client.connect(port)
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        await light.evaluate(LIGHT[i % len(LIGHT)])
+        latencies.append(time.perf_counter() - start)
+    results = await asyncio.gather(*pending)
+    progress = sum(client.progress.get(1, 0) for client in heavy)
+    for client in heavy + [light]:
+        await client.close()
+    return latencies, results, progress
+
+
+async def cancellation(port, rounds):
+    client = await Client.connect(port)
+    latencies = []
+    for _ in range(rounds):
+        request_id, reply = client.request({'type': 'evaluate', 'expression': FOREVER,
+                                            'max_steps': 10**9})
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        client.send({'type': 'cancel', 'id': request_id})
+        message = await reply
+        if message['type'] != 'cancelled':
+            raise AssertionError(message)
+        latencies.append(time.perf_counter() - start)
+    await client.close()
+    return latencies
+
+
+async def run(workers, sessions, requests):
+    server = await EvaluationServer(port=0, workers=workers).start()
+    try:
+        # Starts the workers before anything is timed.
+        warm = await Client.connect(server.port)
+        await asyncio.gather(*(warm.evaluate("ONE") for _ in range(workers)))
+        await warm.close()
+
+        latencies, elapsed = await light_load(server.port, sessions, requests)
+        print(f"{sessions} sessions x {requests} light requests: "
+              f"{len(latencies) / elapsed:.0f} requests/s, latency p50 "
+              f"{percentile(latencies, 0.5) * 1e3:.1f} ms, p99 {percentile(latencies, 0.99) * 1e3:.1f} ms")
+
+        heavy_sessions = max(1, workers - 1)
+        latencies, results, progress = await light_under_heavy(server.port, heavy_sessions, 50)
+        print(f"light requests beside {heavy_sessions} x Ω for {HEAVY_STEPS} steps "
+              f"({results[0]['elapsed']:.2f} s, {progress} progress messages): "
+              f"p50 {percentile(latencies, 0.5) * 1e3:.1f} ms, p99 {percentile(latencies, 0.99) * 1e3:.1f} ms")
+
+        latencies = await cancellation(server.port, 5)
+        print(f"cancelling Ω: p50 {percentile(latencies, 0.5) * 1e3:.1f} ms, "
+              f"max {max(latencies) * 1e3:.1f} ms")
+    finally:
+        await server.close()
+
+
+def main(workers=4, sessions=32, requests=20):
+    asyncio.run(run(workers, sessions, requests))
+
+
+if __name__ == "__main__":
+    main()
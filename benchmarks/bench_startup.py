@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+SNIPPETS = {
+    "import encodings": "import lambda_calculus.encodings",
+    "import repl": "import lambda_calculus.repl",
+}
+
+
+def import_times(code, env, cwd):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            env=env, cwd=cwd, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        self_time, _, name = line.split("|")
+        times[name.strip()] = int(self_time.split(":")[1])
+    return times
+
+
+def cold_start(code, env, cwd, runs):
+    # Fresh interpreters; the modules every interpreter imports at startup
+    # are left out, and each module keeps its fastest run to damp noise.
+    startup = set(import_times("pass", env, cwd))
+    best = {}
+    for _ in range(runs):
+        for name, micros in import_times(code, env, cwd).items():
+            if name not in startup:
+                best[name] = min(best.get(name, micros), micros)
+    return sum(best.values()) / 1e3
+
+
+def main(runs=25):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Compiling modules to bytecode would otherwise dominate every run.
+    environ = {key: value for key, value in os.environ.items()
+               if key != "PYTHONDONTWRITEBYTECODE"}
+    environ["PYTHONPATH"] = root
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        modes = {
+            "parse source": dict(environ, LAMBDA_CALCULUS_CACHE_DIR=""),
+            "compiled prelude": dict(environ, LAMBDA_CALCULUS_CACHE_DIR=cache_dir),
+        }
+        for code in SNIPPETS.values():
+            subprocess.run([sys.executable, "-c", code], env=modes["compiled prelude"],
+                           cwd=root, check=True)
+
+        print("import time beyond interpreter startup")
+        print(f"{'':<20}" + "".join(f"{mode:>20}" for mode in modes))
+        for label, code in SNIPPETS.items():
+            row = [cold_start(code, env, root, runs) for env in modes.values()]
+            print(f"{label:<20}" + "".join(f"{value:>17.1f} ms" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import tempfile
+import time
+import tracemalloc
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.semantics import ReductionStream
+from lambda_calculus.tracing import write_trace
+
+# Ω never reaches a normal form, so its trace is cut at a step limit.
+WORKLOADS = [
+    ("Ω", "(λx.x x) (λx.x x)", 10**5),
+    ("POW TWO (MULT TWO THREE)", "POW TWO (MULT TWO THREE)", None),
+    ("MULT 12 12", "MULT (MULT THREE (PLUS TWO TWO)) (MULT THREE (PLUS TWO TWO))", None),
+]
+
+
+def stream_to_disk(expr, max_steps):
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as out:
+        start = time.perf_counter()
+        steps = write_trace(ReductionStream(expr, "normal", max_steps), out)
+        elapsed = time.perf_counter() - start
+        size = out.tell()
+
+        out.seek(0)
+        tracemalloc.start()
+        try:
+            write_trace(ReductionStream(expr, "normal", max_steps), out)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return steps, elapsed, peak, size
+
+
+def keep_every_term(expr, max_steps):
+    tracemalloc.start()
+    try:
+        stream = ReductionStream(expr, "normal", max_steps)
+        terms = [stream.term for _ in stream]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(terms), peak
+
+
+def main():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+
+    print(f"{'workload':<28}{'steps':>9}{'steps/s':>11}{'trace MB':>10}"
+          f"{'stream peak KB':>16}{'all terms peak KB':>19}")
+    for name, source, max_steps in WORKLOADS:
+        expr = link(parse(source), definitions)
+        steps, elapsed, peak, size = stream_to_disk(expr, max_steps)
+        kept, kept_peak = keep_every_term(expr, max_steps)
+        if kept != steps:
+            raise AssertionError(f"{name}: step counts differ")
+        print(f"{name:<28}{steps:>9}{steps / elapsed:>11.0f}{size / 2**20:>10.1f}"
+              f"{peak / 1024:>16.0f}{kept_peak / 1024:>19.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import time
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.semantics import beta_reduce_once
+from lambda_calculus.encodings import MULT, POW, church_numeral
+
+
+def time_steps(expr, steps):
+    start = time.perf_counter()
+    done = 0
+    for _ in range(steps):
+        expr, was_reduced = beta_reduce_once(expr)
+        if not was_reduced:
+            break
+        done += 1
+    elapsed = time.perf_counter() - start
+    return done, elapsed
+
+
+def workloads():
+    for n in (100, 200, 400):
+        yield f"numeral {n}", church_numeral(n), 50
+
+    for n in (5, 10, 20):
+        term = Application(Application(MULT, church_numeral(n)), church_numeral(n))
+        yield f"MULT {n} {n}", term, 200
+
+    for n in (2, 3):
+        term = Application(Application(POW, church_numeral(n)), church_numeral(3))
+        yield f"POW {n} 3", term, 200
+
+    nested = Application(Application(MULT, church_numeral(4)),
+                         Application(Application(MULT, church_numeral(4)), church_numeral(4)))
+    yield "MULT 4 (MULT 4 4)", nested, 200
+
+
+def main():
+    print(f"{'workload':<22}{'steps':>8}{'total s':>12}{'µs/step':>12}")
+    for name, expr, steps in workloads():
+        done, elapsed = time_steps(expr, steps)
+        per_step = elapsed / done * 1e6 if done else 0.0
+        print(f"{name:<22}{done:>8}{elapsed:>12.4f}{per_step:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.parser import parse
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import (
+    PLUS, MULT, POW, PRED, SUB,
+    church_numeral, create_church_list
+)
+
+FORMAT_VERSION = 1
+
+
+class Case:
+    __slots__ = ('name', 'unit', 'setup')
+
+    def __init__(self, name, unit, setup):
+        self.name = name
+        self.unit = unit
+        self.setup = setup
+
+
+def _apply(*terms):
+    expr = terms[0]
+    for term in terms[1:]:
+        expr = Application(expr, term)
+    return expr
+
+
+def _reduction(expr, strategy, max_steps=100000):
+    def run():
+        _, steps, _ = reduce_to_normal_form(expr, strategy, max_steps)
+        return steps
+    return run
+
+
+def _parse_source():
+    source = "\n".join(
+        f"(λf.λx.f (f x)) (λm.λn.λf.λx.m f (n f x)) a{i} b{i} (λy.y y) # line {i}"
+        for i in range(2000)
+    )
+
+    def run():
+        parse(source)
+        return len(source)
+    return run
+
+
+def _church_list():
+    def run():
+        items = list(range(200))
+        create_church_list(items, church_numeral)
+        return len(items)
+    return run
+
+
+def _alpha_equivalence():
+    left = church_numeral(300)
+    right = parse(str(left).replace("f", "g").replace("x", "y"))
+    pairs = [(left, right), (Abstraction("z", left), Abstraction("w", right))]
+
+    def run():
+        for a, b in pairs:
+            if not a.is_alpha_equivalent(b):
+                raise AssertionError("α-equivalence benchmark inputs diverged")
+        return len(pairs)
+    return run
+
+
+def _deep_numeral(n, strategy):
+    return lambda: _reduction(church_numeral(n), strategy)
+
+
+def cases():
+    sub = SUB.substitute("PRED", PRED)
+    arithmetic = {
+        "PLUS 20 20": (PLUS, 20, 20),
+        "MULT 8 8": (MULT, 8, 8),
+        "POW 2 5": (POW, 2, 5),
+        "SUB 12 6": (sub, 12, 6),
+    }
+
+    yield Case("parse 2000 lines", "chars", _parse_source)
+    for strategy in ("normal", "applicative"):
+        for label, (op, m, n) in arithmetic.items():
+            yield Case(f"{label} ({strategy})", "steps",
+                       lambda op=op, m=m, n=n, strategy=strategy: _reduction(
+                           _apply(op, church_numeral(m), church_numeral(n)), strategy))
+        yield Case(f"PRED 15 ({strategy})", "steps",
+                   lambda strategy=strategy: _reduction(
+                       _apply(PRED, church_numeral(15)), strategy))
+        yield Case(f"numeral 300 ({strategy})", "steps",
+                   _deep_numeral(300, strategy))
+    yield Case("create_church_list 200", "items", _church_list)
+    yield Case("α-equivalence numeral 300", "checks", _alpha_equivalence)
+
+
+class _NodeCounter:
+    def __init__(self):
+        self.count = 0
+        self._originals = {}
+
+    def __enter__(self):
+        for cls in (Variable, Abstraction, Application):
+            original = cls.__init__
+            self._originals[cls] = original
+
+            def counting_init(node, *args, _original=original, **kwargs):
+                self.count += 1
+                _original(node, *args, **kwargs)
+
+            cls.__init__ = counting_init
+        return self
+
+    def __exit__(self, *exc_info):
+        for cls, original in self._originals.items():
+            cls.__init__ = original
+        return False
+
+
+def measure(case, repeat):
+    timings = []
+    work = 0
+    for _ in range(repeat):
+        run = case.setup()
+        start = time.perf_counter()
+        work = run()
+        timings.append(time.perf_counter() - start)
+
+    # Allocation counts and peak memory come from a separate run, so the
+    # instrumentation does not distort the timings above.
+    run = case.setup()
+    with _NodeCounter() as counter:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        "name": case.name,
+        "unit": case.unit,
+        "work": work,
+        "seconds": seconds,
+        "rate": work / seconds if seconds else None,
+        "peak_memory": peak,
+        "nodes_allocated": counter.count,
+    }
+
+
+def compare(results, baseline, threshold):
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(entry["name"])
+        if old is None or not old["seconds"]:
+            entry["change"] = None
+            continue
+        change = entry["seconds"] / old["seconds"] - 1
+        entry["change"] = change
+        if change > threshold:
+            regressions.append(entry)
+    return regressions
+
+
+def report(results, out):
+    out.write(f"{'benchmark':<34}{'work':>9}{'unit':>7}{'seconds':>10}"
+              f"{'rate/s':>12}{'peak KiB':>10}{'nodes':>10}{'change':>9}\n")
+    for entry in results:
+        change = entry.get("change")
+        change = f"{change:+.1%}" if change is not None else "-"
+        rate = f"{entry['rate']:.0f}" if entry["rate"] is not None else "-"
+        out.write(f"{entry['name']:<34}{entry['work']:>9}{entry['unit']:>7}"
+                  f"{entry['seconds']:>10.4f}{rate:>12}"
+                  f"{entry['peak_memory'] / 1024:>10.1f}{entry['nodes_allocated']:>10}"
+                  f"{change:>9}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the reduction benchmark suite."
+    )
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark; the fastest is reported")
+    parser.add_argument("--filter", default=None,
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write results as JSON to PATH ('-' for stdout)")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="compare against a JSON file written by --json")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional slowdown counted as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    selected = [case for case in cases()
+                if args.filter is None or args.filter in case.name]
+    results = [measure(case, args.repeat) for case in selected]
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    document = {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "repeat": args.repeat,
+        "threshold": args.threshold if args.baseline else None,
+        "results": results,
+        "regressions": [entry["name"] for entry in regressions],
+    }
+
+    if args.json == "-":
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        report(results, sys.stdout)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(document, f, indent=2)
+
+    for entry in regressions:
+        sys.stderr.write(f"regression: {entry['name']} is {entry['change']:.1%} slower "
+                         f"than the baseline\n")
+    return 1 if regressions else 0
@@ -0,0 +1,113 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from lambda_calculus.syntax import Expr
+from lambda_calculus.parser import parse
+from lambda_calculus.limits import evaluate
+from lambda_calculus.serialize import dumps, loads
+
+
+class BatchItem:
+    __slots__ = ('expr', 'max_steps', 'timeout')
+
+    def __init__(self, expr, max_steps=None, timeout=None):
+        self.expr = expr
+        self.max_steps = max_steps
+        self.timeout = timeout
+
+
+class BatchResult:
+    __slots__ = ('index', 'result', 'steps', 'converged', 'limit', 'elapsed', 'error', 'cycle')
+
+    def __init__(self, index, result, steps, converged, limit, elapsed, error, cycle=None):
+        self.index = index
+        self.result = result
+        self.steps = steps
+        self.converged = converged
+        self.limit = limit
+        self.elapsed = elapsed
+        self.error = error
+        self.cycle = cycle
+
+    @property
+    def timed_out(self):
+        return self.limit == 'deadline'
+
+    def __repr__(self):
+        cycle = f", cycle={self.cycle}" if self.cycle is not None else ""
+        return (f"BatchResult(index={self.index}, steps={self.steps}, "
+                f"converged={self.converged}, limit={self.limit!r}{cycle}, "
+                f"elapsed={self.elapsed:.6f}, error={self.error!r})")
+
+
+def _evaluate_payload(payload):
+    (index, kind, data, strategy, max_steps, timeout, max_nodes, max_memory,
+     detect_divergence) = payload
+    start = time.perf_counter()
+    try:
+        expr = parse(data) if kind == 'source' else loads(data)
+        result = evaluate(expr, strategy, max_steps, max_nodes=max_nodes,
+                          max_memory=max_memory, timeout=timeout,
+                          detect_divergence=detect_divergence)
+        return (index, dumps(result.expr), result.steps, result.converged, result.limit,
+                time.perf_counter() - start, None, result.cycle)
+    except Exception as e:
+        return (index, None, 0, False, None, time.perf_counter() - start,
+                f"{type(e).__name__}: {e}", None)
+
+
+def _payload(index, item, strategy, max_steps, timeout, max_nodes, max_memory,
+             detect_divergence):
+    if not isinstance(item, BatchItem):
+        item = BatchItem(item)
+    if item.max_steps is not None:
+        max_steps = item.max_steps
+    if item.timeout is not None:
+        timeout = item.timeout
+
+    if isinstance(item.expr, str):
+        kind, data = 'source', item.expr
+    elif isinstance(item.expr, Expr):
+        kind, data = 'expr', dumps(item.expr)
+    else:
+        raise TypeError(f"Cannot evaluate batch item of type {type(item.expr)}")
+    return (index, kind, data, strategy, max_steps, timeout, max_nodes, max_memory,
+            detect_divergence)
+
+
+def _result(raw):
+    index, data, steps, converged, limit, elapsed, error, cycle = raw
+    result = loads(data) if data is not None else None
+    return BatchResult(index, result, steps, converged, limit, elapsed, error, cycle)
+
+
+def evaluate_batch(items, strategy="normal", max_steps=1000, timeout=None,
+                   workers=None, executor=None, max_nodes=None, max_memory=None,
+                   detect_divergence=False):
+    owned = executor is None
+    if owned:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight_limit = 4 * (workers or os.cpu_count() or 1)
+
+    pending = set()
+    try:
+        for index, item in enumerate(items):
+            payload = _payload(index, item, strategy, max_steps, timeout, max_nodes, max_memory,
+                               detect_divergence)
+            pending.add(executor.submit(_evaluate_payload, payload))
+
+            if len(pending) >= in_flight_limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _result(future.result())
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _result(future.result())
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+from lambda_calculus.debruijn import to_debruijn
+
+
+def count_nodes(expr):
+    return expr.size()
+
+
+class NormalFormCache:
+    def __init__(self, max_nodes=100000):
+        if max_nodes <= 0:
+            raise ValueError("max_nodes must be positive")
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, expr, strategy):
+        return to_debruijn(expr), strategy
+
+    def lookup(self, key, max_steps):
+        entry = self._entries.get(key)
+        if entry is not None:
+            normal_form, steps, converged, _, _ = entry
+            if converged and steps <= max_steps:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return normal_form, steps, steps < max_steps
+            if not converged and steps == max_steps:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return normal_form, steps, False
+
+        self.misses += 1
+        return None
+
+    def store(self, key, result, input_nodes, depends=frozenset()):
+        normal_form, steps, converged = result
+        size = input_nodes + count_nodes(normal_form)
+        if size > self.max_nodes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nodes -= old[3]
+
+        self._entries[key] = (normal_form, steps, converged, size, frozenset(depends))
+        self.nodes += size
+
+        while self.nodes > self.max_nodes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nodes -= evicted[3]
+            self.evictions += 1
+
+    def invalidate(self, names):
+        # Entries are keyed by content, so stale ones could never be hit
+        # again; this only frees the room they take.
+        names = set(names)
+        stale = [key for key, entry in self._entries.items() if not names.isdisjoint(entry[4])]
+        for key in stale:
+            self.nodes -= self._entries.pop(key)[3]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+        self.nodes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'nodes': self.nodes,
+            'max_nodes': self.max_nodes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
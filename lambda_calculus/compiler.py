@@ -0,0 +1,204 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global, fresh_name
+from lambda_calculus.encodings import ChurchNumeral, extract_church_numeral
+
+
+# Compiled terms are Python functions from an environment to a value. An
+# environment is a linked tuple (value, rest), innermost binding first. A
+# value is a Python callable: λ-abstractions become closures, so β-reduction
+# is a host function call, while free variables evaluate to Level and
+# applications of them to Neutral, which only record their arguments.
+# Arguments are evaluated before the call (call by value), so programs that
+# rely on a discarded argument never being evaluated do not terminate here.
+
+
+class Level:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, argument):
+        return Neutral(self, argument)
+
+
+class Neutral:
+    __slots__ = ('function', 'argument')
+
+    def __init__(self, function, argument):
+        self.function = function
+        self.argument = argument
+
+    def __call__(self, argument):
+        return Neutral(self, argument)
+
+
+def _numeral(n):
+    # Church numerals iterate instead of nesting n calls.
+    def numeral(f):
+        def apply(x):
+            for _ in range(n):
+                x = f(x)
+            return x
+        return apply
+    return numeral
+
+
+def _constant(value):
+    return lambda env: value
+
+
+def _variable(index):
+    if index == 0:
+        return lambda env: env[0]
+    if index == 1:
+        return lambda env: env[1][0]
+    if index == 2:
+        return lambda env: env[1][1][0]
+
+    def lookup(env):
+        for _ in range(index):
+            env = env[1]
+        return env[0]
+    return lookup
+
+
+def _abstraction(body):
+    return lambda env: lambda argument: body((argument, env))
+
+
+def _application(left, right):
+    return lambda env: left(env)(right(env))
+
+
+def _global(definition, free):
+    value = []
+
+    def run(env):
+        # Evaluated once, the first time the program reaches it.
+        if not value:
+            value.append(compile_expr(definition.unfold(), free)(None))
+        return value[0]
+    return run
+
+
+def compile_expr(expr, free=None):
+    """Compile expr to a function from an environment to its value."""
+    free = {} if free is None else free
+    globals_ = {}
+    # Closed subterms mean the same everywhere; repeated ones, such as the
+    # SUCC in every step of a numeral, are compiled once.
+    closed = {}
+    scopes = {}
+    depth = 0
+    out = []
+    stack = [(expr, True)]
+
+    while stack:
+        node, entering = stack.pop()
+
+        if isinstance(node, Variable):
+            levels = scopes.get(node.name)
+            if levels:
+                out.append(_variable(depth - levels[-1] - 1))
+            else:
+                level = free.get(node.name)
+                if level is None:
+                    level = free[node.name] = Level(node.name)
+                out.append(_constant(level))
+
+        elif isinstance(node, Global):
+            run = globals_.get(id(node))
+            if run is None:
+                run = globals_[id(node)] = _global(node, free)
+            out.append(run)
+
+        elif entering and id(node) in closed:
+            out.append(closed[id(node)][1])
+
+        elif isinstance(node, Abstraction):
+            if entering:
+                n = node.value if isinstance(node, ChurchNumeral) else None
+                if (n is None and isinstance(node.body, Abstraction)
+                        and node.body.param != node.param):
+                    n = extract_church_numeral(node)
+                if n is not None:
+                    out.append(_constant(_numeral(n)))
+                    continue
+                scopes.setdefault(node.param, []).append(depth)
+                depth += 1
+                stack.append((node, False))
+                stack.append((node.body, True))
+            else:
+                depth -= 1
+                scopes[node.param].pop()
+                code = _abstraction(out.pop())
+                if not node.free_variables():
+                    # Closed abstractions do not depend on the environment.
+                    code = _constant(code(None))
+                    closed[id(node)] = (node, code)
+                out.append(code)
+
+        elif isinstance(node, Application):
+            if entering:
+                stack.append((node, False))
+                stack.append((node.right, True))
+                stack.append((node.left, True))
+            else:
+                right = out.pop()
+                code = _application(out.pop(), right)
+                if not node.free_variables():
+                    closed[id(node)] = (node, code)
+                out.append(code)
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return out[0]
+
+
+def evaluate(expr):
+    return compile_expr(expr)(None)
+
+
+_BINDER, _SPINE = range(2)
+
+
+def readback(value, used=()):
+    """Quote a value back into an expression in β-normal form."""
+    used = set(used)
+    out = []
+    stack = [value]
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, tuple):
+            if item[0] is _BINDER:
+                used.discard(item[1])
+                out.append(Abstraction(item[1], out.pop()))
+            else:
+                right = out.pop()
+                out.append(Application(out.pop(), right))
+
+        elif isinstance(item, Level):
+            out.append(Variable(item.name))
+
+        elif isinstance(item, Neutral):
+            stack.append((_SPINE,))
+            stack.append(item.argument)
+            stack.append(item.function)
+
+        else:
+            name = fresh_name('x', used)
+            used.add(name)
+            stack.append((_BINDER, name))
+            stack.append(item(Level(name)))
+
+    return out[0]
+
+
+def normalize(expr):
+    """Normal form of expr by evaluation and readback; may raise RecursionError."""
+    free = {}
+    value = compile_expr(expr, free)(None)
+    return readback(value, free)
@@ -0,0 +1,196 @@
+import weakref
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global, fresh_name
+
+
+_table = weakref.WeakValueDictionary()
+
+
+class Term:
+    __slots__ = ('__weakref__',)
+
+
+class Index(Term):
+    __slots__ = ('index',)
+
+    def __new__(cls, index):
+        key = ('i', index)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.index = index
+            _table[key] = node
+        return node
+
+
+class Free(Term):
+    __slots__ = ('name',)
+
+    def __new__(cls, name):
+        key = ('f', name)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.name = name
+            _table[key] = node
+        return node
+
+
+class Lam(Term):
+    __slots__ = ('body',)
+
+    def __new__(cls, body):
+        key = ('l', id(body))
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.body = body
+            _table[key] = node
+        return node
+
+
+class App(Term):
+    __slots__ = ('left', 'right')
+
+    def __new__(cls, left, right):
+        key = ('a', id(left), id(right))
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.left = left
+            node.right = right
+            _table[key] = node
+        return node
+
+
+def interned_count():
+    return len(_table)
+
+
+def to_debruijn(expr):
+    # The term is cached on expr. It is reused for a subterm met again
+    # wherever none of its free variables is bound, as for every definition.
+    scopes = {}
+    depth = 0
+    out = []
+    stack = [(expr, True)]
+
+    while stack:
+        node, entering = stack.pop()
+
+        if entering and node._debruijn is not None and not any(
+                scopes.get(name) for name in node.free_variables()):
+            out.append(node._debruijn)
+
+        elif isinstance(node, Variable):
+            levels = scopes.get(node.name)
+            if levels:
+                out.append(Index(depth - levels[-1] - 1))
+            else:
+                out.append(Free(node.name))
+
+        elif isinstance(node, Global):
+            # Definitions are closed, so their terms do not depend on scope.
+            node._debruijn = to_debruijn(node.definition)
+            out.append(node._debruijn)
+
+        elif isinstance(node, Abstraction):
+            if entering:
+                scopes.setdefault(node.param, []).append(depth)
+                depth += 1
+                stack.append((node, False))
+                stack.append((node.body, True))
+            else:
+                depth -= 1
+                scopes[node.param].pop()
+                out.append(Lam(out.pop()))
+
+        elif isinstance(node, Application):
+            if entering:
+                stack.append((node, False))
+                stack.append((node.right, True))
+                stack.append((node.left, True))
+            else:
+                right = out.pop()
+                out.append(App(out.pop(), right))
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    expr._debruijn = out[0]
+    return out[0]
+
+
+def binder_names(expr):
+    names = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Abstraction):
+            names.append(node.param)
+            stack.append(node.body)
+        elif isinstance(node, Application):
+            stack.append(node.right)
+            stack.append(node.left)
+    return tuple(names)
+
+
+def free_names(term):
+    names = set()
+    seen = set()
+    stack = [term]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Free):
+            names.add(node.name)
+        elif isinstance(node, Lam):
+            stack.append(node.body)
+        elif isinstance(node, App):
+            stack.append(node.right)
+            stack.append(node.left)
+    return names
+
+
+def from_debruijn(term, names=None):
+    names = iter(names) if names is not None else None
+    used = None if names is not None else free_names(term)
+    scope = []
+    out = []
+    stack = [term]
+
+    while stack:
+        node = stack.pop()
+
+        if node is None:
+            name = scope.pop()
+            if used is not None:
+                used.discard(name)
+            out.append(Abstraction(name, out.pop()))
+        elif node is App:
+            right = out.pop()
+            out.append(Application(out.pop(), right))
+        elif isinstance(node, Index):
+            out.append(Variable(scope[-1 - node.index]))
+        elif isinstance(node, Free):
+            out.append(Variable(node.name))
+        elif isinstance(node, Lam):
+            if names is not None:
+                name = next(names)
+            else:
+                name = fresh_name('x', used)
+                used.add(name)
+            scope.append(name)
+            stack.append(None)
+            stack.append(node.body)
+        else:
+            stack.append(App)
+            stack.append(node.right)
+            stack.append(node.left)
+
+    return out[0]
+
+
+def alpha_equivalent(left, right):
+    return to_debruijn(left) is to_debruijn(right)
@@ -0,0 +1,152 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global
+from lambda_calculus.encodings import ChurchNumeral
+
+
+def link(expr, definitions):
+    # Free occurrences of defined names become references to their Global;
+    # subterms that mention none of them are kept as they are.
+    out = []
+    stack = [(expr, frozenset(), False)]
+
+    while stack:
+        node, bound, done = stack.pop()
+
+        if done:
+            if isinstance(node, Abstraction):
+                body = out.pop()
+                out.append(node if body is node.body else Abstraction(node.param, body))
+            else:
+                right = out.pop()
+                left = out.pop()
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
+                out.append(node)
+
+        elif isinstance(node, Global) or not any(
+                name in definitions and name not in bound for name in node.free_variables()):
+            out.append(node)
+
+        elif isinstance(node, Variable):
+            definition = definitions[node.name]
+            # Only closed definitions mean the same thing wherever they
+            # appear; the rest are pasted in, as if typed at this point.
+            out.append(definition.definition if definition.free_variables() else definition)
+
+        elif isinstance(node, Abstraction):
+            stack.append((node, bound, True))
+            stack.append((node.body, bound | {node.param}, False))
+
+        elif isinstance(node, Application):
+            stack.append((node, bound, True))
+            stack.append((node.right, bound, False))
+            stack.append((node.left, bound, False))
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return out[0]
+
+
+def define(definitions, name, expr):
+    """Add name to definitions, resolving the names it mentions against the earlier ones."""
+    definition = Global(name, link(expr, definitions))
+    definitions[name] = definition
+    return definition
+
+
+def expand(expr):
+    # Opens every Global, sharing one copy of each definition.
+    expanded = {}
+    out = []
+    stack = [(expr, False)]
+
+    while stack:
+        node, done = stack.pop()
+
+        if done is None:
+            expanded[id(node)] = (node, out[-1])
+
+        elif done:
+            if isinstance(node, Abstraction):
+                body = out.pop()
+                out.append(node if body is node.body else Abstraction(node.param, body))
+            else:
+                right = out.pop()
+                left = out.pop()
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
+                out.append(node)
+
+        elif isinstance(node, Global):
+            known = expanded.get(id(node))
+            if known is not None:
+                out.append(known[1])
+            else:
+                stack.append((node, None))
+                stack.append((node.definition, False))
+
+        elif isinstance(node, Abstraction):
+            stack.append((node, True))
+            stack.append((node.body, False))
+
+        elif isinstance(node, Application):
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+        else:
+            out.append(node)
+
+    return out[0]
+
+
+def references(expr):
+    """Names of the Globals that expr mentions, not counting their own references."""
+    names = set()
+    seen = set()
+    stack = [expr]
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        if isinstance(node, Global):
+            names.add(node.name)
+        elif isinstance(node, Abstraction):
+            if not isinstance(node, ChurchNumeral):
+                stack.append(node.body)
+        elif isinstance(node, Application):
+            stack.append(node.right)
+            stack.append(node.left)
+
+    return names
+
+
+class DependencyGraph:
+    def __init__(self):
+        self.uses = {}
+        self.users = {}
+
+    def set(self, name, uses):
+        for used in self.uses.get(name, ()):
+            self.users[used].discard(name)
+        self.uses[name] = set(uses)
+        for used in self.uses[name]:
+            self.users.setdefault(used, set()).add(name)
+
+    def remove(self, name):
+        self.set(name, ())
+        del self.uses[name]
+
+    def dependents(self, name):
+        """Names that use name, directly or through other definitions."""
+        found = set()
+        stack = [name]
+        while stack:
+            for user in self.users.get(stack.pop(), ()):
+                if user != name and user not in found:
+                    found.add(user)
+                    stack.append(user)
+        return found
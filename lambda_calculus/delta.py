@@ -0,0 +1,233 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global
+from lambda_calculus.debruijn import to_debruijn
+from lambda_calculus.encodings import (
+    TRUE, FALSE,
+    SUCC, PLUS, MULT, POW, PRED, SUB, IS_ZERO,
+    ChurchNumeral, extract_church_numeral
+)
+from lambda_calculus.definitions import expand
+
+
+def _resolved(expr, **definitions):
+    for name, definition in definitions.items():
+        expr = expr.substitute(name, definition)
+    return expr
+
+
+_ARITY = {
+    'SUCC': 1, 'PRED': 1, 'IS_ZERO': 1,
+    'PLUS': 2, 'MULT': 2, 'POW': 2, 'SUB': 2,
+    'TRUE': 2, 'FALSE': 2,
+}
+
+# Recognised by α-equivalence class, so FALSE also covers ZERO applied to
+# two arguments, which selects the second one just the same.
+_PRIMITIVES = {
+    to_debruijn(SUCC): 'SUCC',
+    to_debruijn(PLUS): 'PLUS',
+    to_debruijn(MULT): 'MULT',
+    to_debruijn(POW): 'POW',
+    to_debruijn(PRED): 'PRED',
+    to_debruijn(SUB): 'SUB',
+    to_debruijn(_resolved(SUB, PRED=PRED)): 'SUB',
+    to_debruijn(IS_ZERO): 'IS_ZERO',
+    to_debruijn(_resolved(IS_ZERO, TRUE=TRUE, FALSE=FALSE)): 'IS_ZERO',
+    to_debruijn(TRUE): 'TRUE',
+    to_debruijn(FALSE): 'FALSE',
+}
+
+
+def _compute(kind, values):
+    if kind == 'SUCC':
+        return ChurchNumeral(values[0] + 1)
+    if kind == 'PRED':
+        return ChurchNumeral(max(values[0] - 1, 0))
+    if kind == 'IS_ZERO':
+        return TRUE if values[0] == 0 else FALSE
+    if kind == 'PLUS':
+        return ChurchNumeral(values[0] + values[1])
+    if kind == 'MULT':
+        return ChurchNumeral(values[0] * values[1])
+    if kind == 'POW':
+        if values[1] == 0:
+            # ZERO m reduces to the identity, not to the numeral ONE.
+            return Abstraction('x', Variable('x'))
+        return ChurchNumeral(values[0] ** values[1])
+    if kind == 'SUB':
+        return ChurchNumeral(max(values[0] - values[1], 0))
+    raise ValueError(f"Unknown primitive: {kind}")
+
+
+class _Recognizer:
+    def __init__(self):
+        self.primitives = {}
+        self.numerals = {}
+
+    def primitive(self, node):
+        if isinstance(node, Global):
+            node = node.unfold()
+        if not isinstance(node, Abstraction) or isinstance(node, ChurchNumeral):
+            return None
+        key = id(node)
+        if key not in self.primitives:
+            self.primitives[key] = (_PRIMITIVES.get(to_debruijn(node)), node)
+        return self.primitives[key][0]
+
+    def numeral(self, node):
+        if isinstance(node, Global):
+            node = node.unfold()
+        if isinstance(node, ChurchNumeral):
+            return node.value
+        if not isinstance(node, Abstraction):
+            return None
+        key = id(node)
+        if key not in self.numerals:
+            self.numerals[key] = (extract_church_numeral(node), node)
+        return self.numerals[key][0]
+
+    def contract(self, app):
+        steps = 0
+        while isinstance(app, Application):
+            args = []
+            head = app
+            while isinstance(head, Application):
+                args.append(head.right)
+                head = head.left
+            args.reverse()
+
+            kind = self.primitive(head)
+            if kind is None or len(args) < _ARITY[kind]:
+                break
+
+            arity = _ARITY[kind]
+            if kind == 'TRUE':
+                result = args[0]
+            elif kind == 'FALSE':
+                result = args[1]
+            else:
+                values = [self.numeral(arg) for arg in args[:arity]]
+                if None in values:
+                    break
+                result = _compute(kind, values)
+
+            for arg in args[arity:]:
+                result = Application(result, arg)
+            app = result
+            steps += 1
+        return app, steps
+
+
+def delta_normalize(expr, recognizer=None):
+    if recognizer is None:
+        recognizer = _Recognizer()
+    steps = 0
+    out = []
+    stack = [(expr, False)]
+
+    while stack:
+        node, done = stack.pop()
+
+        if isinstance(node, (Variable, ChurchNumeral, Global)):
+            out.append(node)
+
+        elif isinstance(node, Abstraction):
+            if not done:
+                stack.append((node, True))
+                stack.append((node.body, False))
+            else:
+                body = out.pop()
+                out.append(node if body is node.body else Abstraction(node.param, body))
+
+        elif isinstance(node, Application):
+            if not done:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                right = out.pop()
+                left = out.pop()
+                if left is not node.left or right is not node.right:
+                    node = Application(left, right)
+                node, taken = recognizer.contract(node)
+                steps += taken
+                out.append(node)
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return out[0], steps
+
+
+def _rebuild(path, contractum, recognizer):
+    # As in semantics, but contracting the applications on the way up, which
+    # the contractum may have completed. contract works on a whole spine, so
+    # only the outermost application of each one is contracted.
+    steps = 0
+    while path is not None:
+        parent, direction, path = path
+        if direction == 'body':
+            contractum = Abstraction(parent.param, contractum)
+            continue
+        if direction == 'left':
+            contractum = Application(contractum, parent.right)
+        else:
+            contractum = Application(parent.left, contractum)
+        if path is None or path[1] != 'left':
+            contractum, taken = recognizer.contract(contractum)
+            steps += taken
+    return contractum, steps
+
+
+def _beta_redex(expr):
+    # The leftmost redex as beta_reduce_once finds it, except that literal
+    # numerals are never opened unless they are applied, so results stay in
+    # their compact form. unfolded tells whether the path to it goes through
+    # a definition, whose other parts have not been delta-normalized yet.
+    stack = [(expr, None, False)]
+    opened = False
+
+    while stack:
+        node, path, unfolded = stack.pop()
+
+        if isinstance(node, Global):
+            stack.append((node.unfold(), path, True))
+            opened = True
+
+        elif isinstance(node, Abstraction):
+            if not isinstance(node, ChurchNumeral):
+                stack.append((node.body, (node, 'body', path), unfolded))
+
+        elif isinstance(node, Application):
+            function = node.left
+            if isinstance(function, Global):
+                function = function.unfold()
+                opened = True
+            if isinstance(function, Abstraction):
+                contractum = function.body.substitute(function.param, node.right)
+                return path, contractum, unfolded
+
+            stack.append((node.right, (node, 'right', path), unfolded))
+            stack.append((function, (node, 'left', path), unfolded))
+
+    return None, (expand(expr) if opened else expr), None
+
+
+def delta_reduce(expr, max_steps=1000):
+    # The term is delta-normalized once; after that only what a β-step
+    # changes is, the contractum and the applications above it.
+    recognizer = _Recognizer()
+    current_expr, steps = delta_normalize(expr, recognizer)
+
+    while steps < max_steps:
+        path, contractum, unfolded = _beta_redex(current_expr)
+        if unfolded is None:
+            return contractum, steps, True
+        steps += 1
+        contractum, taken = delta_normalize(contractum, recognizer)
+        current_expr, more = _rebuild(path, contractum, recognizer)
+        steps += taken + more
+        if unfolded:
+            current_expr, taken = delta_normalize(current_expr, recognizer)
+            steps += taken
+
+    return current_expr, steps, False
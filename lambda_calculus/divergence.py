@@ -0,0 +1,121 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.debruijn import to_debruijn
+
+
+_LAMBDA, _APPLY = object(), object()
+
+
+# A term that comes back, up to α-equivalence, is on a cycle. Brent's
+# algorithm finds it holding a single earlier term: that term is replaced
+# after 1, 2, 4, ... steps, and the first repeat of it is exactly one cycle
+# length later. Terms are compared by size first, so the de Bruijn form is
+# only built for candidates.
+#
+# Terms that grow without repeating, such as (λx.x x x) (λx.x x x), are
+# recognized heuristically: the steps are cut into windows, and a reduction
+# is flagged once the term has grown over `patience` windows in a row while
+# contracting no redex that the window before did not contract too. Ordinary
+# programs keep meeting new redexes, if only because their arguments change.
+# A redex is known by its size and the first `shape` nodes of its de Bruijn
+# form, so each step costs the same however large the redex is.
+
+
+class DivergenceDetector:
+    """Observer that stops reductions which cannot reach a normal form."""
+
+    def __init__(self, window=64, patience=4, shape=32):
+        self.window = window
+        self.patience = patience
+        self.shape = shape
+        self.reason = None
+        self.cycle = None
+        self._saved = None
+        self._saved_size = None
+        self._saved_term = None
+        self._power = 1
+        self._distance = 0
+        self._steps = 0
+        self._redexes = set()
+        self._previous = None
+        self._size = None
+        self._growing = 0
+
+    def observe(self, term, redex=None, steps=1):
+        """Record the term reached after `steps` more steps; returns the
+        reason to stop, 'cycle' or 'growth', or None."""
+        if self._find_cycle(term, steps) or (redex is not None and self._find_growth(term, redex)):
+            return self.reason
+        return None
+
+    def __call__(self, event):
+        return self.observe(event.term, event.redex) is not None
+
+    def _find_cycle(self, term, steps):
+        size = term.size()
+        if self._saved is None:
+            self._save(term, size)
+            return False
+
+        self._distance += steps
+        if size == self._saved_size:
+            if self._saved_term is None:
+                self._saved_term = to_debruijn(self._saved)
+            if to_debruijn(term) is self._saved_term:
+                self.reason = 'cycle'
+                self.cycle = self._distance
+                return True
+        if self._distance >= self._power:
+            self._save(term, size)
+            self._power *= 2
+        return False
+
+    def _save(self, term, size):
+        self._saved = term
+        self._saved_size = size
+        self._saved_term = None
+        self._distance = 0
+
+    def _find_growth(self, term, redex):
+        self._redexes.add(_shape(redex, self.shape))
+        self._steps += 1
+        if self._steps < self.window:
+            return False
+
+        size = term.size()
+        if self._previous is not None and size > self._size and self._redexes <= self._previous:
+            self._growing += 1
+        else:
+            self._growing = 0
+        self._previous = self._redexes
+        self._redexes = set()
+        self._size = size
+        self._steps = 0
+        if self._growing >= self.patience:
+            self.reason = 'growth'
+            return True
+        return False
+
+
+def _shape(expr, limit):
+    # The size of expr and its first `limit` nodes in preorder. Bound
+    # variables are numbered by de Bruijn index, found through the chain of
+    # binders above them.
+    tokens = [expr.size()]
+    stack = [(expr, None)]
+    while stack and len(tokens) <= limit:
+        node, binders = stack.pop()
+        if isinstance(node, Abstraction):
+            tokens.append(_LAMBDA)
+            stack.append((node.body, (node.param, binders)))
+        elif isinstance(node, Application):
+            tokens.append(_APPLY)
+            stack.append((node.right, binders))
+            stack.append((node.left, binders))
+        else:
+            index = 0
+            scope = binders if isinstance(node, Variable) else None
+            while scope is not None and scope[0] != node.name:
+                index += 1
+                scope = scope[1]
+            tokens.append(index if scope is not None else node.name)
+    return tuple(tokens)
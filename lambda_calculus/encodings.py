@@ -1,58 +1,89 @@
 from lambda_calculus.syntax import Variable, Abstraction, Application
-from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
 
-TRUE = parse("λx.λy.x")          
-FALSE = parse("λx.λy.y")         
+# The standard definitions live in the compiled prelude and are decoded
+# the first time they are used, e.g. by `from ... import TRUE`. The prelude
+# itself is only opened then, so importing this module for ChurchNumeral
+# does not touch the cache.
+_definitions = {}
+_EXPORTS = [
+    'ChurchNumeral', 'church_numeral', 'extract_church_numeral',
+    'to_boolean', 'create_church_list',
+]
 
-AND = parse("λp.λq.p q p")       
-OR = parse("λp.λq.p p q")        
-NOT = parse("λp.λa.λb.p b a")    
-IF_THEN_ELSE = parse("λp.λa.λb.p a b")  
 
-ZERO = parse("λf.λx.x")            
-ONE = parse("λf.λx.f x")           
-TWO = parse("λf.λx.f (f x)")       
-THREE = parse("λf.λx.f (f (f x))") 
+def __getattr__(name):
+    if name == '__all__':
+        return list(load_prelude().standard_names) + _EXPORTS
+    if not name.startswith('__') and name in load_prelude().standard_names:
+        return _linked(name).definition
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-SUCC = parse("λn.λf.λx.f (n f x)")     
-PLUS = parse("λm.λn.λf.λx.m f (n f x)") 
-MULT = parse("λm.λn.λf.m (n f)")        
-POW = parse("λm.λn.n m")                
-PRED = parse("λn.λf.λx.n (λg.λh.h (g f)) (λu.x) (λu.u)")
-SUB = parse("λm.λn.n PRED m")
 
-IS_ZERO = parse("λn.n (λx.FALSE) TRUE")  
-LEQ = parse("λm.λn.IS_ZERO (SUB m n)")   
-EQ = parse("λm.λn.AND (LEQ m n) (LEQ n m)")
+def _linked(name):
+    # The names a definition mentions, such as PRED in SUB, are linked
+    # first, so that what is handed out has no free variables.
+    from lambda_calculus.definitions import define
 
+    definition = _definitions.get(name)
+    if definition is None:
+        prelude = load_prelude()
+        expr = prelude[name]
+        for used in expr.free_variables():
+            if used in prelude.standard_names:
+                _linked(used)
+        definition = define(_definitions, name, expr)
+    return definition
 
-PAIR = parse("λx.λy.λf.f x y")     
-FIRST = parse("λp.p (λx.λy.x)")    
-SECOND = parse("λp.p (λx.λy.y)")   
 
+def __dir__():
+    return sorted(set(globals()) | set(load_prelude().standard_names))
 
-NIL = parse("λx.TRUE")               
-IS_NIL = parse("λl.l (λh.λt.λd.FALSE)") 
-CONS = parse("λh.λt.λc.c h t")       
-HEAD = parse("λl.l (λh.λt.h)")       
-TAIL = parse("λl.l (λh.λt.t)")       
+
+class ChurchNumeral(Abstraction):
+    __slots__ = ('value', '_body')
+    
+    def __init__(self, value):
+        if value < 0:
+            raise ValueError("Church numerals only represent natural numbers")
+        self.value = value
+        self.param = 'f'
+        self._body = None
+        self._free_variables = frozenset()
+        self._size = 2 * value + 3
+        self._debruijn = None
+    
+    @property
+    def body(self):
+        if self._body is None:
+            f = Variable('f')
+            result = Variable('x')
+            for _ in range(self.value):
+                result = Application(f, result)
+            self._body = Abstraction('x', result)
+        return self._body
 
 
 def church_numeral(n):
     if n < 0:
         raise ValueError("Church numerals only represent natural numbers")
     
+    zero = _linked('ZERO').definition
     if n == 0:
-        return ZERO
+        return zero
     
-    result = ZERO
+    succ = _linked('SUCC').definition
+    result = zero
     for _ in range(n):
-        result = Application(SUCC, result)
+        result = Application(succ, result)
     
     return result
 
 
 def extract_church_numeral(expr):
+    if isinstance(expr, ChurchNumeral):
+        return expr.value
+    
     if not isinstance(expr, Abstraction) or not isinstance(expr.body, Abstraction):
         return None
     
@@ -77,19 +108,14 @@ def extract_church_numeral(expr):
 
 
 def to_boolean(expr):
-    from lambda_calculus.semantics import reduce_to_normal_form
+    from lambda_calculus.semantics import observe_boolean
     
-    reduced, _, _ = reduce_to_normal_form(expr)
-    if reduced.is_alpha_equivalent(TRUE):
-        return True
-    elif reduced.is_alpha_equivalent(FALSE):
-        return False
-    else:
-        return None
+    return observe_boolean(expr)
 
 
 def create_church_list(items, encoder_fn=None):
-    result = NIL
+    cons = _linked('CONS').definition
+    result = _linked('NIL').definition
     
     for item in reversed(items):
         if encoder_fn:
@@ -98,7 +124,7 @@ def create_church_list(items, encoder_fn=None):
             encoded_item = item
         
         result = Application(
-            Application(CONS, encoded_item),
+            Application(cons, encoded_item),
             result
         )
     
@@ -0,0 +1,221 @@
+from lambda_calculus.syntax import (
+    Variable, Abstraction, Application, Global, fresh_name, _substitute_all
+)
+
+
+# Contracting a β-redex does not substitute into its body. The body is kept
+# together with the substitution, and the pair is pushed down one
+# constructor at a time as reduction reaches into it: an application delays
+# its argument under the same substitution, a variable is looked up, and a
+# redex extends the substitution of its body with the argument. Delayed
+# arguments therefore carry substitutions composed from every redex above
+# them, and are only ever opened along the head paths that normalization
+# follows. A subterm free of the substituted names is taken as it is, and
+# a binder that would capture a free variable of a substituted term is
+# renamed by one more entry in the substitution of its body. Substitutions
+# are dictionaries, never changed once made, so every argument delayed
+# under one shares it.
+
+
+class Delayed:
+    """A term under a pending substitution of names by terms."""
+    __slots__ = ('term', 'subst', '_free_variables')
+
+    def __init__(self, term, subst):
+        self.term = term
+        self.subst = subst
+        self._free_variables = None
+
+    def free_variables(self):
+        if self._free_variables is None:
+            _compute_free_variables(self)
+        return self._free_variables
+
+
+def _compute_free_variables(delayed):
+    stack = [delayed]
+
+    while stack:
+        node = stack[-1]
+        if node._free_variables is not None:
+            stack.pop()
+            continue
+
+        term_free = node.term.free_variables()
+        values = [node.subst[name] for name in term_free if name in node.subst]
+        pending = [value for value in values
+                   if isinstance(value, Delayed) and value._free_variables is None]
+        if pending:
+            stack.extend(pending)
+            continue
+        free = term_free.difference(node.subst)
+        for value in values:
+            free |= value.free_variables()
+        node._free_variables = free
+        stack.pop()
+
+
+def materialize(item):
+    """Carry out every substitution pending in item."""
+    if not isinstance(item, Delayed):
+        return item
+
+    # Delayed terms are shared, so each one is substituted once.
+    done = {}
+    stack = [item]
+
+    while stack:
+        node = stack[-1]
+        if id(node) in done:
+            stack.pop()
+            continue
+
+        values = {name: node.subst[name] for name in node.term.free_variables()
+                  if name in node.subst}
+        pending = [value for value in values.values()
+                   if isinstance(value, Delayed) and id(value) not in done]
+        if pending:
+            stack.extend(pending)
+            continue
+        for name, value in values.items():
+            if isinstance(value, Delayed):
+                values[name] = done[id(value)]
+        done[id(node)] = _substitute_all(node.term, values)
+        stack.pop()
+
+    return done[id(item)]
+
+
+def _wrap(params, body):
+    for param in reversed(params):
+        body = Abstraction(param, body)
+    return body
+
+
+def _apply(function, args):
+    for arg in args:
+        function = Application(function, arg)
+    return function
+
+
+def explicit_normalize(expr, max_steps=1000, stats=None):
+    """Normal form of expr in normal order, with substitutions delayed until needed."""
+    steps = 0
+    delayed = 0
+    environments = 0
+    truncated = False
+    out = []
+    stack = [expr]
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, tuple):
+            term, params, head, args, changed = item
+            count = len(args)
+            normalized = out[len(out) - count:]
+            del out[len(out) - count:]
+            if changed or any(new is not old for new, old in zip(normalized, args)):
+                term = _wrap(params, _apply(head, normalized))
+            out.append(term)
+            continue
+
+        if truncated:
+            out.append(materialize(item))
+            continue
+
+        if isinstance(item, Delayed):
+            term, subst = item.term, item.subst
+        else:
+            term, subst = item, None
+        changed = subst is not None
+        node = term
+        params = []
+        # Arguments of the head, the first one last.
+        args = []
+
+        while True:
+            if isinstance(node, Application):
+                right = node.right
+                if subst is not None and not right.free_variables().isdisjoint(subst):
+                    right = Delayed(right, subst)
+                    delayed += 1
+                args.append(right)
+                node = node.left
+
+            elif isinstance(node, Variable):
+                value = subst.get(node.name) if subst is not None else None
+                if value is None:
+                    break
+                if isinstance(value, Delayed):
+                    node, subst = value.term, value.subst
+                else:
+                    node, subst = value, None
+
+            elif isinstance(node, Abstraction):
+                param = node.param
+                body = node.body
+                body_free = body.free_variables()
+
+                if args:
+                    if steps >= max_steps:
+                        truncated = True
+                        break
+                    argument = args.pop()
+                    if subst is not None:
+                        subst = {name: value for name, value in subst.items()
+                                 if name in body_free and name != param}
+                    if param in body_free:
+                        if subst is None:
+                            subst = {}
+                        subst[param] = argument
+                    if subst:
+                        environments += 1
+                    else:
+                        subst = None
+                    node = body
+                    steps += 1
+                    changed = True
+                    continue
+
+                if subst is not None:
+                    if param in subst:
+                        subst = {name: value for name, value in subst.items() if name != param}
+                        environments += 1
+                    if any(param in value.free_variables()
+                           for name, value in subst.items() if name in body_free):
+                        used = set(body_free)
+                        for name, value in subst.items():
+                            if name in body_free:
+                                used |= value.free_variables()
+                        param = fresh_name(param, used)
+                        subst = dict(subst)
+                        subst[node.param] = Variable(param)
+                        environments += 1
+                    if not subst:
+                        subst = None
+                params.append(param)
+                node = body
+
+            elif isinstance(node, Global):
+                # Opening a definition is not a step.
+                node = node.definition
+                changed = True
+
+            else:
+                raise TypeError(f"Unknown expression type: {type(node)}")
+
+        if truncated:
+            head = materialize(Delayed(node, subst) if subst is not None else node)
+            args = [materialize(arg) for arg in reversed(args)]
+            out.append(_wrap(params, _apply(head, args)))
+            continue
+
+        stack.append((term, params, node, args[::-1], changed))
+        stack.extend(args)
+
+    if stats is not None:
+        stats['steps'] = steps
+        stats['delayed'] = delayed
+        stats['environments'] = environments
+    return out[0], steps, not truncated and steps < max_steps
@@ -0,0 +1,344 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global, fresh_name
+
+
+# Terms are translated into an interaction net and reduced with Lamping's
+# abstract algorithm: abstractions and applications are binary nodes that
+# annihilate in a β-interaction, and a variable used more than once is
+# shared through fan (duplicator) nodes that copy whatever they meet one
+# layer at a time. Copying stops at the first shared redex, so a subterm is
+# reduced once no matter how many copies of it are later needed, including
+# redexes under a λ that call-by-need would have to reduce in each copy.
+# Fans carry labels: two fans with the same label annihilate, two with
+# different labels commute. Without the brackets and croissants of the
+# full algorithm this is only known to be correct for terms typable in
+# elementary affine logic, which covers Church numeral arithmetic but not
+# a numeral applied to a shared copy of itself, as in (λx.x x) TWO, so it
+# is offered as an experimental strategy. A net found to have gone wrong
+# is abandoned, and the term is reported as unsupported.
+#
+# A node has three ports, numbered 3 * node + slot. Slot 0 is the principal
+# port, through which nodes interact:
+#   λ:   0 = the abstraction, 1 = its variable, 2 = its body
+#   @:   0 = the function, 1 = the argument, 2 = the result
+#   fan: 0 = the shared side, 1 and 2 = the two copies
+#   erase and free variables use slot 0 only.
+_ROOT, _LAM, _APP, _DUP, _ERA, _FREE = range(6)
+
+_BINDER, _SPINE = range(2)
+
+
+class _Unsupported(Exception):
+    # Fans of the same label that should have commuted annihilated instead,
+    # leaving a net that is no longer the image of a term.
+    pass
+
+
+def _unsupported():
+    return _Unsupported("Optimal reduction went wrong on this term; "
+                        "it is outside what the abstract algorithm handles")
+
+
+class _Net:
+    def __init__(self, max_steps, watch=None):
+        self.kind = []
+        self.label = []
+        self.name = []
+        self.ports = []
+        self.unused = []
+        self.labels = 0
+        self.steps = 0
+        self.interactions = 0
+        self.max_steps = max_steps
+        self.watch = watch
+        self.read = None
+        self.size = None
+        self.idle = 0
+        self.idle_limit = None
+
+    def node(self, kind, label=0, name=None):
+        if self.unused:
+            n = self.unused.pop()
+            self.kind[n] = kind
+            self.label[n] = label
+            self.name[n] = name
+        else:
+            n = len(self.kind)
+            self.kind.append(kind)
+            self.label.append(label)
+            self.name.append(name)
+            self.ports.extend((None, None, None))
+        return n
+
+    def free(self, n):
+        self.kind[n] = None
+        self.name[n] = None
+        self.unused.append(n)
+
+    def link(self, a, b):
+        self.ports[a] = b
+        self.ports[b] = a
+
+    def share(self, source, uses):
+        # Connects the output at source to every port in uses, through a
+        # chain of fans, each with a label of its own.
+        if not uses:
+            self.link(3 * self.node(_ERA), source)
+            return
+        for use in uses[:-1]:
+            self.labels += 1
+            fan = self.node(_DUP, self.labels)
+            self.link(3 * fan, source)
+            self.link(3 * fan + 1, use)
+            source = 3 * fan + 2
+        self.link(source, uses[-1])
+
+    def interact(self, a, b):
+        kind_a, kind_b = self.kind[a], self.kind[b]
+        if kind_a == _ERA or kind_b == _ERA:
+            if kind_a != _ERA:
+                a, b = b, a
+            self._erase(a, b)
+        elif kind_a == _DUP and kind_b == _DUP:
+            if self.label[a] == self.label[b]:
+                self._annihilate(a, b)
+            else:
+                self._commute(a, b)
+        elif kind_a == _FREE or kind_b == _FREE:
+            if kind_a == _FREE:
+                a, b = b, a
+            self._copy(a, b)
+        elif kind_a == _DUP or kind_b == _DUP:
+            self._commute(a, b)
+        else:
+            self.steps += 1
+            self._annihilate(a, b)
+            self.idle = 0
+            self.idle_limit = None
+        self.interactions += 1
+
+        # Copying and erasing a net terminate, in at most about the square
+        # of its size; copying a broken one can grow it forever.
+        self.idle += 1
+        if self.idle_limit is None:
+            live = len(self.kind) - len(self.unused)
+            self.idle_limit = live * live + 64
+        elif self.idle > self.idle_limit:
+            raise _unsupported()
+
+    def _annihilate(self, a, b):
+        # Peers are read again after the first link, which may have
+        # rewired them when the two ports of a node were joined, as in λx.x.
+        ports = self.ports
+        self.link(ports[3 * a + 1], ports[3 * b + 1])
+        self.link(ports[3 * a + 2], ports[3 * b + 2])
+        self.free(a)
+        self.free(b)
+
+    def _commute(self, a, b):
+        a1 = self.node(self.kind[a], self.label[a], self.name[a])
+        a2 = self.node(self.kind[a], self.label[a], self.name[a])
+        b1 = self.node(self.kind[b], self.label[b], self.name[b])
+        b2 = self.node(self.kind[b], self.label[b], self.name[b])
+        fresh = {3 * a + 1: 3 * b1, 3 * a + 2: 3 * b2, 3 * b + 1: 3 * a1, 3 * b + 2: 3 * a2}
+        for old, new in fresh.items():
+            peer = self.ports[old]
+            self.link(new, fresh.get(peer, peer))
+        self.link(3 * a1 + 1, 3 * b1 + 1)
+        self.link(3 * a1 + 2, 3 * b2 + 1)
+        self.link(3 * a2 + 1, 3 * b1 + 2)
+        self.link(3 * a2 + 2, 3 * b2 + 2)
+        self.free(a)
+        self.free(b)
+
+    def _copy(self, fan, variable):
+        for slot in (1, 2):
+            copy = self.node(_FREE, name=self.name[variable])
+            self.link(3 * copy, self.ports[3 * fan + slot])
+        self.free(fan)
+        self.free(variable)
+
+    def _erase(self, eraser, n):
+        if self.kind[n] in (_LAM, _APP, _DUP):
+            for slot in (1, 2):
+                peer = self.ports[3 * n + slot]
+                if peer // 3 != n:
+                    self.link(3 * self.node(_ERA), peer)
+        self.free(eraser)
+        self.free(n)
+
+    def whnf(self, port):
+        # Reduces the subterm whose output port is connected to port until
+        # it is an abstraction or stuck on a variable, following only the
+        # function positions and shared sides that lead to its head. Returns
+        # False if a β-interaction was due after max_steps of them.
+        kind = self.kind
+        ports = self.ports
+        stack = [port]
+
+        while stack:
+            p = stack[-1]
+            q = ports[p]
+            n, slot = divmod(q, 3)
+
+            if slot == 0:
+                m = p // 3
+                if p % 3 != 0 or kind[m] == _ROOT:
+                    return True
+                pair = (kind[m], kind[n])
+                if pair == (_APP, _FREE):
+                    return True
+                if pair in ((_APP, _LAM), (_LAM, _APP)):
+                    if self.steps >= self.max_steps:
+                        return False
+                    if self.watch is not None and self.watch(self.steps, self.read, self.size):
+                        # Stopping is running out of steps here.
+                        self.max_steps = self.steps
+                        return False
+                self.interact(m, n)
+                stack.pop()
+            elif kind[n] == _DUP or (kind[n] == _APP and slot == 2):
+                if len(stack) > len(kind):
+                    raise _unsupported()
+                stack.append(3 * n)
+            else:
+                return True
+
+        return True
+
+
+def _build(net, expr):
+    root = net.node(_ROOT)
+    occurrences = {}
+    scopes = {}
+    free = set()
+    stack = [(expr, 3 * root)]
+
+    while stack:
+        node, dest = stack.pop()
+
+        if node is None:
+            lam = dest
+            scopes[net.name[lam]].pop()
+            net.share(3 * lam + 1, occurrences.pop(lam))
+
+        elif isinstance(node, Variable):
+            binders = scopes.get(node.name)
+            if binders:
+                occurrences[binders[-1]].append(dest)
+            else:
+                free.add(node.name)
+                net.link(3 * net.node(_FREE, name=node.name), dest)
+
+        elif isinstance(node, Global):
+            # Each use gets a copy of its own. Sharing one net between all
+            # uses is like binding the definition with a λ, and lets fans of
+            # the same label meet where they should commute, as in POW TWO TWO.
+            stack.append((node.definition, dest))
+
+        elif isinstance(node, Abstraction):
+            lam = net.node(_LAM, name=node.param)
+            net.link(3 * lam, dest)
+            occurrences[lam] = []
+            scopes.setdefault(node.param, []).append(lam)
+            stack.append((None, lam))
+            stack.append((node.body, 3 * lam + 2))
+
+        elif isinstance(node, Application):
+            app = net.node(_APP)
+            net.link(3 * app + 2, dest)
+            stack.append((node.right, 3 * app + 1))
+            stack.append((node.left, 3 * app))
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return 3 * root, free
+
+
+def _readback(net, port, free, live):
+    # Fans met on the way down are remembered per path: a copy entered
+    # through slot i of a fan leaves the matching fan, met from its shared
+    # side further down, through the same slot. No path through the image
+    # of a term enters more fans than the net has nodes; in a net broken by
+    # a wrong annihilation one can go round a cycle of fans endlessly.
+    kind = net.kind
+    ports = net.ports
+    out = []
+    stack = [(port, None, {})]
+
+    while stack:
+        item = stack.pop()
+
+        # Ports are numbers too, so markers are told apart by their length.
+        if len(item) < 3:
+            if item[0] is _BINDER:
+                out.append(Abstraction(item[1], out.pop()))
+            else:
+                right = out.pop()
+                out.append(Application(out.pop(), right))
+            continue
+
+        p, fans, env = item
+        if live and (p % 3 != 0 or kind[p // 3] == _ROOT):
+            live = net.whnf(p)
+        n, slot = divmod(ports[p], 3)
+        k = kind[n]
+
+        if k == _LAM and slot == 0:
+            name = fresh_name(net.name[n], free.union(env.values()))
+            scope = dict(env)
+            scope[n] = name
+            stack.append((_BINDER, name))
+            stack.append((3 * n + 2, fans, scope))
+        elif k == _LAM and slot == 1 and n in env:
+            out.append(Variable(env[n]))
+        elif k == _APP and slot == 2:
+            stack.append((_SPINE,))
+            stack.append((3 * n + 1, fans, env))
+            stack.append((3 * n, fans, env))
+        elif k == _DUP and slot != 0:
+            depth = fans[3] + 1 if fans is not None else 1
+            if depth > len(kind):
+                raise _unsupported()
+            stack.append((3 * n, (net.label[n], slot, fans, depth), env))
+        elif k == _DUP:
+            skipped = []
+            while fans is not None and fans[0] != net.label[n]:
+                skipped.append(fans[:2])
+                fans = fans[2]
+            if fans is None:
+                raise _unsupported()
+            exit_slot, fans = fans[1], fans[2]
+            for label, entered in reversed(skipped):
+                fans = (label, entered, fans, fans[3] + 1 if fans is not None else 1)
+            stack.append((3 * n + exit_slot, fans, env))
+        elif k == _FREE:
+            out.append(Variable(net.name[n]))
+        else:
+            raise _unsupported()
+
+    return out[0], live
+
+
+def optimal_normalize(expr, max_steps=1000, stats=None, watch=None):
+    """Normal form of expr by optimal reduction; steps counts β-interactions.
+    watch is called as in krivine_normalize, before every β-interaction;
+    read() returns the term the net stands for, and None for the redex.
+
+    A term the abstract algorithm cannot reduce is returned as it was,
+    not converged, with stats['unsupported'] set."""
+    net = _Net(max_steps, watch)
+    root, free = _build(net, expr)
+    # The net is read without reducing it, which leaves it as it was.
+    net.read = lambda: (_readback(net, root, free, False)[0], None)
+    net.size = lambda: net.read()[0].size()
+    try:
+        result, finished = _readback(net, root, free, True)
+        unsupported = False
+    except _Unsupported:
+        result, finished, unsupported = expr, False, True
+    if stats is not None:
+        stats['steps'] = net.steps
+        stats['interactions'] = net.interactions
+        stats['unsupported'] = unsupported
+    return result, net.steps, finished and net.steps < max_steps
@@ -0,0 +1,187 @@
+import sys
+import time
+
+from lambda_calculus.syntax import Abstraction, Application
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.divergence import DivergenceDetector
+from lambda_calculus.machine import krivine_normalize, need_normalize
+from lambda_calculus.interaction import optimal_normalize
+from lambda_calculus.encodings import ChurchNumeral
+
+
+_WATCHED = {
+    "machine": krivine_normalize,
+    "need": need_normalize,
+    "optimal": optimal_normalize,
+}
+
+
+class EvaluationResult:
+    __slots__ = ('expr', 'steps', 'converged', 'limit', 'elapsed', 'cycle')
+
+    def __init__(self, expr, steps, converged, limit, elapsed, cycle=None):
+        self.expr = expr
+        self.steps = steps
+        self.converged = converged
+        self.limit = limit
+        self.elapsed = elapsed
+        self.cycle = cycle
+
+    def __iter__(self):
+        return iter((self.expr, self.steps, self.converged))
+
+    def __repr__(self):
+        cycle = f", cycle={self.cycle}" if self.cycle is not None else ""
+        return (f"EvaluationResult(steps={self.steps}, converged={self.converged}, "
+                f"limit={self.limit!r}{cycle}, size={self.expr.size()}, "
+                f"elapsed={self.elapsed:.6f})")
+
+
+def approximate_memory(expr):
+    # Bytes held by the distinct nodes of the term and their cached
+    # free-variable sets; shared subterms are counted once.
+    seen = set()
+    total = 0
+    stack = [expr]
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += sys.getsizeof(node)
+
+        free = node._free_variables
+        if free and id(free) not in seen:
+            seen.add(id(free))
+            total += sys.getsizeof(free)
+
+        if isinstance(node, ChurchNumeral):
+            total += sys.getsizeof(node.value)
+            if node._body is not None:
+                stack.append(node._body)
+        elif isinstance(node, Abstraction):
+            stack.append(node.body)
+        elif isinstance(node, Application):
+            stack.append(node.right)
+            stack.append(node.left)
+
+    return total
+
+
+class _Monitor:
+    def __init__(self, max_nodes, max_memory, deadline, cancel, check_every, divergence,
+                 progress):
+        self.max_nodes = max_nodes
+        self.max_memory = max_memory
+        self.deadline = deadline
+        self.cancel = cancel
+        self.check_every = check_every
+        self.divergence = divergence
+        self.progress = progress
+        self.next_memory_check = 0
+        self.next_progress = check_every
+        self.next_check = 0
+        self.limit = None
+
+    def check(self, term, steps):
+        if self.cancel is not None and self.cancel.is_set():
+            return 'cancelled'
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return 'deadline'
+        if self.max_nodes is not None and term is not None and term.size() > self.max_nodes:
+            return 'nodes'
+        # Measuring memory walks the whole term, so it is sampled.
+        if self.max_memory is not None and steps >= self.next_memory_check:
+            self.next_memory_check = steps + self.check_every
+            if approximate_memory(term) > self.max_memory:
+                return 'memory'
+        if self.progress is not None and steps >= self.next_progress:
+            self.next_progress = steps + self.check_every
+            self.progress(steps, term)
+        return None
+
+    def __call__(self, event):
+        self.limit = self.check(event.term, event.step)
+        if self.limit is None and self.divergence is not None:
+            self.limit = self.divergence.observe(event.term, event.redex)
+        return self.limit is not None
+
+    def watch(self, steps, read, size):
+        # Called by the machines before every step. Reading the term back
+        # costs as much as the term is large, so without divergence
+        # detection it is only done every check_every steps, and only for
+        # the limits that look at it.
+        term = redex = None
+        if steps >= self.next_check:
+            self.next_check = steps + self.check_every
+            if (self.max_memory is not None or self.progress is not None
+                    or self.divergence is not None):
+                term, redex = read()
+            elif self.max_nodes is not None and size() > self.max_nodes:
+                self.limit = 'nodes'
+                return True
+            self.limit = self.check(term, steps)
+        if self.limit is None and self.divergence is not None:
+            if term is None:
+                term, redex = read()
+            self.limit = self.divergence.observe(term, redex)
+        return self.limit is not None
+
+
+def evaluate(expr, strategy="normal", max_steps=1000, max_nodes=None, max_memory=None,
+             timeout=None, cancel=None, check_every=100, detect_divergence=False,
+             progress=None):
+    start = time.monotonic()
+    deadline = start + timeout if timeout is not None else None
+    divergence = DivergenceDetector() if detect_divergence else None
+    monitor = _Monitor(max_nodes, max_memory, deadline, cancel, check_every, divergence,
+                       progress)
+
+    limit = monitor.check(expr, 0)
+    if limit is not None:
+        return EvaluationResult(expr, 0, False, limit, time.monotonic() - start)
+
+    stats = {}
+    if (max_nodes is None and max_memory is None and deadline is None and cancel is None
+            and divergence is None and progress is None):
+        reduced, steps, converged = reduce_to_normal_form(expr, strategy, max_steps, stats)
+    elif divergence is not None and strategy in ("normal", "applicative"):
+        # Growth is recognized from the redex of every step, which only an
+        # observer sees; building its events slows each step down.
+        reduced, steps, converged = reduce_to_normal_form(
+            expr, strategy, max_steps, observer=monitor
+        )
+        limit = monitor.limit
+    elif strategy in _WATCHED:
+        # The machines check as they go, keeping their sharing.
+        reduced, steps, converged = _WATCHED[strategy](expr, max_steps, stats,
+                                                       watch=monitor.watch)
+        limit = monitor.limit
+    else:
+        # The other engines are stopped and resumed from the partial term,
+        # which they carry no state across. With divergence detection the
+        # slices are single steps, so that a cycle is measured exactly.
+        reduced = expr
+        steps = 0
+        slice_steps = 1 if divergence is not None else check_every
+        next_check = check_every
+        while True:
+            budget = min(slice_steps, max_steps - steps)
+            reduced, taken, converged = reduce_to_normal_form(reduced, strategy, budget)
+            steps += taken
+            if converged or steps >= max_steps:
+                break
+            if steps >= next_check:
+                next_check = steps + check_every
+                limit = monitor.check(reduced, steps)
+            if limit is None and divergence is not None:
+                limit = divergence.observe(reduced, steps=taken)
+            if limit is not None:
+                break
+
+    if limit is None and not converged:
+        # Optimal reduction gives up on terms outside what it handles.
+        limit = 'unsupported' if stats.get('unsupported') else 'steps'
+    cycle = divergence.cycle if divergence is not None else None
+    return EvaluationResult(reduced, steps, converged, limit, time.monotonic() - start, cycle)
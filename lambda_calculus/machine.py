@@ -0,0 +1,421 @@
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global, fresh_name
+
+
+_VAR, _FREE, _LAM, _APP, _GLOBAL = range(5)
+
+_BINDER, _SPINE, _VALUE, _UPDATE = range(4)
+
+
+class Closure:
+    __slots__ = ('term', 'env')
+
+    def __init__(self, term, env):
+        self.term = term
+        self.env = env
+
+
+class Thunk:
+    __slots__ = ('term', 'env', 'value')
+
+    def __init__(self, term, env):
+        self.term = term
+        self.env = env
+        self.value = None
+
+
+class Neutral:
+    __slots__ = ('head', 'args')
+
+    def __init__(self, head, args):
+        self.head = head
+        self.args = args
+
+
+class Level:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+def compile_term(expr):
+    scopes = {}
+    depth = 0
+    out = []
+    stack = [(expr, True)]
+
+    while stack:
+        node, entering = stack.pop()
+
+        if isinstance(node, Variable):
+            levels = scopes.get(node.name)
+            if levels:
+                out.append((_VAR, depth - levels[-1] - 1))
+            else:
+                out.append((_FREE, node.name))
+
+        elif isinstance(node, Global):
+            out.append((_GLOBAL, node))
+
+        elif isinstance(node, Abstraction):
+            if entering:
+                scopes.setdefault(node.param, []).append(depth)
+                depth += 1
+                stack.append((node, False))
+                stack.append((node.body, True))
+            else:
+                depth -= 1
+                scopes[node.param].pop()
+                out.append((_LAM, node.param, out.pop()))
+
+        elif isinstance(node, Application):
+            if entering:
+                stack.append((node, False))
+                stack.append((node.right, True))
+                stack.append((node.left, True))
+            else:
+                right = out.pop()
+                out.append((_APP, out.pop(), right))
+
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return out[0]
+
+
+def free_names(term):
+    names = set()
+    stack = [term]
+    while stack:
+        node = stack.pop()
+        tag = node[0]
+        if tag == _FREE:
+            names.add(node[1])
+        elif tag == _GLOBAL:
+            names |= node[1].free_variables()
+        elif tag == _LAM:
+            stack.append(node[2])
+        elif tag == _APP:
+            stack.append(node[1])
+            stack.append(node[2])
+    return names
+
+
+def _lookup(env, index):
+    for _ in range(index):
+        env = env[1]
+    return env[0]
+
+
+def _quote(task, used):
+    out = []
+    stack = [task]
+
+    while stack:
+        item = stack.pop()
+        kind = item[0]
+
+        if kind is _BINDER:
+            used.discard(item[1])
+            out.append(Abstraction(item[1], out.pop()))
+            continue
+        if kind is _SPINE:
+            right = out.pop()
+            out.append(Application(out.pop(), right))
+            continue
+        if kind is _VALUE:
+            value = item[1]
+            if isinstance(value, Thunk) and value.value is not None:
+                value = value.value
+            if isinstance(value, Level):
+                out.append(Variable(value.name))
+            elif isinstance(value, Neutral):
+                out.append(value.head)
+                for arg in reversed(value.args):
+                    stack.append((_SPINE,))
+                    stack.append((_VALUE, arg))
+            else:
+                stack.append((value.term, value.env))
+            continue
+
+        node, env = item
+        tag = node[0]
+
+        if tag == _VAR:
+            stack.append((_VALUE, _lookup(env, node[1])))
+        elif tag == _FREE:
+            out.append(Variable(node[1]))
+        elif tag == _GLOBAL:
+            out.append(node[1])
+        elif tag == _LAM:
+            name = fresh_name(node[1], used)
+            used.add(name)
+            stack.append((_BINDER, name))
+            stack.append((node[2], (Level(name), env)))
+        else:
+            stack.append((_SPINE,))
+            stack.append((node[2], env))
+            stack.append((node[1], env))
+
+    return out[0]
+
+
+def _readback_state(term, env, args, frames, used):
+    return _readback_redex(term, env, args, frames, used)[0]
+
+
+def _readback_redex(term, env, args, frames, used):
+    # The whole term, and within it the application of term to its first
+    # argument, which is the next redex when term is an abstraction.
+    expr = _quote((term, env), used)
+    redex = None
+    for arg in reversed(args):
+        expr = Application(expr, _quote((_VALUE, arg), used))
+        if redex is None:
+            redex = expr
+
+    for frame in reversed(frames):
+        kind = frame[0]
+        if kind is _BINDER:
+            expr = Abstraction(frame[1].name, expr)
+        elif kind is _UPDATE:
+            for arg in reversed(frame[2]):
+                expr = Application(expr, _quote((_VALUE, arg), used))
+        else:
+            _, head, pending, index = frame
+            expr = Application(head, expr)
+            for arg in pending[index + 1:]:
+                expr = Application(expr, _quote((_VALUE, arg), used))
+
+    return expr, redex
+
+
+def _state_size(term, env, args, frames):
+    # The size of the term _readback_state would build, without building
+    # it. Values are shared between closures, so each is measured once.
+    memo = {}
+    total = _closure_size(term, env, memo)
+    for arg in args:
+        total += 1 + _value_size(arg, memo)
+    for frame in frames:
+        kind = frame[0]
+        if kind is _BINDER:
+            total += 1
+        elif kind is _UPDATE:
+            for arg in frame[2]:
+                total += 1 + _value_size(arg, memo)
+        else:
+            _, head, pending, index = frame
+            total += 1 + head.size()
+            for arg in pending[index + 1:]:
+                total += 1 + _value_size(arg, memo)
+    return total
+
+
+def _value_size(root, memo):
+    stack = [root]
+    while stack:
+        value = _value(stack[-1])
+        if id(value) in memo:
+            stack.pop()
+            continue
+        if isinstance(value, Level):
+            size = 1
+        elif isinstance(value, Neutral):
+            missing = [arg for arg in value.args if id(_value(arg)) not in memo]
+            if missing:
+                stack.extend(missing)
+                continue
+            size = 1 + sum(1 + memo[id(_value(arg))] for arg in value.args)
+        else:
+            size = _closure_size(value.term, value.env, memo, stack)
+            if size is None:
+                continue
+        memo[id(value)] = size
+        stack.pop()
+    return memo[id(_value(root))]
+
+
+def _value(value):
+    # What _quote reads in place of an evaluated thunk.
+    if isinstance(value, Thunk) and value.value is not None:
+        return value.value
+    return value
+
+
+def _closure_size(term, env, memo, pending=None):
+    # Without pending, the values term refers to are measured first; with
+    # it, the ones not yet measured are added to it and None is returned.
+    size = 0
+    missing = False
+    stack = [(term, 0)]
+    while stack:
+        node, depth = stack.pop()
+        tag = node[0]
+        if tag == _VAR:
+            if node[1] < depth:
+                size += 1
+                continue
+            value = _lookup(env, node[1] - depth)
+            known = memo.get(id(_value(value)))
+            if known is None:
+                if pending is None:
+                    known = _value_size(value, memo)
+                else:
+                    pending.append(value)
+                    missing = True
+                    continue
+            size += known
+        elif tag == _LAM:
+            size += 1
+            stack.append((node[2], depth + 1))
+        elif tag == _APP:
+            size += 1
+            stack.append((node[2], depth))
+            stack.append((node[1], depth))
+        else:
+            size += 1
+    return None if missing else size
+
+
+class _Globals:
+    # Each definition is compiled once per run. With sharing, every use of
+    # a definition refers to one thunk, so it is evaluated at most once.
+    def __init__(self, share):
+        self.share = share
+        self.values = {}
+
+    def __getitem__(self, definition):
+        entry = self.values.get(id(definition))
+        if entry is None:
+            term = compile_term(definition.unfold())
+            value = Thunk(term, None) if self.share else Closure(term, None)
+            entry = self.values[id(definition)] = (definition, value)
+        return entry[1]
+
+
+def _normalize(expr, max_steps, share, watch=None):
+    term = compile_term(expr)
+    used = free_names(term)
+    delayed = Thunk if share else Closure
+    definitions = _Globals(share)
+
+    env = None
+    args = []
+    frames = []
+    steps = 0
+    updates = 0
+
+    def read():
+        return _readback_redex(term, env, args, frames, used)
+
+    def size():
+        return _state_size(term, env, args, frames)
+
+    while True:
+        tag = term[0]
+
+        if tag == _APP:
+            arg = term[2]
+            if arg[0] == _VAR:
+                args.append(_lookup(env, arg[1]))
+            elif arg[0] == _GLOBAL:
+                args.append(definitions[arg[1]])
+            else:
+                args.append(delayed(arg, env))
+            term = term[1]
+            continue
+
+        if tag == _LAM:
+            if args:
+                if steps >= max_steps or (watch is not None and watch(steps, read, size)):
+                    expr = _readback_state(term, env, args, frames, used)
+                    return expr, steps, False, updates
+                env = (args.pop(), env)
+                term = term[2]
+                steps += 1
+                continue
+
+            if frames and frames[-1][0] is _UPDATE:
+                _, thunk, args = frames.pop()
+                thunk.value = Closure(term, env)
+                updates += 1
+                continue
+
+            level = Level(fresh_name(term[1], used))
+            used.add(level.name)
+            frames.append((_BINDER, level))
+            env = (level, env)
+            term = term[2]
+            continue
+
+        if tag == _VAR or tag == _GLOBAL:
+            if tag == _VAR:
+                value = _lookup(env, term[1])
+            else:
+                value = definitions[term[1]]
+            if isinstance(value, Thunk):
+                if value.value is None:
+                    frames.append((_UPDATE, value, args))
+                    term, env, args = value.term, value.env, []
+                    continue
+                value = value.value
+                if isinstance(value, Neutral):
+                    args.extend(reversed(value.args))
+            if isinstance(value, Closure):
+                term, env = value.term, value.env
+                continue
+            result = value.head if isinstance(value, Neutral) else Variable(value.name)
+        else:
+            result = Variable(term[1])
+
+        while frames and frames[-1][0] is _UPDATE:
+            _, thunk, saved = frames.pop()
+            thunk.value = Neutral(result, args[::-1])
+            updates += 1
+            args = saved + args
+
+        if args:
+            args.reverse()
+            frames.append([_SPINE, result, args, 0])
+            term, env, args = (_VAR, 0), (args[0], None), []
+            continue
+
+        while frames:
+            frame = frames[-1]
+            if frame[0] is _BINDER:
+                frames.pop()
+                used.discard(frame[1].name)
+                result = Abstraction(frame[1].name, result)
+                continue
+
+            frame[1] = Application(frame[1], result)
+            frame[3] += 1
+            if frame[3] < len(frame[2]):
+                term, env = (_VAR, 0), (frame[2][frame[3]], None)
+                break
+            frames.pop()
+            result = frame[1]
+        else:
+            return result, steps, steps < max_steps, updates
+
+
+def krivine_normalize(expr, max_steps=1000, stats=None, watch=None):
+    """Normal form of expr on an environment machine. watch, if given, is
+    called as watch(steps, read, size) before every β-step: read() returns
+    the current term and the redex about to be contracted in it, and size()
+    the size of that term without building it. Returning True stops the
+    reduction there."""
+    result, steps, converged, _ = _normalize(expr, max_steps, False, watch)
+    if stats is not None:
+        stats['steps'] = steps
+    return result, steps, converged
+
+
+def need_normalize(expr, max_steps=1000, stats=None, watch=None):
+    """As krivine_normalize, sharing the value of every argument."""
+    result, steps, converged, updates = _normalize(expr, max_steps, True, watch)
+    if stats is not None:
+        stats['steps'] = steps
+        stats['updates'] = updates
+    return result, steps, converged
@@ -3,81 +3,172 @@ from lambda_calculus.syntax import Variable, Abstraction, Application
 
 
 class ParseError(Exception):
-    pass
-
-
-class Parser:    
-    def __init__(self):
-        self.lambda_symbol_pattern = r'[λ\\]'
-        self.variable_pattern = r'[a-zA-Z][a-zA-Z0-9_]*'
-        self.token_pattern = re.compile(
-            f'{self.lambda_symbol_pattern}|'
-            r'\.|'   
-            r'\(|\)|'
-            f'{self.variable_pattern}'
-        )
-    
+    def __init__(self, message, line=None, column=None):
+        if line is not None:
+            message = f"{message} at line {line}, column {column}"
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+
+class Parser:
+    lambda_symbol_pattern = r'[λ\\]'
+    variable_pattern = r'[a-zA-Z][a-zA-Z0-9_]*'
+    token_pattern = re.compile(
+        r'(?P<newline>\n)|'
+        r'(?P<space>[ \t\r\f\v]+)|'
+        r'(?P<comment>#[^\n]*)|'
+        f'(?P<lambda>{lambda_symbol_pattern})|'
+        r'(?P<symbol>[.()=;])|'
+        f'(?P<name>{variable_pattern})|'
+        r'(?P<error>.)'
+    )
+
+    def iter_tokens(self, input_string, line=1):
+        line_start = 0
+        for match in self.token_pattern.finditer(input_string):
+            kind = match.lastgroup
+            if kind == 'name':
+                yield ('name', match.group(), line, match.start() - line_start + 1)
+            elif kind == 'symbol':
+                text = match.group()
+                yield (text, text, line, match.start() - line_start + 1)
+            elif kind == 'lambda':
+                yield ('λ', match.group(), line, match.start() - line_start + 1)
+            elif kind == 'newline':
+                line += 1
+                line_start = match.end()
+            elif kind == 'error':
+                raise ParseError(f"Unexpected character: {match.group()}",
+                                 line, match.start() - line_start + 1)
+        yield ('eof', '', line, len(input_string) - line_start + 1)
+
+    def iter_stream_tokens(self, stream):
+        line = 0
+        text = ''
+        for line, text in enumerate(stream, 1):
+            for token in self.iter_tokens(text, line):
+                if token[0] != 'eof':
+                    yield token
+        if text.endswith('\n'):
+            yield ('eof', '', line + 1, 1)
+        else:
+            yield ('eof', '', max(line, 1), len(text) + 1)
+
     def tokenize(self, input_string):
-        tokens = self.token_pattern.findall(input_string)
-        tokens = [token.strip() for token in tokens if token.strip()]
-        return tokens
-    
+        return [token[1] for token in self.iter_tokens(input_string) if token[0] != 'eof']
+
     def parse(self, input_string):
-        tokens = self.tokenize(input_string)
-        if not tokens:
-            raise ParseError("Empty input")
-        expr, remaining = self._parse_expr(tokens)
-        if remaining:
-            raise ParseError(f"Unexpected tokens at end: {' '.join(remaining)}")
-        
+        tokens = self.iter_tokens(input_string)
+        expr, end = self._parse_expression(tokens)
+        if end[0] != 'eof':
+            rest = [end[1]] + [token[1] for token in tokens if token[0] != 'eof']
+            raise ParseError(f"Unexpected tokens at end: {' '.join(rest)}", end[2], end[3])
         return expr
-    
-    def _parse_expr(self, tokens):
-        if not tokens:
-            raise ParseError("Unexpected end of input")
-        left, tokens = self._parse_atom(tokens)
-        while tokens and tokens[0] not in [')', '.']:
-            right, tokens = self._parse_atom(tokens)
-            left = Application(left, right)
-        
-        return left, tokens
-    
-    def _parse_atom(self, tokens):
-        if not tokens:
-            raise ParseError("Unexpected end of input")
-        
-        token = tokens[0]
-        
-        if token == '(':
-            _, tokens = tokens[0], tokens[1:]
-            expr, tokens = self._parse_expr(tokens)
-            if not tokens or tokens[0] != ')':
-                raise ParseError("Missing closing parenthesis")
-            _, tokens = tokens[0], tokens[1:]
-            
-            return expr, tokens
-        
-        elif token == 'λ' or token == '\\':
-            _, tokens = tokens[0], tokens[1:]
-            if not tokens or not re.match(self.variable_pattern, tokens[0]):
-                raise ParseError("Expected variable after lambda")
-            
-            param, tokens = tokens[0], tokens[1:]
-            
-            if not tokens or tokens[0] != '.':
-                raise ParseError("Expected dot after lambda parameter")
-            
-            _, tokens = tokens[0], tokens[1:]
-            
-            body, tokens = self._parse_expr(tokens)
-            
-            return Abstraction(param, body), tokens
-        elif re.match(self.variable_pattern, token):
-            return Variable(token), tokens[1:]
+
+    def iter_definitions(self, stream):
+        tokens = self.iter_stream_tokens(stream)
+
+        for token in tokens:
+            kind = token[0]
+            if kind == 'eof':
+                return
+            if kind == ';':
+                continue
+            if kind != 'name':
+                raise ParseError(f"Expected definition name, got: {token[1]}", token[2], token[3])
+
+            equals = next(tokens)
+            if equals[0] != '=':
+                raise ParseError("Expected '=' after definition name", equals[2], equals[3])
+
+            expr, end = self._parse_expression(tokens, terminator=';')
+            if end[0] not in ('eof', ';'):
+                raise ParseError(f"Unexpected token: {end[1]}", end[2], end[3])
+
+            yield token[1], expr
+
+            if end[0] == 'eof':
+                return
+
+    def _parse_expression(self, tokens, terminator=None):
+        # Each frame is [kind, accumulated application, lambda parameter].
+        frames = [['top', None, None]]
+
+        for token in tokens:
+            kind = token[0]
+            frame = frames[-1]
+
+            if kind == 'name':
+                self._add_atom(frame, Variable(token[1]))
+
+            elif kind == '(':
+                frames.append(['paren', None, None])
+
+            elif kind == 'λ':
+                param = next(tokens)
+                if param[0] != 'name':
+                    raise ParseError("Expected variable after lambda", param[2], param[3])
+
+                dot = next(tokens)
+                if dot[0] != '.':
+                    raise ParseError("Expected dot after lambda parameter", dot[2], dot[3])
+
+                frames.append(['lambda', None, param[1]])
+
+            elif kind == 'eof' or kind == terminator:
+                if frame[1] is None:
+                    if kind == 'eof' and len(frames) == 1:
+                        raise ParseError("Empty input", token[2], token[3])
+                    raise ParseError("Unexpected end of input", token[2], token[3])
+
+                frame = self._close_lambdas(frames)
+                if frame[0] == 'paren':
+                    raise ParseError("Missing closing parenthesis", token[2], token[3])
+
+                return frame[1], token
+
+            elif kind == ')' or kind == '.':
+                if frame[1] is None:
+                    raise ParseError(f"Unexpected token: {token[1]}", token[2], token[3])
+
+                frame = self._close_lambdas(frames)
+                if kind == ')' and frame[0] == 'paren':
+                    frames.pop()
+                    self._add_atom(frames[-1], frame[1])
+                elif frame[0] == 'paren':
+                    raise ParseError("Missing closing parenthesis", token[2], token[3])
+                else:
+                    return frame[1], token
+
+            else:
+                raise ParseError(f"Unexpected token: {token[1]}", token[2], token[3])
+
+        raise ParseError("Unexpected end of input")
+
+    def _add_atom(self, frame, atom):
+        if frame[1] is None:
+            frame[1] = atom
         else:
-            raise ParseError(f"Unexpected token: {token}")
+            frame[1] = Application(frame[1], atom)
+
+    def _close_lambdas(self, frames):
+        while frames[-1][0] == 'lambda':
+            _, body, param = frames.pop()
+            self._add_atom(frames[-1], Abstraction(param, body))
+        return frames[-1]
+
+
+_default_parser = Parser()
 
 
 def parse(input_string):
-    parser = Parser()
-    return parser.parse(input_string)
+    return _default_parser.parse(input_string)
+
+
+def iter_definitions(stream):
+    return _default_parser.iter_definitions(stream)
+
+
+def parse_definitions(input_string):
+    return list(iter_definitions(input_string.splitlines(keepends=True)))
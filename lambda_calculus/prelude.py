@@ -0,0 +1,252 @@
+import marshal
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from lambda_calculus.serialize import FORMAT_VERSION, dumps, loads
+
+
+SOURCE = """\
+TRUE = λx.λy.x;
+FALSE = λx.λy.y;
+
+AND = λp.λq.p q p;
+OR = λp.λq.p p q;
+NOT = λp.λa.λb.p b a;
+IF_THEN_ELSE = λp.λa.λb.p a b;
+
+ZERO = λf.λx.x;
+ONE = λf.λx.f x;
+TWO = λf.λx.f (f x);
+THREE = λf.λx.f (f (f x));
+
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.λf.λx.m f (n f x);
+MULT = λm.λn.λf.m (n f);
+POW = λm.λn.n m;
+PRED = λn.λf.λx.n (λg.λh.h (g f)) (λu.x) (λu.u);
+SUB = λm.λn.n PRED m;
+
+IS_ZERO = λn.n (λx.FALSE) TRUE;
+LEQ = λm.λn.IS_ZERO (SUB m n);
+EQ = λm.λn.AND (LEQ m n) (LEQ n m);
+
+PAIR = λx.λy.λf.f x y;
+FIRST = λp.p (λx.λy.x);
+SECOND = λp.p (λx.λy.y);
+
+NIL = λx.TRUE;
+IS_NIL = λl.l (λh.λt.λd.FALSE);
+CONS = λh.λt.λc.c h t;
+HEAD = λl.l (λh.λt.h);
+TAIL = λl.l (λh.λt.t);
+"""
+
+# magic, serialized expression format, source checksum, source length,
+# length of the marshalled index that follows the header.
+_HEADER = struct.Struct('<8sIIII')
+_MAGIC = b'LCPRELUD'
+
+
+def _checksum(source):
+    # crc32 rather than hashlib: importing hashlib costs more than the
+    # parsing this cache exists to avoid.
+    data = source.encode('utf-8')
+    return zlib.crc32(data), len(data)
+
+
+def default_path():
+    directory = os.environ.get('LAMBDA_CALCULUS_CACHE_DIR')
+    if directory is None:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(base, 'lambda_calculus')
+    if not directory:
+        return None
+    return os.path.join(directory, f"prelude-py{sys.version_info[0]}{sys.version_info[1]}.bin")
+
+
+class Prelude:
+    def __init__(self, source=SOURCE, path=None):
+        self.source = source
+        self.path = default_path() if path is None else path
+        self.compiled = False
+        self._checksum = _checksum(source)
+        self._data = b''
+        self._mmap = None
+        self._entries = {}
+        self._standard = ()
+        self._user = ()
+        self._decoded = {}
+        self._open()
+
+    def _open(self):
+        stored = self._read()
+        if stored == self._checksum:
+            return
+
+        # Missing or stale: recompile the source, keeping any user
+        # definitions, which do not depend on it.
+        user = {}
+        if stored is not None:
+            user = {name: self._blob(name) for name in self._user}
+        self._compile(user)
+
+    def _read(self):
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, crc, length, index_size = _HEADER.unpack_from(mapped, 0)
+            if magic != _MAGIC or version != FORMAT_VERSION:
+                raise ValueError("Not a compiled prelude")
+            start = _HEADER.size + index_size
+            standard, user, entries = marshal.loads(mapped[_HEADER.size:start])
+        except (struct.error, ValueError, EOFError, TypeError):
+            mapped.close()
+            return None
+
+        self._close()
+        self._mmap = mapped
+        self._data = mapped
+        self._standard = tuple(standard)
+        self._user = tuple(user)
+        self._entries = {name: (start + offset, size) for name, (offset, size) in entries.items()}
+        self._decoded = {}
+        return (crc, length)
+
+    def _compile(self, user):
+        from lambda_calculus.parser import iter_definitions
+
+        definitions = list(iter_definitions(self.source.splitlines(keepends=True)))
+        blobs = {name: dumps(expr) for name, expr in definitions}
+        standard = tuple(name for name, _ in definitions)
+        user = {name: blob for name, blob in user.items() if name not in blobs}
+        blobs.update(user)
+
+        self._load_blobs(standard, tuple(user), blobs)
+        self._decoded = dict(definitions)
+        self.compiled = True
+        self._write(standard, tuple(user), blobs)
+
+    def _load_blobs(self, standard, user, blobs):
+        data = bytearray()
+        entries = {}
+        for name, blob in blobs.items():
+            entries[name] = (len(data), len(blob))
+            data += blob
+        self._close()
+        self._data = bytes(data)
+        self._entries = entries
+        self._standard = standard
+        self._user = user
+
+    def _write(self, standard, user, blobs):
+        if self.path is None:
+            return False
+
+        data = bytearray()
+        entries = {}
+        for name, blob in blobs.items():
+            entries[name] = (len(data), len(blob))
+            data += blob
+        index = marshal.dumps((standard, user, entries))
+        header = _HEADER.pack(_MAGIC, FORMAT_VERSION, *self._checksum, len(index))
+
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                f.write(header)
+                f.write(index)
+                f.write(data)
+            self._close()
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _close(self):
+        if self._mmap is not None:
+            self._data = bytes(self._data)
+            self._mmap.close()
+            self._mmap = None
+
+    def _blob(self, name):
+        offset, size = self._entries[name]
+        return bytes(self._data[offset:offset + size])
+
+    def __getitem__(self, name):
+        expr = self._decoded.get(name)
+        if expr is None:
+            offset, size = self._entries[name]
+            expr = self._decoded[name] = loads(self._data[offset:offset + size])
+        return expr
+
+    def get(self, name, default=None):
+        if name not in self._entries:
+            return default
+        return self[name]
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def standard_names(self):
+        return self._standard
+
+    @property
+    def user_names(self):
+        return self._user
+
+    def define(self, name, expr):
+        if name in self._standard:
+            raise ValueError(f"Cannot redefine standard definition: {name}")
+        return self._update(name, dumps(expr), expr)
+
+    def forget(self, name):
+        if name not in self._user:
+            raise KeyError(name)
+        return self._update(name, None, None)
+
+    def _update(self, name, blob, expr):
+        blobs = {existing: self._blob(existing) for existing in self._entries if existing != name}
+        user = tuple(existing for existing in self._user if existing != name)
+        if blob is not None:
+            blobs[name] = blob
+            user += (name,)
+
+        decoded = {key: value for key, value in self._decoded.items() if key != name}
+        if expr is not None:
+            decoded[name] = expr
+
+        persisted = self._write(self._standard, user, blobs)
+        self._load_blobs(self._standard, user, blobs)
+        self._decoded = decoded
+        return persisted
+
+
+_default = None
+
+
+def load_prelude():
+    global _default
+    if _default is None:
+        _default = Prelude()
+    return _default
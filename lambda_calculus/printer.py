@@ -0,0 +1,293 @@
+import io
+
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global
+from lambda_calculus.encodings import ChurchNumeral
+
+
+_BUFFER = 1 << 16
+_ELLIPSIS = "…"
+_CONFLICT = object()
+
+
+def write_expr(expr, out, max_depth=None, max_width=None, share=False, min_shared_size=4):
+    """Write expr to the text file out in chunks; returns the number of
+    characters written."""
+    lets = _shared_bindings(expr, min_shared_size) if share else None
+    # Each piece adds at least one character, so a cut output needs no
+    # more pieces than its width.
+    chunk = 4096 if max_width is None else max(1, min(4096, max_width))
+    if max_depth is None and lets is None:
+        pieces = _plain_pieces(expr, chunk)
+    else:
+        pieces = _pieces(expr, max_depth, lets, chunk)
+
+    count = 0
+    buffered = []
+    size = 0
+    for piece in pieces:
+        if max_width is not None and count + len(piece) >= max_width:
+            # Only cut when more than one character is left to print.
+            head = piece[:max_width - 1 - count]
+            rest = piece[len(head):]
+            for piece in pieces:
+                if len(rest) > 1:
+                    break
+                rest += piece
+            buffered.append(head + (rest if len(rest) <= 1 else _ELLIPSIS))
+            count += len(buffered[-1])
+            break
+
+        buffered.append(piece)
+        count += len(piece)
+        size += len(piece)
+        if size >= _BUFFER:
+            out.write("".join(buffered))
+            buffered = []
+            size = 0
+
+    out.write("".join(buffered))
+    return count
+
+
+def format_expr(expr, max_depth=None, max_width=None, share=False, min_shared_size=4):
+    out = io.StringIO()
+    write_expr(expr, out, max_depth, max_width, share, min_shared_size)
+    return out.getvalue()
+
+
+def _plain_pieces(expr, chunk):
+    # The same walk as str(), handing out the text in runs of `chunk`
+    # pieces. Consecutive closing parentheses are kept as one count, so a
+    # right-nested spine such as a numeral or a list needs no stack space
+    # per element.
+    parts = []
+    stack = [expr]
+
+    while stack:
+        if len(parts) >= chunk:
+            yield "".join(parts)
+            parts = []
+        item = stack.pop()
+
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, int):
+            parts.append(")" * item)
+        elif isinstance(item, ChurchNumeral):
+            yield "".join(parts)
+            parts = []
+            yield from _numeral_pieces(item.value)
+        elif isinstance(item, Abstraction):
+            parts.append(f"λ{item.param}.")
+            stack.append(item.body)
+        elif isinstance(item, Application):
+            right = item.right
+            if isinstance(right, (Application, Abstraction)):
+                if stack and isinstance(stack[-1], int):
+                    stack[-1] += 1
+                else:
+                    stack.append(1)
+                stack.extend((right, " ("))
+            else:
+                stack.extend((right, " "))
+            if isinstance(item.left, Abstraction):
+                stack.extend((")", item.left, "("))
+            else:
+                stack.append(item.left)
+        elif isinstance(item, (Variable, Global)):
+            parts.append(str(item))
+        else:
+            raise TypeError(f"Unknown expression type: {type(item)}")
+
+    yield "".join(parts)
+
+
+def _pieces(expr, max_depth, lets, chunk):
+    # As above, keeping the depth of each node and printing shared subterms
+    # by name.
+    names = lets.names if lets is not None else {}
+    parts = []
+    stack = [(expr, 0)]
+    if lets is not None:
+        _push_lets(stack, lets.anchored.get(None), 0)
+
+    while stack:
+        if len(parts) >= chunk:
+            yield "".join(parts)
+            parts = []
+        item = stack.pop()
+
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        if isinstance(item, int):
+            parts.append(")" * item)
+            continue
+
+        node, depth = item
+        name = names.get(id(node))
+        if name is not None and depth >= 0:
+            parts.append(name)
+            continue
+        depth = abs(depth)
+        if max_depth is not None and depth > max_depth:
+            parts.append(_ELLIPSIS)
+            continue
+
+        if isinstance(node, ChurchNumeral):
+            if max_depth is None:
+                yield "".join(parts)
+                parts = []
+                yield from _numeral_pieces(node.value)
+                continue
+            # The numerals deeper than the cut all print alike.
+            node = ChurchNumeral(min(node.value, max_depth - depth + 1))
+
+        if isinstance(node, Abstraction):
+            parts.append(f"λ{node.param}.")
+            stack.append((node.body, depth + 1))
+            if lets is not None:
+                _push_lets(stack, lets.anchored.get(id(node)), depth + 1)
+        elif isinstance(node, Application):
+            left, right = node.left, node.right
+            if isinstance(right, (Application, Abstraction)) and id(right) not in names:
+                if stack and isinstance(stack[-1], int):
+                    stack[-1] += 1
+                else:
+                    stack.append(1)
+                stack.extend(((right, depth + 1), " ("))
+            else:
+                stack.extend(((right, depth + 1), " "))
+            if isinstance(left, Abstraction) and id(left) not in names:
+                stack.extend((")", (left, depth + 1), "("))
+            else:
+                stack.append((left, depth + 1))
+        elif isinstance(node, (Variable, Global)):
+            parts.append(str(node))
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    yield "".join(parts)
+
+
+def _push_lets(stack, bound, depth):
+    # Pushed in reverse, so that the first binding is printed first. A
+    # binding's own term is marked with a negative depth so that it is
+    # written out instead of referred to by name.
+    if not bound:
+        return
+    for name, node in reversed(bound):
+        stack.extend((" in ", (node, -(depth + 1)), f"let {name} = "))
+
+
+def _numeral_pieces(value):
+    yield "λf.λx."
+    if value == 0:
+        yield "x"
+        return
+    for start in range(1, value, 4096):
+        yield "f (" * min(4096, value - start)
+    yield "f x"
+    for start in range(1, value, 4096):
+        yield ")" * min(4096, value - start)
+
+
+class _Bindings:
+    __slots__ = ('names', 'anchored')
+
+    def __init__(self, names, anchored):
+        self.names = names
+        self.anchored = anchored
+
+
+def _shared_bindings(expr, min_size):
+    # A subterm reached more than once is bound where all its occurrences can
+    # see it: just inside the innermost λ that binds one of its free
+    # variables, or at the top. That is only sound when every occurrence sees
+    # the same binders for its free variables, so the binders reaching each
+    # subterm are collected first, in topological order.
+    references = {id(expr): 1}
+    nodes = [expr]
+    used = set()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        for child in _children(node, used):
+            count = references.get(id(child), 0)
+            references[id(child)] = count + 1
+            if not count:
+                nodes.append(child)
+                stack.append(child)
+
+    if not any(references[id(node)] > 1 and node.size() >= min_size
+               and not isinstance(node, (Variable, Global)) for node in nodes):
+        return _Bindings({}, {})
+
+    # Kahn's algorithm: a node is placed once all its references have been,
+    # so its binders are complete before they are passed on.
+    remaining = dict(references)
+    order = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        for child in _children(node):
+            remaining[id(child)] -= 1
+            if not remaining[id(child)]:
+                stack.append(child)
+
+    position = {id(node): index for index, node in enumerate(order)}
+    binders = {id(expr): {name: None for name in expr.free_variables()}}
+    for node in order:
+        seen = binders[id(node)]
+        for child in _children(node):
+            into = binders.setdefault(id(child), {})
+            for name in child.free_variables():
+                if isinstance(node, Abstraction) and node.param == name:
+                    binder = id(node)
+                else:
+                    binder = seen[name]
+                if into.setdefault(name, binder) != binder:
+                    into[name] = _CONFLICT
+
+    candidates = []
+    for node in order:
+        if (references[id(node)] < 2 or isinstance(node, (Variable, Global))
+                or node.size() < min_size):
+            continue
+        scope = binders[id(node)].values()
+        if _CONFLICT in scope:
+            continue
+        anchor = max((binder for binder in scope if binder is not None),
+                     key=position.__getitem__, default=None)
+        candidates.append((node, anchor))
+
+    names = {}
+    anchored = {}
+    fresh = 0
+    # Subterms come before the terms containing them.
+    for node, anchor in reversed(candidates):
+        fresh += 1
+        while f"t{fresh}" in used:
+            fresh += 1
+        names[id(node)] = f"t{fresh}"
+        anchored.setdefault(anchor, []).append((f"t{fresh}", node))
+    return _Bindings(names, anchored)
+
+
+def _children(node, used=None):
+    # Globals and numerals are printed whole, so their insides are not
+    # looked at; `used` collects the names in the term.
+    if isinstance(node, (Variable, Global)):
+        if used is not None:
+            used.add(node.name)
+        return ()
+    if isinstance(node, ChurchNumeral):
+        if used is not None:
+            used.update(('f', 'x'))
+        return ()
+    if isinstance(node, Abstraction):
+        if used is not None:
+            used.add(node.param)
+        return (node.body,)
+    return (node.left, node.right)
@@ -5,50 +5,44 @@ except ImportError:
         import pyreadline3 as readline
     except ImportError:
         pass 
+import argparse
+import io
+import json
 import sys
-from lambda_calculus.syntax import Variable, Abstraction, Application
+import time
+from lambda_calculus.syntax import Expr, Global
 from lambda_calculus.parser import parse, ParseError
 from lambda_calculus.semantics import (
-    beta_reduce_once, reduce_to_normal_form, is_normal_form
-)
-from lambda_calculus.encodings import (
-    TRUE, FALSE, AND, OR, NOT,
-    ZERO, ONE, TWO, THREE,
-    SUCC, PLUS, MULT, POW,
-    PAIR, FIRST, SECOND,
-    NIL, CONS, HEAD, TAIL,
-    church_numeral, extract_church_numeral
+    ReductionStream, reduce_to_normal_form, is_normal_form, observe_numeral
 )
+from lambda_calculus.cache import NormalFormCache
+from lambda_calculus.tracing import RedexProfiler
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define, DependencyGraph
+from lambda_calculus.encodings import church_numeral
+from lambda_calculus.printer import format_expr
 
 
 class LambdaREPL:
     def __init__(self):
-        self.variables = {
-            'TRUE': TRUE,
-            'FALSE': FALSE,
-            'AND': AND,
-            'OR': OR,
-            'NOT': NOT,
-            
-            'ZERO': ZERO,
-            'ONE': ONE,
-            'TWO': TWO,
-            'THREE': THREE,
-            
-            'SUCC': SUCC,
-            'PLUS': PLUS,
-            'MULT': MULT,
-            'POW': POW,
-            
-            'PAIR': PAIR,
-            'FIRST': FIRST,
-            'SECOND': SECOND,
-            
-            'NIL': NIL,
-            'CONS': CONS,
-            'HEAD': HEAD,
-            'TAIL': TAIL,
-        }
+        # Definitions refer to each other by name and are only opened when
+        # reduction reaches them, so expressions stay as small as typed.
+        self.prelude = load_prelude()
+        self.variables = {}
+        self.sources = {}
+        self.graph = DependencyGraph()
+        self.cache = NormalFormCache()
+        for name in self.prelude.standard_names + self.prelude.user_names:
+            self.redefine(name, self.prelude[name])
+        
+        self.out = sys.stdout
+        self.record = {}
+        self.running = True
+        # The reduction that step continues when given no expression.
+        self.stream = None
+        # How results are printed; see lambda_calculus.printer.
+        self.max_width = None
+        self.share = False
         
         self.commands = {
             'help': self.help,
@@ -62,246 +56,431 @@ class LambdaREPL:
             'let': self.define_variable,
             'church': self.create_church_numeral,
             'extract': self.extract_numeral,
+            'cache': self.show_cache,
+            'profile': self.profile_reduction,
+            'save': self.save_definitions,
+            'forget': self.forget_definition,
         }
     
+    def emit(self, *args):
+        print(*args, file=self.out)
+    
+    def error(self, message):
+        self.record['error'] = message
+        self.emit(message)
+    
+    def show(self, expr):
+        if self.max_width is None and not self.share:
+            return str(expr)
+        return format_expr(expr, max_width=self.max_width, share=self.share)
+    
+    def report_reduction(self, reduced, steps, normal_form):
+        self.record.update(result=str(reduced), steps=steps, converged=normal_form)
+        self.emit(f"Result: {self.show(reduced)}")
+        self.emit(f"Steps taken: {steps}")
+        
+        if not normal_form:
+            self.emit("Warning: May not be in normal form (reached maximum steps)")
+    
     def help(self, args=None):
-        print("\nLambda Calculus REPL - Commands:")
-        print("  help           - Show this help information")
-        print("  quit, exit     - Exit the REPL")
-        print("  vars           - List all defined variables")
-        print("  let NAME EXPR  - Define a variable")
-        print("  step EXPR      - Perform a single beta-reduction step")
-        print("  beta EXPR      - Fully beta-reduce an expression")
-        print("  normal EXPR    - Evaluate using normal order (leftmost, outermost)")
-        print("  app EXPR       - Evaluate using applicative order (leftmost, innermost)")
-        print("  church N       - Create a Church numeral for integer N")
-        print("  extract EXPR   - Try to extract a number from a Church numeral")
-        print("\nSyntax:")
-        print("  Variables:      x, y, z, etc.")
-        print("  Abstractions:   λx.M or \\x.M")
-        print("  Applications:   M N")
-        print("  Parentheses:    (M) for grouping")
-        print("\nPredefined variables:")
-        print("  Booleans:       TRUE, FALSE, AND, OR, NOT")
-        print("  Numbers:        ZERO, ONE, TWO, THREE")
-        print("  Arithmetic:     SUCC, PLUS, MULT, POW")
-        print("  Pairs:          PAIR, FIRST, SECOND")
-        print("  Lists:          NIL, CONS, HEAD, TAIL")
-        print("\nExamples:")
-        print("  λx.x                  # Identity function")
-        print("  (λx.x) y              # Application of identity to y")
-        print("  let ID λx.x           # Define a variable ID")
-        print("  beta (PLUS ONE TWO)   # Evaluate 1 + 2")
-        print("  church 5              # Create Church numeral for 5")
-        print("  extract (PLUS TWO THREE) # Extract 5 from 2 + 3")
+        self.emit("\nLambda Calculus REPL - Commands:")
+        self.emit("  help           - Show this help information")
+        self.emit("  quit, exit     - Exit the REPL")
+        self.emit("  vars           - List all defined variables")
+        self.emit("  let NAME EXPR  - Define a variable")
+        self.emit("  step EXPR      - Perform a single beta-reduction step")
+        self.emit("  step           - Perform the next step of the last reduction")
+        self.emit("  beta EXPR      - Fully beta-reduce an expression")
+        self.emit("  normal EXPR    - Evaluate using normal order (leftmost, outermost)")
+        self.emit("  app EXPR       - Evaluate using applicative order (leftmost, innermost)")
+        self.emit("  church N       - Create a Church numeral for integer N")
+        self.emit("  extract EXPR   - Try to extract a number from a Church numeral")
+        self.emit("  cache          - Show normal-form cache statistics")
+        self.emit("  profile EXPR   - Reduce in normal order and count steps per named variable")
+        self.emit("  save [NAME...] - Persist let definitions so later sessions start with them")
+        self.emit("  forget NAME    - Remove a persisted definition")
+        self.emit("\nSyntax:")
+        self.emit("  Variables:      x, y, z, etc.")
+        self.emit("  Abstractions:   λx.M or \\x.M")
+        self.emit("  Applications:   M N")
+        self.emit("  Parentheses:    (M) for grouping")
+        self.emit("\nPredefined variables:")
+        self.emit("  Booleans:       TRUE, FALSE, AND, OR, NOT, IF_THEN_ELSE")
+        self.emit("  Numbers:        ZERO, ONE, TWO, THREE")
+        self.emit("  Arithmetic:     SUCC, PLUS, MULT, POW, PRED, SUB")
+        self.emit("  Comparison:     IS_ZERO, LEQ, EQ")
+        self.emit("  Pairs:          PAIR, FIRST, SECOND")
+        self.emit("  Lists:          NIL, IS_NIL, CONS, HEAD, TAIL")
+        self.emit("\nExamples:")
+        self.emit("  λx.x                  # Identity function")
+        self.emit("  (λx.x) y              # Application of identity to y")
+        self.emit("  let ID λx.x           # Define a variable ID")
+        self.emit("  beta (PLUS ONE TWO)   # Evaluate 1 + 2")
+        self.emit("  church 5              # Create Church numeral for 5")
+        self.emit("  extract (PLUS TWO THREE) # Extract 5 from 2 + 3")
         return None
     
     def quit(self, args=None):
-        print("Goodbye!")
-        sys.exit(0)
+        self.emit("Goodbye!")
+        self.running = False
     
     def list_variables(self, args=None):
-        print("\nDefined variables:")
-        for name, expr in sorted(self.variables.items()):
-            print(f"  {name} = {expr}")
+        self.emit("\nDefined variables:")
+        for name, definition in sorted(self.variables.items()):
+            self.emit(f"  {name} = {definition.definition}")
+        return None
+    
+    def show_cache(self, args=None):
+        stats = self.cache.stats()
+        self.emit("\nNormal-form cache:")
+        self.emit(f"  entries   {stats['entries']}")
+        self.emit(f"  nodes     {stats['nodes']} / {stats['max_nodes']}")
+        self.emit(f"  hits      {stats['hits']}")
+        self.emit(f"  misses    {stats['misses']}")
+        self.emit(f"  evictions {stats['evictions']}")
+        return None
+    
+    def save_definitions(self, args):
+        standard = set(self.prelude.standard_names)
+        names = args or sorted(name for name in self.variables
+                               if name not in standard and name != 'it'
+                               and self.prelude.get(name) is not self.variables[name].definition)
+        if not names:
+            self.emit("Nothing to save")
+            return None
+        
+        for name in names:
+            if name not in self.variables:
+                self.error(f"Error: {name} is not defined")
+            elif name in standard:
+                self.error(f"Error: {name} is a standard definition")
+            elif self.prelude.define(name, self.variables[name].definition):
+                self.emit(f"Saved {name}")
+            else:
+                self.error(f"Could not write the prelude cache; {name} is kept for this session only")
+        return None
+    
+    def forget_definition(self, args):
+        if not args:
+            self.error("Error: forget requires a name")
+            return None
+        
+        for name in args:
+            if name not in self.prelude.user_names:
+                self.error(f"Error: {name} is not a saved definition")
+                continue
+            self.prelude.forget(name)
+            self.emit(f"Forgot {name}")
         return None
     
     def define_variable(self, args):
         if len(args) < 2:
-            print("Error: let requires a name and an expression")
+            self.error("Error: let requires a name and an expression")
             return None
         
         name = args[0]
         expr_str = ' '.join(args[1:])
         
         try:
-            expr = self.parse_expression(expr_str)
-            self.variables[name] = expr
-            print(f"Defined {name} = {expr}")
+            updated = self.redefine(name, parse(expr_str))
+            expr = self.variables[name].definition
+            self.record.update(defined=name, result=str(expr))
+            self.emit(f"Defined {name} = {expr}")
+            if updated:
+                self.record['updated'] = updated
+                self.emit(f"Updated {', '.join(updated)}")
             return None
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
+    def redefine(self, name, source):
+        # A definition mentioning its own name or `it` means their current
+        # values, which are bound now; the other names it mentions are kept
+        # as dependencies and re-resolved whenever one of them is redefined.
+        bound = {key: self.variables[key] for key in (name, 'it') if key in self.variables}
+        source = link(source, bound)
+        self.sources[name] = source
+        self.graph.set(name, (used for used in source.free_variables() if used in self.variables))
+        self._link(name)
+        
+        affected = self.graph.dependents(name)
+        updated = [other for other in self.variables if other in affected]
+        for other in updated:
+            self._link(other)
+        # Cached results are keyed by content, so those of the unchanged
+        # definitions are still found; the stale ones are dropped.
+        self.cache.invalidate(affected | {name})
+        return updated
+    
+    def _link(self, name):
+        scope = {used: self.variables[used] for used in self.graph.uses[name]}
+        self.variables[name] = define(scope, name, self.sources[name])
+    
     def step_reduction(self, args):
+        if args:
+            try:
+                self.stream = ReductionStream(self.parse_expression(' '.join(args)))
+            except ParseError as e:
+                self.error(f"Parse error: {e}")
+                return None
+        elif self.stream is None:
+            self.error("Error: step requires an expression")
+            return None
+        
+        was_reduced = next(self.stream, None) is not None
+        reduced = self.stream.term
+        self.record.update(result=str(reduced), steps=int(was_reduced))
+        
+        if was_reduced:
+            self.emit(f"Result: {self.show(reduced)}")
+        else:
+            self.emit("Expression is already in normal form.")
+        
+        return reduced
+    
+    def beta_reduce(self, args):
         if not args:
-            print("Error: step requires an expression")
+            self.error("Error: beta requires an expression")
             return None
         
         expr_str = ' '.join(args)
         try:
             expr = self.parse_expression(expr_str)
-            reduced, was_reduced = beta_reduce_once(expr)
+            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="normal", cache=self.cache)
             
-            if was_reduced:
-                print(f"Result: {reduced}")
-            else:
-                print("Expression is already in normal form.")
+            self.report_reduction(reduced, steps, normal_form)
             
             return reduced
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
-    def beta_reduce(self, args):
+    def evaluate_normal_order(self, args):
         if not args:
-            print("Error: beta requires an expression")
+            self.error("Error: normal requires an expression")
             return None
         
         expr_str = ' '.join(args)
         try:
             expr = self.parse_expression(expr_str)
-            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="normal")
-            
-            print(f"Result: {reduced}")
-            print(f"Steps taken: {steps}")
+            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="normal", cache=self.cache)
             
-            if not normal_form:
-                print("Warning: May not be in normal form (reached maximum steps)")
+            self.report_reduction(reduced, steps, normal_form)
             
             return reduced
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
-    def evaluate_normal_order(self, args):
+    def evaluate_applicative_order(self, args):
         if not args:
-            print("Error: normal requires an expression")
+            self.error("Error: app requires an expression")
             return None
         
         expr_str = ' '.join(args)
         try:
             expr = self.parse_expression(expr_str)
-            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="normal")
+            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="applicative", cache=self.cache)
             
-            print(f"Result: {reduced}")
-            print(f"Steps taken: {steps}")
-            
-            if not normal_form:
-                print("Warning: May not be in normal form (reached maximum steps)")
+            self.report_reduction(reduced, steps, normal_form)
             
             return reduced
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
-    def evaluate_applicative_order(self, args):
+    def profile_reduction(self, args):
         if not args:
-            print("Error: app requires an expression")
+            self.error("Error: profile requires an expression")
             return None
         
         expr_str = ' '.join(args)
         try:
             expr = self.parse_expression(expr_str)
-            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="applicative")
+            definitions = {name: value.unfold() for name, value in self.variables.items()
+                           if name != 'it'}
+            profiler = RedexProfiler(definitions)
+            reduced, steps, normal_form = reduce_to_normal_form(expr, strategy="normal", observer=profiler)
             
-            print(f"Result: {reduced}")
-            print(f"Steps taken: {steps}")
+            self.report_reduction(reduced, steps, normal_form)
             
-            if not normal_form:
-                print("Warning: May not be in normal form (reached maximum steps)")
+            self.emit(f"\n  {'origin':<16}{'steps':>8}{'share':>8}{'subst ms':>10}{'max size':>10}")
+            for name, count, substitution_time, max_size in profiler.report():
+                share = count / steps if steps else 0.0
+                self.emit(f"  {name:<16}{count:>8}{share:>8.1%}{substitution_time * 1e3:>10.2f}{max_size:>10}")
             
             return reduced
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
     def create_church_numeral(self, args):
         if not args or not args[0].isdigit():
-            print("Error: church requires a non-negative integer")
+            self.error("Error: church requires a non-negative integer")
             return None
         
         n = int(args[0])
         try:
             result = church_numeral(n)
-            print(f"Church numeral for {n}: {result}")
+            self.record['result'] = str(result)
+            self.emit(f"Church numeral for {n}: {result}")
             return result
         except ValueError as e:
-            print(f"Error: {e}")
+            self.error(f"Error: {e}")
             return None
     
     def extract_numeral(self, args):
         if not args:
-            print("Error: extract requires an expression")
+            self.error("Error: extract requires an expression")
             return None
         
         expr_str = ' '.join(args)
         try:
             expr = self.parse_expression(expr_str)
             
-            reduced, _, _ = reduce_to_normal_form(expr)
-            
-            n = extract_church_numeral(reduced)
+            n = observe_numeral(expr)
+            self.record['value'] = n
             
             if n is not None:
-                print(f"Extracted value: {n}")
+                self.emit(f"Extracted value: {n}")
             else:
-                print("Could not extract a Church numeral")
+                self.emit("Could not extract a Church numeral")
             
             return n
         except ParseError as e:
-            print(f"Parse error: {e}")
+            self.error(f"Parse error: {e}")
             return None
     
     def parse_expression(self, expr_str):
         if expr_str in self.variables:
             return self.variables[expr_str]
         
-        expr = parse(expr_str)
-        
-        def resolve_variables(e):
-            if isinstance(e, Variable) and e.name in self.variables:
-                return self.variables[e.name]
-            elif isinstance(e, Abstraction):
-                return Abstraction(e.param, resolve_variables(e.body))
-            elif isinstance(e, Application):
-                return Application(resolve_variables(e.left), resolve_variables(e.right))
-            else:
-                return e
+        return link(parse(expr_str), self.variables)
+    
+    def execute(self, user_input):
+        tokens = user_input.split()
+        command = tokens[0].lower()
+        args = tokens[1:]
         
-        return resolve_variables(expr)
+        if command in self.commands:
+            result = self.commands[command](args)
+            if isinstance(result, Expr):
+                self.variables['it'] = Global('it', result)
+        else:
+            try:
+                expr = self.parse_expression(user_input)
+                self.record['result'] = str(expr)
+                self.emit(f"Parsed: {expr}")
+                self.variables['it'] = Global('it', expr)
+            except ParseError as e:
+                self.error(f"Parse error: {e}")
     
     def run(self):
         """Start the REPL."""
-        print("Lambda Calculus REPL")
-        print('Type "help" for a list of commands.')
+        self.emit("Lambda Calculus REPL")
+        self.emit('Type "help" for a list of commands.')
         
-        while True:
+        while self.running:
             try:
                 user_input = input("\nλ> ").strip()
                 
                 if not user_input:
                     continue
                 
-                tokens = user_input.split()
-                command = tokens[0].lower()
-                args = tokens[1:]
-                
-                if command in self.commands:
-                    result = self.commands[command](args)
-                    if result is not None:
-                        self.variables['it'] = result
-                else:
-                    try:
-                        expr = self.parse_expression(user_input)
-                        print(f"Parsed: {expr}")
-                        self.variables['it'] = expr
-                    except ParseError as e:
-                        print(f"Parse error: {e}")
+                self.execute(user_input)
             
             except KeyboardInterrupt:
-                print("\nUse 'quit' or 'exit' to exit the REPL.")
+                self.emit("\nUse 'quit' or 'exit' to exit the REPL.")
             except EOFError:
                 self.quit()
             except Exception as e:
-                print(f"Error: {e}")
+                self.error(f"Error: {e}")
+    
+    def run_script(self, lines, out, json_lines=False):
+        """Run commands from an iterable of lines; return the number of failed commands."""
+        failures = 0
+        
+        for line_number, line in enumerate(lines, 1):
+            user_input = line.strip()
+            if not user_input or user_input.startswith('#'):
+                continue
+            
+            self.record = {}
+            self.out = io.StringIO() if json_lines else out
+            start = time.perf_counter()
+            try:
+                self.execute(user_input)
+            except Exception as e:
+                self.error(f"Error: {e}")
+            elapsed = time.perf_counter() - start
+            
+            if 'error' in self.record:
+                failures += 1
+            if json_lines:
+                entry = {'line': line_number, 'input': user_input}
+                entry.update(self.record)
+                entry['output'] = self.out.getvalue()
+                entry['time'] = elapsed
+                out.write(json.dumps(entry, ensure_ascii=False))
+                out.write("\n")
+            
+            if not self.running:
+                break
+        
+        self.out = out
+        return failures
 
 
-def main():
+def main(argv=None):
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Lambda calculus REPL")
+    parser.add_argument("scripts", nargs="*", metavar="SCRIPT",
+                        help="files of REPL commands to run instead of the interactive prompt ('-' for stdin)")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON object per command instead of text")
+    parser.add_argument("--max-width", type=int, default=None, metavar="N",
+                        help="cut printed results to N characters")
+    parser.add_argument("--share", action="store_true",
+                        help="print subterms that occur more than once as let-bindings")
+    args = parser.parse_args(argv)
+    
     repl = LambdaREPL()
-    repl.run()
+    repl.max_width = args.max_width
+    repl.share = args.share
+    if not args.scripts:
+        repl.run()
+        return 0
+    
+    # Scripts write through a large buffer instead of flushing every line.
+    out = open(sys.stdout.fileno(), "w", buffering=1 << 16, encoding="utf-8", closefd=False)
+    failures = 0
+    try:
+        for script in args.scripts:
+            if script == "-":
+                failures += repl.run_script(sys.stdin, out, args.json)
+            else:
+                try:
+                    with open(script, encoding="utf-8") as f:
+                        failures += repl.run_script(f, out, args.json)
+                except (OSError, UnicodeDecodeError) as e:
+                    # The other scripts still run; this one counts as failed.
+                    failures += 1
+                    reason = e.strerror if isinstance(e, OSError) and e.strerror else e
+                    message = f"Error: cannot read {script}: {reason}"
+                    if args.json:
+                        out.write(json.dumps({'script': script, 'error': message},
+                                             ensure_ascii=False))
+                        out.write("\n")
+                    else:
+                        out.flush()
+                        print(message, file=sys.stderr)
+            if not repl.running:
+                break
+    finally:
+        out.flush()
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,131 +1,668 @@
-from lambda_calculus.syntax import Expr, Variable, Abstraction, Application
+import time
+from lambda_calculus.syntax import Expr, Variable, Abstraction, Application, Global, fresh_name
+from lambda_calculus.machine import krivine_normalize, need_normalize
+from lambda_calculus.interaction import optimal_normalize
+from lambda_calculus.explicit import explicit_normalize
+from lambda_calculus.cache import count_nodes
+from lambda_calculus.tracing import StepEvent, ReductionStep, path_directions
+from lambda_calculus.definitions import expand, references
+from lambda_calculus.encodings import ChurchNumeral
+
+
+_BODY, _RIGHT, _LEFT, _GLOBAL = range(4)
+_DIRECTIONS = ('body', 'right', 'left')
 
 
 def is_beta_redex(expr):
     return isinstance(expr, Application) and isinstance(expr.left, Abstraction)
 
 
-def beta_reduce_once(expr):
-    if isinstance(expr, Variable):
-        return expr, False
+def _rebuild(path, replacement):
+    while path is not None:
+        parent, direction, path = path
+        if direction == 'body':
+            replacement = Abstraction(parent.param, replacement)
+        elif direction == 'left':
+            replacement = Application(replacement, parent.right)
+        else:
+            replacement = Application(parent.left, replacement)
+    return replacement
+
+
+def beta_reduce_once(expr, observer=None):
+    result, was_reduced, _ = _reduce_once(expr, observer, 1, time.perf_counter())
+    return result, was_reduced
+
+
+def _reduce_once(expr, observer, step, started):
+    path, node, function, opened = _leftmost_redex(expr)
+    if node is None:
+        # The search opened every definition in the term and found no redex,
+        # so the normal form is the term with its definitions expanded.
+        return (expand(expr) if opened else expr), False, False
+    
+    argument = node.right
+    if observer is None:
+        contractum = function.body.substitute(function.param, argument)
+        return _rebuild(path, contractum), True, False
+    
+    if function is not node.left:
+        node = Application(function, argument)
+    start = time.perf_counter()
+    contractum = function.body.substitute(function.param, argument)
+    substitution_time = time.perf_counter() - start
+    result = _rebuild(path, contractum)
+    stop = observer(StepEvent("normal", step, path_directions(path), node, contractum,
+                              result, substitution_time,
+                              time.perf_counter() - started))
+    return result, True, bool(stop)
+
+
+def _leftmost_redex(expr):
+    # Returns the path to the leftmost-outermost redex, the redex, its
+    # function with any definition opened, and whether the search opened a
+    # definition; the redex is None if there is none.
+    stack = [(expr, None)]
+    opened = False
+    
+    while stack:
+        node, path = stack.pop()
+        
+        if isinstance(node, Variable):
+            continue
+        
+        elif isinstance(node, Global):
+            # Definitions are opened where the search reaches them; only the
+            # path down to a redex inside one is ever copied.
+            stack.append((node.unfold(), path))
+            opened = True
+        
+        elif isinstance(node, Abstraction):
+            stack.append((node.body, (node, 'body', path)))
+        
+        elif isinstance(node, Application):
+            function = node.left
+            if isinstance(function, Global):
+                function = function.unfold()
+            
+            if isinstance(function, Abstraction):
+                return path, node, function, opened
+            
+            if function is not node.left:
+                opened = True
+            stack.append((node.right, (node, 'right', path)))
+            stack.append((function, (node, 'left', path)))
+        
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
     
-    elif isinstance(expr, Abstraction):
-        body_reduced, was_reduced = beta_reduce_once(expr.body)
-        if was_reduced:
-            return Abstraction(expr.param, body_reduced), True
-        return expr, False
+    return None, None, None, opened
+
+
+def _innermost_redex(expr):
+    # As _leftmost_redex, for the redex applicative order contracts next:
+    # the first one met after both sides of an application are searched,
+    # its argument first.
+    stack = [(expr, None, False)]
+    opened = False
     
-    elif isinstance(expr, Application):
-        if is_beta_redex(expr):
-            abstraction = expr.left
-            argument = expr.right
-            return abstraction.body.substitute(abstraction.param, argument), True
+    while stack:
+        node, path, searched = stack.pop()
         
-        left_reduced, was_reduced = beta_reduce_once(expr.left)
-        if was_reduced:
-            return Application(left_reduced, expr.right), True
+        if isinstance(node, Variable):
+            continue
+        
+        elif isinstance(node, Global):
+            stack.append((node.unfold(), path, False))
+            opened = True
+        
+        elif isinstance(node, Abstraction):
+            stack.append((node.body, (node, 'body', path), False))
+        
+        elif isinstance(node, Application):
+            if searched:
+                function = node.left
+                if isinstance(function, Global):
+                    function = function.unfold()
+                if isinstance(function, Abstraction):
+                    return path, node, function, opened
+                continue
+            stack.append((node, path, True))
+            stack.append((node.left, (node, 'left', path), False))
+            stack.append((node.right, (node, 'right', path), False))
+        
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+    
+    return None, None, None, opened
+
+
+_REDEX_SEARCH = {
+    "normal": _leftmost_redex,
+    "applicative": _innermost_redex,
+}
+
+
+class ReductionStream:
+    """Lazy iterator over the contractions of a reduction.
+    
+    Each step is yielded as a ReductionStep, the position of the redex and
+    its contractum; only the current term is kept, as ``term``. Iteration
+    can be stopped and resumed at any point.
+    """
+    
+    def __init__(self, expr, strategy="normal", max_steps=None):
+        search = _REDEX_SEARCH.get(strategy)
+        if search is None:
+            raise ValueError(f"Streams are not supported by strategy: {strategy}")
+        self.strategy = strategy
+        self.term = expr
+        self.steps = 0
+        self.max_steps = max_steps
+        self.normal_form = False
+        self._search = search
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        if self.normal_form or (self.max_steps is not None and self.steps >= self.max_steps):
+            raise StopIteration
         
-        right_reduced, was_reduced = beta_reduce_once(expr.right)
-        if was_reduced:
-            return Application(expr.left, right_reduced), True
+        path, node, function, opened = self._search(self.term)
+        if node is None:
+            if opened:
+                self.term = expand(self.term)
+            self.normal_form = True
+            raise StopIteration
         
-        return expr, False
+        contractum = function.body.substitute(function.param, node.right)
+        self.term = _rebuild(path, contractum)
+        self.steps += 1
+        return ReductionStep(self.strategy, self.steps, path_directions(path), contractum)
     
-    raise TypeError(f"Unknown expression type: {type(expr)}")
+    def every(self, k):
+        """Advance the stream, yielding only every k-th step."""
+        for step in self:
+            if step.step % k == 0:
+                yield step
 
 
-def beta_reduce_normal_order(expr, max_steps=1000):
+def beta_reduce_normal_order(expr, max_steps=1000, observer=None):
     steps = 0
     current_expr = expr
+    started = time.perf_counter()
     
     while steps < max_steps:
-        reduced_expr, was_reduced = beta_reduce_once(current_expr)
+        reduced_expr, was_reduced, stop = _reduce_once(current_expr, observer, steps + 1, started)
         if not was_reduced:
-            return current_expr, steps, True
+            return reduced_expr, steps, True
         
         current_expr = reduced_expr
         steps += 1
+        if stop:
+            break
     return current_expr, steps, False
 
 
-def beta_reduce_applicative_order(expr, max_steps=1000):
-    def find_innermost_redex(expr):
-        if isinstance(expr, Variable):
-            return None, None
+def _wrap(params, body):
+    for param in reversed(params):
+        body = Abstraction(param, body)
+    return body
+
+
+def _apply(function, args):
+    for arg in args:
+        function = Application(function, arg)
+    return function
+
+
+def _normal_order_with_cache(expr, max_steps, cache):
+    # Normal order contracts the head redex until the term is in head normal
+    # form λx1..xn.h M1..Mk, and then normalizes M1, ..., Mk in turn, each
+    # exactly as it would on its own. Those arguments are looked up in and
+    # added to the cache, so the parts of a program that did not change are
+    # not reduced again; results and step counts are those of
+    # beta_reduce_normal_order. Each task yields its normal form together
+    # with the term as a truncated reduction shows it, where definitions are
+    # only unfolded along contracted paths; a part served from the cache is
+    # shown as its normal form.
+    steps = 0
+    truncated = False
+    out = []
+    stack = [(expr, False)]
+    
+    while stack:
+        item = stack.pop()
         
-        elif isinstance(expr, Abstraction):
-            path, found_expr = find_innermost_redex(expr.body)
-            if path is not None:
-                return ['body'] + path, found_expr
-            return None, None
+        if len(item) > 2:
+            term, changed, params, head, args, key, start, partial = item
+            count = len(args)
+            normalized = [pair[0] for pair in out[len(out) - count:]]
+            shown = [pair[1] for pair in out[len(out) - count:]]
+            del out[len(out) - count:]
+            result = term
+            if changed or any(new is not old for new, old in zip(normalized, args)):
+                result = _wrap(params, _apply(head, normalized))
+            if any(new is not old for new, old in zip(shown, args)):
+                partial = _wrap(params, _apply(head, shown))
+            if key is not None and not truncated:
+                cache.store(key, (result, steps - start, True), count_nodes(term),
+                            references(term))
+            out.append((result, partial))
+            continue
         
-        elif isinstance(expr, Application):
-            path, found_expr = find_innermost_redex(expr.right)
-            if path is not None:
-                return ['right'] + path, found_expr
-            
-            path, found_expr = find_innermost_redex(expr.left)
-            if path is not None:
-                return ['left'] + path, found_expr
-            
-            if is_beta_redex(expr):
-                return [], expr
-            
-            return None, None
-    
-    def replace_at_path(expr, path, replacement):
-        if not path:
-            return replacement
+        term, nested = item
+        if truncated:
+            out.append((term, term))
+            continue
         
-        if isinstance(expr, Abstraction) and path[0] == 'body':
-            return Abstraction(expr.param, replace_at_path(expr.body, path[1:], replacement))
+        start = steps
+        key = None
+        params = []
+        node = term
+        # The term as it stood after the last contraction; opening a
+        # definition alone does not change what a truncated result shows.
+        last = None
+        opened = False
+        cached = False
         
-        if isinstance(expr, Application):
-            if path[0] == 'left':
-                return Application(replace_at_path(expr.left, path[1:], replacement), expr.right)
-            elif path[0] == 'right':
-                return Application(expr.left, replace_at_path(expr.right, path[1:], replacement))
+        while True:
+            while isinstance(node, Abstraction):
+                params.append(node.param)
+                node = node.body
+            args = []
+            head = node
+            while isinstance(head, Application):
+                args.append(head.right)
+                head = head.left
+            if isinstance(head, Variable):
+                break
+            
+            if nested and key is None:
+                key = cache.key(term, "normal")
+                hit = cache.lookup(key, max_steps - steps)
+                if hit is not None and hit[2]:
+                    out.append((hit[0], hit[0] if hit[1] else term))
+                    steps += hit[1]
+                    cached = True
+                    break
+            
+            args.reverse()
+            function = head
+            if isinstance(head, Global):
+                function = head.unfold()
+                opened = True
+            if not args or not isinstance(function, Abstraction):
+                node = _apply(function, args)
+                continue
+            if steps >= max_steps:
+                truncated = True
+                break
+            node = _apply(function.body.substitute(function.param, args[0]), args[1:])
+            steps += 1
+            last = (len(params), node)
         
-        raise ValueError(f"Invalid path {path} for expression {expr}")
+        if truncated:
+            partial = term if last is None else _wrap(params[:last[0]], last[1])
+            out.append((partial, partial))
+        elif not cached:
+            args.reverse()
+            changed = last is not None or opened
+            partial = term if last is None else _wrap(params[:last[0]], last[1])
+            stack.append((term, changed, params, head, args, key, start, partial))
+            for arg in reversed(args):
+                stack.append((arg, True))
     
+    result, partial = out[0]
+    if truncated or steps >= max_steps:
+        result = partial
+    return result, steps, not truncated and steps < max_steps
+
+
+def _head_reduce(expr, max_steps, weak, given=()):
+    # Contracts the head redex until the term is in head normal form
+    # λx1..xn.h M1..Mk, or, when weak, until it is an abstraction or a
+    # variable applied to arguments. Returns the parts of that form, the
+    # steps taken and whether the form was reached within max_steps. expr
+    # is applied to the arguments given, and passing them in is not a step.
     steps = 0
-    current_expr = expr
+    params = []
+    node = expr
+    # Arguments of the head, the first one last.
+    args = list(reversed(given))
+    pending = len(args)
     
-    while steps < max_steps:
-        path, redex = find_innermost_redex(current_expr)
-        if redex is None:
-            return current_expr, steps, True
-        
-        abstraction = redex.left
-        argument = redex.right
-        reduced_redex = abstraction.body.substitute(abstraction.param, argument)
-        
-        current_expr = replace_at_path(current_expr, path, reduced_redex)
-        steps += 1
+    while True:
+        if isinstance(node, Application):
+            args.append(node.right)
+            node = node.left
+        elif isinstance(node, Global):
+            node = node.unfold()
+        elif isinstance(node, Abstraction):
+            if len(args) > pending:
+                if steps >= max_steps:
+                    return params, node, args[::-1], steps, False
+                node = node.body.substitute(node.param, args.pop())
+                steps += 1
+            elif args:
+                node = node.body.substitute(node.param, args.pop())
+                pending -= 1
+            elif weak:
+                break
+            else:
+                params.append(node.param)
+                node = node.body
+        elif isinstance(node, Variable):
+            break
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
     
-    return current_expr, steps, False
+    return params, node, args[::-1], steps, True
 
 
-def is_normal_form(expr):
-    if isinstance(expr, Variable):
+def _head_reduction(expr, max_steps, weak):
+    params, head, args, steps, finished = _head_reduce(expr, max_steps, weak)
+    return _wrap(params, _apply(head, args)), steps, finished and steps < max_steps
+
+
+def reduce_to_weak_head_normal_form(expr, max_steps=1000):
+    return _head_reduction(expr, max_steps, True)
+
+
+def reduce_to_head_normal_form(expr, max_steps=1000):
+    return _head_reduction(expr, max_steps, False)
+
+
+def observe_boolean(expr, max_steps=1000, stats=None):
+    """True or False if expr selects the first or the second of two
+    arguments, None if it does neither within max_steps."""
+    # expr a b is reduced to weak head normal form, which is all that is
+    # needed to see which argument it selects; a term with a normal form
+    # selects one exactly if that normal form is TRUE or FALSE.
+    used = expr.free_variables()
+    first = fresh_name('a', used)
+    second = fresh_name('b', used | {first})
+    _, head, args, steps, finished = _head_reduce(
+        expr, max_steps, True, (Variable(first), Variable(second)))
+    if stats is not None:
+        stats['steps'] = steps
+    if not finished or args or not isinstance(head, Variable):
+        return None
+    if head.name == first:
         return True
+    if head.name == second:
+        return False
+    return None
+
+
+def observe_numeral(expr, max_steps=1000, stats=None):
+    """The number n if expr applies its first argument n times to its
+    second, None if it does not within max_steps."""
+    # expr f x is reduced to weak head normal form; f M continues with M
+    # and x ends the count, so only the spine of applications of f is ever
+    # reduced, one at a time. A term with a normal form is read this way
+    # exactly if that normal form is a Church numeral, up to η.
+    node = expr
+    while isinstance(node, Global):
+        node = node.definition
+    if isinstance(node, ChurchNumeral):
+        if stats is not None:
+            stats['steps'] = 0
+        return node.value
+    
+    used = expr.free_variables()
+    f = fresh_name('f', used)
+    x = fresh_name('x', used | {f})
+    term = expr
+    given = (Variable(f), Variable(x))
+    count = 0
+    steps = 0
+    
+    while True:
+        _, head, args, taken, finished = _head_reduce(term, max_steps - steps, True, given)
+        given = ()
+        steps += taken
+        if not finished or not isinstance(head, Variable):
+            result = None
+            break
+        if head.name == x and not args:
+            result = count
+            break
+        if head.name != f or len(args) != 1:
+            result = None
+            break
+        count += 1
+        term = args[0]
     
-    elif isinstance(expr, Abstraction):
-        return is_normal_form(expr.body)
+    if stats is not None:
+        stats['steps'] = steps
+    return result
+
+
+def beta_reduce_applicative_order(expr, max_steps=1000, observer=None, cache=None):
+    # Normalizes bottom-up in one pass: the argument of a redex is reduced
+    # before the function, then the contractum is normalized in place by
+    # substituting into the already-normal body and contracting only the
+    # redexes the substitution creates. The redexes are contracted in the
+    # same order as restarting the innermost search from the root, so step
+    # counts and truncated results are unchanged. A definition reached
+    # unobserved is normalized once and its normal form reused afterwards,
+    # and kept in the cache, if one is given, for later reductions.
+    if max_steps <= 0:
+        return expr, 0, False
+    
+    started = time.perf_counter()
+    steps = 0
+    frames = []
+    task = (expr, None)
+    value = None
+    normalized = {}
+    
+    while True:
+        if task is not None:
+            node, subst = task
+            task = None
+            
+            if subst is not None and subst[0] not in node.free_variables():
+                value = node
+            
+            elif isinstance(node, Variable):
+                value = subst[1] if subst is not None else node
+            
+            elif isinstance(node, Global):
+                target = node.unfold()
+                if observer is not None or subst is not None:
+                    task = (target, subst)
+                    continue
+                known = normalized.get(id(target))
+                if known is None and cache is not None:
+                    hit = cache.lookup(cache.key(node, "applicative"), max_steps - steps)
+                    if hit is not None and hit[2]:
+                        known = normalized[id(target)] = (target, hit[0], hit[1])
+                if known is None or steps + known[2] >= max_steps:
+                    frames.append((_GLOBAL, target, steps, node))
+                    task = (target, None)
+                    continue
+                value = known[1]
+                steps += known[2]
+            
+            elif isinstance(node, Abstraction):
+                param = node.param
+                body = node.body
+                if subst is not None and param in subst[2]:
+                    param = fresh_name(param, subst[2] | body.free_variables())
+                    body = body.substitute(node.param, Variable(param))
+                frames.append((_BODY, param, node, body))
+                task = (body, subst)
+                continue
+            
+            elif isinstance(node, Application):
+                frames.append((_RIGHT, node, subst, None))
+                task = (node.right, subst)
+                continue
+            
+            else:
+                raise TypeError(f"Unknown expression type: {type(node)}")
+        
+        if not frames:
+            return value, steps, True
+        
+        frame = frames.pop()
+        kind = frame[0]
+        
+        if kind == _BODY:
+            _, param, original, body = frame
+            if value is body and param == original.param:
+                value = original
+            else:
+                value = Abstraction(param, value)
+            continue
+        
+        if kind == _GLOBAL:
+            _, target, start, definition = frame
+            normalized[id(target)] = (target, value, steps - start)
+            if cache is not None:
+                cache.store(cache.key(definition, "applicative"), (value, steps - start, True),
+                            count_nodes(target), (definition.name,))
+            continue
+        
+        _, node, subst, right = frame
+        
+        if kind == _RIGHT:
+            frames.append((_LEFT, node, subst, value))
+            task = (node.left, subst)
+        
+        elif isinstance(value, Abstraction):
+            steps += 1
+            if observer is not None:
+                # Observed steps substitute eagerly so the event can report the
+                # substitution cost and the size of the whole term.
+                start = time.perf_counter()
+                contractum = value.body.substitute(value.param, right)
+                substitution_time = time.perf_counter() - start
+                term = _unwind(frames, contractum)
+                stop = observer(StepEvent("applicative", steps, _frame_path(frames),
+                                          Application(value, right), contractum, term,
+                                          substitution_time, time.perf_counter() - started))
+                if stop:
+                    return term, steps, False
+                task = (contractum, None)
+            else:
+                task = (value.body, (value.param, right, right.free_variables()))
+            
+            if steps >= max_steps:
+                if observer is None:
+                    contractum = value.body.substitute(value.param, right)
+                return _unwind(frames, contractum), steps, False
+        
+        elif value is node.left and right is node.right:
+            value = node
+        
+        else:
+            value = Application(value, right)
+
+
+def _unwind(frames, value):
+    for kind, node, subst, right in reversed(frames):
+        if kind == _BODY:
+            value = Abstraction(node, value)
+        elif kind == _GLOBAL:
+            continue
+        elif kind == _RIGHT:
+            left = node.left if subst is None else node.left.substitute(subst[0], subst[1])
+            value = Application(left, value)
+        else:
+            value = Application(value, right)
+    return value
+
+
+def _frame_path(frames):
+    return tuple(_DIRECTIONS[frame[0]] for frame in frames if frame[0] != _GLOBAL)
+
+
+def is_normal_form(expr):
+    stack = [expr]
     
-    elif isinstance(expr, Application):
-        if isinstance(expr.left, Abstraction):
+    while stack:
+        node = stack.pop()
+        
+        if isinstance(node, Variable):
+            continue
+        
+        elif isinstance(node, Global):
             return False
         
-        return is_normal_form(expr.left) and is_normal_form(expr.right)
+        elif isinstance(node, Abstraction):
+            stack.append(node.body)
+        
+        elif isinstance(node, Application):
+            if isinstance(node.left, (Abstraction, Global)):
+                return False
+            
+            stack.append(node.right)
+            stack.append(node.left)
+        
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
     
-    raise TypeError(f"Unknown expression type: {type(expr)}")
+    return True
 
 
-def reduce_to_normal_form(expr, strategy="normal", max_steps=1000):
+def reduce_to_normal_form(expr, strategy="normal", max_steps=1000, stats=None, cache=None,
+                          observer=None):
+    if observer is not None:
+        if strategy == "normal":
+            result = beta_reduce_normal_order(expr, max_steps, observer)
+        elif strategy == "applicative":
+            result = beta_reduce_applicative_order(expr, max_steps, observer)
+        else:
+            raise ValueError(f"Observers are not supported by strategy: {strategy}")
+        if stats is not None:
+            stats['steps'] = result[1]
+        return result
+    
+    if cache is None:
+        return _reduce(expr, strategy, max_steps, stats)
+    
+    key = cache.key(expr, strategy)
+    result = cache.lookup(key, max_steps)
+    if result is None:
+        result = _reduce(expr, strategy, max_steps, stats, cache)
+        cache.store(key, result, count_nodes(expr), references(expr))
+    elif stats is not None:
+        stats['steps'] = result[1]
+        stats['cached'] = True
+    return result
+
+
+def _reduce(expr, strategy, max_steps, stats, cache=None):
+    if strategy == "need":
+        return need_normalize(expr, max_steps, stats)
+    if strategy == "optimal":
+        return optimal_normalize(expr, max_steps, stats)
+    if strategy == "explicit":
+        return explicit_normalize(expr, max_steps, stats)
+    
     if strategy == "normal":
-        return beta_reduce_normal_order(expr, max_steps)
+        if cache is not None:
+            result = _normal_order_with_cache(expr, max_steps, cache)
+        else:
+            result = beta_reduce_normal_order(expr, max_steps)
     elif strategy == "applicative":
-        return beta_reduce_applicative_order(expr, max_steps)
+        result = beta_reduce_applicative_order(expr, max_steps, cache=cache)
+    elif strategy == "machine":
+        result = krivine_normalize(expr, max_steps)
+    elif strategy == "delta":
+        from lambda_calculus.delta import delta_reduce
+        result = delta_reduce(expr, max_steps)
+    elif strategy == "whnf":
+        result = reduce_to_weak_head_normal_form(expr, max_steps)
+    elif strategy == "hnf":
+        result = reduce_to_head_normal_form(expr, max_steps)
     else:
         raise ValueError(f"Unknown evaluation strategy: {strategy}")
+    
+    if stats is not None:
+        stats['steps'] = result[1]
+    return result
@@ -0,0 +1,94 @@
+import marshal
+from array import array
+
+from lambda_calculus.syntax import Variable, Abstraction, Application, Global
+
+
+FORMAT_VERSION = 1
+
+_VARIABLE, _ABSTRACTION, _APPLICATION, _REFERENCE = range(4)
+
+
+def encode(expr):
+    # Postfix codes; subterms shared by identity are written once and
+    # referenced afterwards, so DAG-shaped reduction results stay compact.
+    names = {}
+    seen = {}
+    codes = array('I')
+    stack = [(expr, False)]
+
+    while stack:
+        node, done = stack.pop()
+
+        if isinstance(node, Variable):
+            codes.append(names.setdefault(node.name, len(names)) * 4 + _VARIABLE)
+            continue
+
+        if isinstance(node, Global):
+            # Written out in full; the definition is shared by identity.
+            stack.append((node.unfold(), False))
+            continue
+
+        if not done:
+            shared = seen.get(id(node))
+            if shared is not None:
+                codes.append(shared * 4 + _REFERENCE)
+                continue
+            stack.append((node, True))
+            if isinstance(node, Abstraction):
+                stack.append((node.body, False))
+            elif isinstance(node, Application):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                raise TypeError(f"Unknown expression type: {type(node)}")
+            continue
+
+        if isinstance(node, Abstraction):
+            codes.append(names.setdefault(node.param, len(names)) * 4 + _ABSTRACTION)
+        else:
+            codes.append(_APPLICATION)
+        seen[id(node)] = len(seen)
+
+    return tuple(names), codes.tobytes()
+
+
+def decode(names, code_bytes):
+    codes = array('I')
+    codes.frombytes(code_bytes)
+    variables = {}
+    table = []
+    out = []
+
+    for code in codes:
+        kind = code & 3
+        if kind == _VARIABLE:
+            node = variables.get(code)
+            if node is None:
+                node = variables[code] = Variable(names[code >> 2])
+            out.append(node)
+        elif kind == _REFERENCE:
+            out.append(table[code >> 2])
+        else:
+            if kind == _ABSTRACTION:
+                node = Abstraction(names[code >> 2], out.pop())
+            else:
+                right = out.pop()
+                node = Application(out.pop(), right)
+            table.append(node)
+            out.append(node)
+
+    if len(out) != 1:
+        raise ValueError("Malformed serialized expression")
+    return out[0]
+
+
+def dumps(expr):
+    return marshal.dumps((FORMAT_VERSION,) + encode(expr))
+
+
+def loads(data):
+    version, names, code_bytes = marshal.loads(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported serialized expression version: {version}")
+    return decode(names, code_bytes)
@@ -0,0 +1,569 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import multiprocessing
+import os
+import struct
+import sys
+import threading
+import time
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+
+from lambda_calculus.syntax import Global
+from lambda_calculus.parser import parse, ParseError
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import link, define
+from lambda_calculus.limits import evaluate
+from lambda_calculus.semantics import ReductionStream, observe_boolean
+from lambda_calculus.encodings import extract_church_numeral
+from lambda_calculus.serialize import dumps, loads
+from lambda_calculus.printer import format_expr
+
+
+WEB_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web")
+STRATEGIES = ("normal", "applicative", "machine", "need", "delta", "explicit", "optimal",
+              "whnf", "hnf", "step")
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_TEXT, _CLOSE, _PING, _PONG = 0x1, 0x8, 0x9, 0xA
+_MAX_BODY = 1 << 24
+
+
+_prelude = None
+
+
+def shared_prelude():
+    # Linked once per process and never modified; sessions layer their own
+    # definitions over it.
+    global _prelude
+    if _prelude is None:
+        prelude = load_prelude()
+        definitions = {}
+        for name in prelude.standard_names:
+            define(definitions, name, prelude[name])
+        _prelude = MappingProxyType(definitions)
+    return _prelude
+
+
+class Session:
+    """The variables of one client, over the shared prelude."""
+
+    def __init__(self, prelude=None):
+        self.variables = ChainMap({}, shared_prelude() if prelude is None else prelude)
+        self.running = {}
+
+    def parse_expression(self, source):
+        if not isinstance(source, str):
+            raise TypeError("expression must be a string")
+        if source in self.variables:
+            return self.variables[source]
+        return link(parse(source), self.variables)
+
+    def define(self, name, source):
+        # As in the REPL, a definition mentioning its own name means the
+        # current value.
+        if not isinstance(name, str):
+            raise TypeError("name must be a string")
+        return define(self.variables, name, self.parse_expression(source))
+
+    def listing(self):
+        return {name: str(value.definition) for name, value in sorted(self.variables.items())}
+
+
+# Workers share one byte per in-flight job for cancellation and one queue for
+# progress. Both are handed over when a worker starts, which is the only time
+# multiprocessing lets them be passed.
+
+_flags = None
+_progress = None
+
+
+class _Flag:
+    __slots__ = ('slot',)
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def is_set(self):
+        return _flags[self.slot] != 0
+
+
+def _init_worker(flags, progress):
+    global _flags, _progress
+    _flags = flags
+    _progress = progress
+
+
+def _observe(expr):
+    numeral = extract_church_numeral(expr)
+    boolean = observe_boolean(expr, 100) if numeral is None else None
+    return numeral, boolean
+
+
+def _run_job(payload):
+    (job, slot, data, strategy, max_steps, timeout, detect_divergence, interval,
+     max_output) = payload
+    start = time.monotonic()
+    try:
+        expr = loads(data)
+        if strategy == "step":
+            stream = ReductionStream(expr)
+            steps = 1 if next(stream, None) is not None else 0
+            reduced, converged, limit, cycle = stream.term, steps == 0, None, None
+        else:
+            last = [start]
+
+            def progress(steps, term):
+                now = time.monotonic()
+                if now - last[0] >= interval:
+                    last[0] = now
+                    _progress.put((job, steps, term.size(), now - start))
+
+            result = evaluate(expr, strategy, max_steps, timeout=timeout, cancel=_Flag(slot),
+                              detect_divergence=detect_divergence, progress=progress)
+            reduced, steps, converged = result
+            limit, cycle = result.limit, result.cycle
+        numeral, boolean = _observe(reduced) if converged else (None, None)
+        return (format_expr(reduced, max_width=max_output), dumps(reduced), steps, converged, limit, cycle,
+                time.monotonic() - start, numeral, boolean, None)
+    except Exception as e:
+        return (None, None, 0, False, None, None, time.monotonic() - start, None, None,
+                f"{type(e).__name__}: {e}")
+
+
+class EvaluationServer:
+    def __init__(self, host="127.0.0.1", port=8000, workers=None, max_steps=10**6,
+                 timeout=30.0, web_root=WEB_ROOT, progress_interval=0.1, max_output=10**5):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.web_root = os.path.realpath(web_root)
+        self.progress_interval = progress_interval
+        self.max_output = max_output
+        self.prelude = shared_prelude()
+        self.server = None
+        self.executor = None
+        self.sessions = set()
+        self.connections = {}
+
+        # Jobs beyond the number of flags wait here rather than in the pool,
+        # so that every submitted job can be cancelled.
+        slots = 4 * self.workers
+        # Workers are started on demand, while connections are open. Forked
+        # from this process, they would hold copies of those sockets and keep
+        # them from closing.
+        self.context = multiprocessing.get_context("forkserver")
+        self.flags = self.context.RawArray('b', slots)
+        self.free_slots = None
+        self.progress = self.context.Queue()
+        self.listeners = {}
+        self.next_job = 0
+        self._reader = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.free_slots = asyncio.Queue()
+        for slot in range(len(self.flags)):
+            self.free_slots.put_nowait(slot)
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=self.context,
+                                            initializer=_init_worker,
+                                            initargs=(self.flags, self.progress))
+        self._reader = threading.Thread(target=self._read_progress, args=(loop,), daemon=True)
+        self._reader.start()
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.server.close()
+        for session in list(self.sessions):
+            self._cancel_all(session)
+        # Closing the transports ends the open connections' reads.
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.progress.put(None)
+        self._reader.join()
+
+    def _read_progress(self, loop):
+        while True:
+            message = self.progress.get()
+            if message is None:
+                return
+            loop.call_soon_threadsafe(self._dispatch_progress, message)
+
+    def _dispatch_progress(self, message):
+        job, steps, size, elapsed = message
+        listener = self.listeners.get(job)
+        if listener is not None:
+            listener(steps, size, elapsed)
+
+    # Evaluation
+
+    async def evaluate(self, session, source, strategy="normal", max_steps=None, timeout=None,
+                       detect_divergence=False, on_progress=None):
+        """Evaluate source in session on the worker pool; returns a dict
+        describing the result."""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        max_steps = self.max_steps if max_steps is None else min(int(max_steps), self.max_steps)
+        timeout = self.timeout if timeout is None else min(float(timeout), self.timeout)
+        data = dumps(session.parse_expression(source))
+
+        slot = await self.free_slots.get()
+        job = self.next_job
+        self.next_job += 1
+        self.flags[slot] = 0
+        if on_progress is not None:
+            self.listeners[job] = on_progress
+        task = asyncio.current_task()
+        session.running[task] = slot
+        try:
+            payload = (job, slot, data, strategy, max_steps, timeout, detect_divergence,
+                       self.progress_interval, self.max_output)
+            future = asyncio.get_running_loop().run_in_executor(self.executor, _run_job, payload)
+            try:
+                raw = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The slot cannot be reused until the worker has seen its flag.
+                self.flags[slot] = 1
+                await asyncio.wait([future])
+                raise
+        finally:
+            del session.running[task]
+            self.listeners.pop(job, None)
+            self.free_slots.put_nowait(slot)
+
+        text, result, steps, converged, limit, cycle, elapsed, numeral, boolean, error = raw
+        if error is not None:
+            raise RuntimeError(error)
+        session.variables['it'] = Global('it', loads(result))
+        return {'result': text, 'steps': steps, 'converged': converged, 'limit': limit,
+                'cycle': cycle, 'elapsed': elapsed, 'numeral': numeral, 'boolean': boolean}
+
+    def cancel(self, session, task):
+        # A job already handed to the pool is stopped through its flag and
+        # still returns its partial result; one waiting for a slot is
+        # simply cancelled.
+        slot = session.running.get(task)
+        if slot is None:
+            task.cancel()
+        else:
+            self.flags[slot] = 1
+
+    def _cancel_all(self, session):
+        for task in list(session.running):
+            self.cancel(session, task)
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            await self._serve_connection(reader, writer)
+        finally:
+            del self.connections[task]
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            await self._respond(writer, 400, b"Bad request")
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        path = target.split("?", 1)[0]
+
+        try:
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, headers)
+            elif method == "POST" and path == "/api/evaluate":
+                length = headers.get("content-length")
+                if length is None:
+                    await self._respond(writer, 411, b"Length required")
+                elif not (length.isascii() and length.isdigit()):
+                    await self._respond(writer, 400, b"Bad Content-Length")
+                elif int(length) > _MAX_BODY:
+                    await self._respond(writer, 413, b"Request body too large")
+                else:
+                    body = await reader.readexactly(int(length))
+                    await self._evaluate_http(writer, body)
+            elif method == "GET" and path == "/api/health":
+                await self._respond(writer, 200, json.dumps(
+                    {'workers': self.workers, 'sessions': len(self.sessions)}).encode(),
+                    "application/json")
+            elif method in ("GET", "HEAD"):
+                await self._static(writer, path, method == "HEAD")
+            else:
+                await self._respond(writer, 405, b"Method not allowed")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+    async def _respond(self, writer, status, body, content_type="text/plain; charset=utf-8",
+                       head=False):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  411: "Length Required", 413: "Content Too Large"}.get(status, "Error")
+        writer.write((f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode())
+        if not head:
+            writer.write(body)
+        await writer.drain()
+        writer.close()
+
+    async def _static(self, writer, path, head):
+        if path.endswith("/"):
+            path += "index.html"
+        file_path = os.path.realpath(os.path.join(self.web_root, path.lstrip("/")))
+        if not file_path.startswith(self.web_root + os.sep) or not os.path.isfile(file_path):
+            await self._respond(writer, 404, b"Not found")
+            return
+        with open(file_path, "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith("javascript"):
+            content_type += "; charset=utf-8"
+        await self._respond(writer, 200, body, content_type, head)
+
+    async def _evaluate_http(self, writer, body):
+        # Stateless: each request sees only the prelude.
+        try:
+            request = json.loads(body)
+            reply = await self.evaluate(
+                Session(self.prelude), request['expression'], request.get('strategy', "normal"),
+                request.get('max_steps'), request.get('timeout'),
+                bool(request.get('detect_divergence'))
+            )
+            status = 200
+        except (ParseError, ValueError, KeyError, TypeError, RuntimeError) as e:
+            reply, status = {'error': str(e)}, 400
+        await self._respond(writer, status, json.dumps(reply, ensure_ascii=False).encode(),
+                            "application/json")
+
+    # WebSocket
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            await self._respond(writer, 400, b"Missing Sec-WebSocket-Key")
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        await writer.drain()
+
+        connection = WebSocket(reader, writer)
+        session = Session(self.prelude)
+        self.sessions.add(session)
+        requests = {}
+        try:
+            while True:
+                text = await connection.receive()
+                if text is None:
+                    break
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    await connection.send_json({'type': 'error', 'message': "Invalid JSON"})
+                    continue
+                if not isinstance(message, dict):
+                    await connection.send_json({'type': 'error', 'message': "Expected an object"})
+                    continue
+                self._dispatch(connection, session, requests, message)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            self._cancel_all(session)
+            for task in list(requests.values()):
+                task.cancel()
+            writer.close()
+
+    def _dispatch(self, connection, session, requests, message):
+        kind = message.get('type')
+        request_id = message.get('id')
+        if kind == 'evaluate':
+            task = asyncio.create_task(self._evaluate_message(connection, session, message))
+            requests[request_id] = task
+            task.add_done_callback(lambda _: requests.pop(request_id, None))
+        elif kind == 'cancel':
+            task = requests.get(request_id)
+            if task is not None:
+                self.cancel(session, task)
+        elif kind == 'define':
+            try:
+                value = session.define(message['name'], message['expression'])
+                reply = {'type': 'defined', 'name': value.name, 'expression': str(value.definition)}
+            except (ParseError, ValueError, KeyError, TypeError) as e:
+                reply = {'type': 'error', 'message': str(e)}
+            connection.send_later(dict(reply, id=request_id))
+        elif kind == 'variables':
+            connection.send_later({'type': 'variables', 'id': request_id,
+                                   'variables': session.listing()})
+        else:
+            connection.send_later({'type': 'error', 'id': request_id,
+                                   'message': f"Unknown message type: {kind}"})
+
+    async def _evaluate_message(self, connection, session, message):
+        request_id = message.get('id')
+
+        def progress(steps, size, elapsed):
+            connection.send_later({'type': 'progress', 'id': request_id, 'steps': steps,
+                                   'size': size, 'elapsed': elapsed})
+
+        try:
+            reply = await self.evaluate(
+                session, message['expression'], message.get('strategy', "normal"),
+                message.get('max_steps'), message.get('timeout'),
+                bool(message.get('detect_divergence')), progress
+            )
+            reply['type'] = 'cancelled' if reply['limit'] == 'cancelled' else 'result'
+        except asyncio.CancelledError:
+            reply = {'type': 'cancelled', 'steps': 0}
+        except (ParseError, ValueError, KeyError, TypeError, RuntimeError) as e:
+            reply = {'type': 'error', 'message': str(e)}
+        reply['id'] = request_id
+        try:
+            await connection.send_json(reply)
+        except ConnectionError:
+            pass
+
+
+def encode_frame(opcode, payload, mask=None):
+    """A single final frame; clients must pass a 4-byte mask."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    if mask is None:
+        return header + payload
+    header = header[:1] + bytes([header[1] | 0x80]) + header[2:]
+    return header + mask + _unmask(payload, mask)
+
+
+def _unmask(payload, mask):
+    # XOR as one big integer instead of byte by byte.
+    length = len(payload)
+    if not length:
+        return payload
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+async def read_frame(reader, max_size=1 << 24):
+    """Return (fin, opcode, payload) for the next frame."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > max_size:
+        raise ValueError("WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = _unmask(payload, mask)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+class WebSocket:
+    """Server side of a WebSocket connection carrying JSON text messages."""
+
+    def __init__(self, reader, writer, max_size=1 << 24):
+        self.reader = reader
+        self.writer = writer
+        self.max_size = max_size
+        self.lock = asyncio.Lock()
+
+    async def receive(self):
+        """Return the next text message, or None once the connection closes."""
+        parts = []
+        size = 0
+        while True:
+            fin, opcode, payload = await read_frame(self.reader, self.max_size)
+            if opcode == _CLOSE:
+                await self._send(_CLOSE, payload[:2])
+                return None
+            if opcode == _PING:
+                await self._send(_PONG, payload)
+                continue
+            if opcode == _PONG:
+                continue
+            size += len(payload)
+            if size > self.max_size:
+                raise ValueError("WebSocket message too large")
+            parts.append(payload)
+            if fin:
+                return b"".join(parts).decode("utf-8")
+
+    async def send_json(self, message):
+        await self._send(_TEXT, json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+    def send_later(self, message):
+        task = asyncio.ensure_future(self.send_json(message))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _send(self, opcode, payload):
+        async with self.lock:
+            if self.writer.is_closing():
+                raise ConnectionResetError("WebSocket connection closed")
+            self.writer.write(encode_frame(opcode, payload))
+            await self.writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the web interface and evaluate on a process pool")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-steps", type=int, default=10**6,
+                        help="largest step limit a request may ask for")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="largest time limit in seconds a request may ask for")
+    parser.add_argument("--max-output", type=int, default=10**5,
+                        help="cut printed results to this many characters")
+    args = parser.parse_args(argv)
+
+    server = EvaluationServer(args.host, args.port, args.workers, args.max_steps, args.timeout,
+                              max_output=args.max_output)
+
+    async def run():
+        await server.start()
+        print(f"Serving on http://{args.host}:{server.port}/ with {server.workers} workers")
+        try:
+            await server.server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 class Expr:
+    __slots__ = ('_free_variables', '_size', '_debruijn')
+    
     def __str__(self):
         raise NotImplementedError("Subclasses must implement __str__")
     
@@ -11,16 +13,28 @@ class Expr:
     def bound_variables(self):
         raise NotImplementedError("Subclasses must implement bound_variables")
     
+    def size(self):
+        raise NotImplementedError("Subclasses must implement size")
+    
     def substitute(self, var_name, replacement):
         raise NotImplementedError("Subclasses must implement substitute")
     
     def is_alpha_equivalent(self, other):
-        raise NotImplementedError("Subclasses must implement is_alpha_equivalent")
+        from lambda_calculus.debruijn import alpha_equivalent
+
+        if not isinstance(other, Expr):
+            return False
+        return alpha_equivalent(self, other)
 
 
 class Variable(Expr):
+    __slots__ = ('name',)
+    
     def __init__(self, name):
         self.name = name
+        self._free_variables = None
+        self._size = 1
+        self._debruijn = None
     
     def __str__(self):
         return self.name
@@ -31,113 +45,335 @@ class Variable(Expr):
         return self.name == other.name
     
     def free_variables(self):
-        return {self.name}
+        if self._free_variables is None:
+            self._free_variables = frozenset((self.name,))
+        return self._free_variables
     
     def bound_variables(self):
         return set()
     
+    def size(self):
+        return 1
+    
     def substitute(self, var_name, replacement):
 
         if self.name == var_name:
             return replacement
         return self
+
+
+class Global(Expr):
+    """A named definition, opened only when reduction reaches it."""
+    __slots__ = ('name', 'definition')
     
-    def is_alpha_equivalent(self, other):
-        if not isinstance(other, Variable):
+    def __init__(self, name, definition):
+        self.name = name
+        self.definition = definition
+        self._free_variables = None
+        self._size = 1
+        self._debruijn = None
+    
+    def __str__(self):
+        return self.name
+    
+    def __eq__(self, other):
+        if not isinstance(other, Global):
             return False
-        return self.name == other.name
+        return self.name == other.name and (self.definition is other.definition
+                                            or self.definition == other.definition)
+    
+    def free_variables(self):
+        if self._free_variables is None:
+            self._free_variables = self.definition.free_variables()
+        return self._free_variables
+    
+    def bound_variables(self):
+        return set()
+    
+    def size(self):
+        return 1
+    
+    def substitute(self, var_name, replacement):
+        # Only definitions that mention free variables are ever opened here.
+        if var_name in self.free_variables():
+            return self.definition.substitute(var_name, replacement)
+        return self
+    
+    def unfold(self):
+        expr = self.definition
+        while isinstance(expr, Global):
+            expr = expr.definition
+        return expr
 
 
 class Abstraction(Expr):
+    __slots__ = ('param', 'body')
+    
     def __init__(self, param, body):
         self.param = param
         self.body = body
+        self._free_variables = None
+        self._size = None
+        self._debruijn = None
     
     def __str__(self):
-        return f"λ{self.param}.{str(self.body)}"
+        return _to_string(self)
     
     def __eq__(self, other):
-        if not isinstance(other, Abstraction):
-            return False
-        return self.param == other.param and self.body == other.body
+        return _structurally_equal(self, other)
     
     def free_variables(self):
-        return self.body.free_variables() - {self.param}
+        if self._free_variables is None:
+            _compute_free_variables(self)
+        return self._free_variables
     
     def bound_variables(self):
-        return {self.param} | self.body.bound_variables()
+        return _collect_bound_variables(self)
+    
+    def size(self):
+        if self._size is None:
+            _compute_size(self)
+        return self._size
     
     def substitute(self, var_name, replacement):
-        
-        if self.param == var_name:
-            return self
-        
-        if self.param in replacement.free_variables():
-            new_param = self._fresh_name(
-                self.param, 
-                replacement.free_variables() | self.body.free_variables()
-            )
-            new_body = self.body.substitute(self.param, Variable(new_param))
-            final_body = new_body.substitute(var_name, replacement)
-            return Abstraction(new_param, final_body)
-        
-        return Abstraction(self.param, self.body.substitute(var_name, replacement))
-    
-    def _fresh_name(self, base_name, used_names):
-        i = 0
-        new_name = base_name
-        while new_name in used_names:
-            i += 1
-            new_name = f"{base_name}{i}"
-        return new_name
+        return _substitute(self, var_name, replacement)
+
+
+class Application(Expr):
+    __slots__ = ('left', 'right')
     
-    def is_alpha_equivalent(self, other):
-        if not isinstance(other, Abstraction):
-            return False
-        
-        if self.param == other.param:
-            return self.body.is_alpha_equivalent(other.body)
-        
-        fresh_param = self._fresh_name(
-            self.param, 
-            self.body.free_variables() | other.body.free_variables()
-        )
-        
-        self_body_renamed = self.body.substitute(self.param, Variable(fresh_param))
-        other_body_renamed = other.body.substitute(other.param, Variable(fresh_param))
-        
-        return self_body_renamed.is_alpha_equivalent(other_body_renamed)
-
-
-class Application(Expr):    
     def __init__(self, left, right):
         self.left = left
         self.right = right
+        self._free_variables = None
+        self._size = None
+        self._debruijn = None
     
     def __str__(self):
-        left_str = f"({self.left})" if isinstance(self.left, Abstraction) else str(self.left)
-        right_str = f"({self.right})" if isinstance(self.right, (Application, Abstraction)) else str(self.right)
-        return f"{left_str} {right_str}"
+        return _to_string(self)
     
     def __eq__(self, other):
-        if not isinstance(other, Application):
-            return False
-        return self.left == other.left and self.right == other.right
+        return _structurally_equal(self, other)
     
     def free_variables(self):
-        return self.left.free_variables() | self.right.free_variables()
+        if self._free_variables is None:
+            _compute_free_variables(self)
+        return self._free_variables
     
     def bound_variables(self):
-        return self.left.bound_variables() | self.right.bound_variables()
+        return _collect_bound_variables(self)
     
-    def substitute(self, var_name, replacement):
-        return Application(
-            self.left.substitute(var_name, replacement),
-            self.right.substitute(var_name, replacement)
-        )
+    def size(self):
+        if self._size is None:
+            _compute_size(self)
+        return self._size
     
-    def is_alpha_equivalent(self, other):
-        if not isinstance(other, Application):
+    def substitute(self, var_name, replacement):
+        return _substitute(self, var_name, replacement)
+
+
+def _to_string(expr):
+    parts = []
+    stack = [expr]
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, Abstraction):
+            parts.append(f"λ{item.param}.")
+            stack.append(item.body)
+        elif isinstance(item, Application):
+            if isinstance(item.right, (Application, Abstraction)):
+                stack.extend((")", item.right, " ("))
+            else:
+                stack.extend((item.right, " "))
+            if isinstance(item.left, Abstraction):
+                stack.extend((")", item.left, "("))
+            else:
+                stack.append(item.left)
+        else:
+            parts.append(str(item))
+
+    return "".join(parts)
+
+
+def _structurally_equal(expr, other):
+    stack = [(expr, other)]
+
+    while stack:
+        left, right = stack.pop()
+        if left is right:
+            continue
+
+        if isinstance(left, Abstraction):
+            if not isinstance(right, Abstraction) or left.param != right.param:
+                return False
+            stack.append((left.body, right.body))
+        elif isinstance(left, Application):
+            if not isinstance(right, Application):
+                return False
+            stack.append((left.right, right.right))
+            stack.append((left.left, right.left))
+        elif left != right:
             return False
-        return (self.left.is_alpha_equivalent(other.left) and 
-                self.right.is_alpha_equivalent(other.right))
+
+    return True
+
+
+def _compute_free_variables(expr):
+    stack = [expr]
+
+    while stack:
+        node = stack[-1]
+        if node._free_variables is not None:
+            stack.pop()
+            continue
+
+        if isinstance(node, Abstraction):
+            if node.body._free_variables is None:
+                stack.append(node.body)
+                continue
+            body_free = node.body._free_variables
+            if node.param in body_free:
+                body_free = body_free - {node.param}
+            node._free_variables = body_free
+        elif isinstance(node, Application):
+            pending = [child for child in (node.right, node.left)
+                       if child._free_variables is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            left_free = node.left._free_variables
+            right_free = node.right._free_variables
+            if right_free <= left_free:
+                node._free_variables = left_free
+            elif left_free <= right_free:
+                node._free_variables = right_free
+            else:
+                node._free_variables = left_free | right_free
+        else:
+            node.free_variables()
+
+        stack.pop()
+
+
+def _compute_size(expr):
+    stack = [expr]
+
+    while stack:
+        node = stack[-1]
+        if node._size is not None:
+            stack.pop()
+            continue
+
+        if isinstance(node, Abstraction):
+            if node.body._size is None:
+                stack.append(node.body)
+                continue
+            node._size = node.body._size + 1
+        else:
+            pending = [child for child in (node.right, node.left) if child._size is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            node._size = node.left._size + node.right._size + 1
+
+        stack.pop()
+
+
+def _collect_bound_variables(expr):
+    names = set()
+    stack = [expr]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Abstraction):
+            names.add(node.param)
+            stack.append(node.body)
+        elif isinstance(node, Application):
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            names |= node.bound_variables()
+
+    return names
+
+
+def fresh_name(base_name, used_names):
+    """base_name, or base_name with the first number appended that is not in used_names."""
+    i = 0
+    new_name = base_name
+    while new_name in used_names:
+        i += 1
+        new_name = f"{base_name}{i}"
+    return new_name
+
+
+def _substitute(expr, var_name, replacement):
+    return _substitute_all(expr, {var_name: replacement})
+
+
+def _substitute_all(expr, mapping):
+    # Replaces every name in mapping at once. Subterms free of all of them
+    # are shared with the result, and a binder that would capture a free
+    # variable of a replacement is renamed by extending the mapping for its
+    # body, in the same pass.
+    out = []
+    stack = [(expr, mapping, _free_in_values(mapping))]
+
+    while stack:
+        item = stack.pop()
+
+        if len(item) < 3:
+            if item:
+                out.append(Abstraction(item[0], out.pop()))
+            else:
+                right = out.pop()
+                out.append(Application(out.pop(), right))
+            continue
+
+        node, mapping, values_free = item
+        if node.free_variables().isdisjoint(mapping):
+            out.append(node)
+        elif isinstance(node, Variable):
+            out.append(mapping[node.name])
+        elif isinstance(node, Abstraction):
+            param = node.param
+            body = node.body
+            if param in mapping:
+                mapping = {name: value for name, value in mapping.items() if name != param}
+                values_free = _free_in_values(mapping)
+            if param in values_free:
+                body_free = body.free_variables()
+                used = set()
+                for name, value in mapping.items():
+                    if name in body_free:
+                        used |= value.free_variables()
+                if param in used:
+                    param = fresh_name(param, used | body_free)
+                    mapping = dict(mapping)
+                    mapping[node.param] = Variable(param)
+                    values_free = values_free | {param}
+            stack.append((param,))
+            stack.append((body, mapping, values_free))
+        elif isinstance(node, Application):
+            stack.append(())
+            stack.append((node.right, mapping, values_free))
+            stack.append((node.left, mapping, values_free))
+        elif isinstance(node, Global):
+            # Only definitions that mention free variables are ever opened here.
+            stack.append((node.definition, mapping, values_free))
+        else:
+            raise TypeError(f"Unknown expression type: {type(node)}")
+
+    return out[0]
+
+
+def _free_in_values(mapping):
+    values = iter(mapping.values())
+    free = next(values).free_variables() if mapping else frozenset()
+    for value in values:
+        free = free | value.free_variables()
+    return free
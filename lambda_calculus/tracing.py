@@ -0,0 +1,165 @@
+import json
+
+from lambda_calculus.syntax import Abstraction, Application, Global
+from lambda_calculus.debruijn import to_debruijn
+
+
+class StepEvent:
+    __slots__ = ('strategy', 'step', 'path', 'redex', 'contractum', 'term', 'size',
+                 'substitution_time', 'time')
+
+    def __init__(self, strategy, step, path, redex, contractum, term, substitution_time, time):
+        self.strategy = strategy
+        self.step = step
+        self.path = path
+        self.redex = redex
+        self.contractum = contractum
+        self.term = term
+        self.size = term.size()
+        self.substitution_time = substitution_time
+        self.time = time
+
+    def __repr__(self):
+        return (f"StepEvent(strategy={self.strategy!r}, step={self.step}, "
+                f"path={'.'.join(self.path) or 'root'}, size={self.size}, "
+                f"substitution_time={self.substitution_time:.6f}, time={self.time:.6f})")
+
+
+class ReductionStep:
+    __slots__ = ('strategy', 'step', 'path', 'contractum')
+
+    def __init__(self, strategy, step, path, contractum):
+        self.strategy = strategy
+        self.step = step
+        self.path = path
+        self.contractum = contractum
+
+    def __repr__(self):
+        return (f"ReductionStep(strategy={self.strategy!r}, step={self.step}, "
+                f"path={'.'.join(self.path) or 'root'}, contractum={self.contractum})")
+
+    def to_json(self):
+        return {"step": self.step, "path": list(self.path), "contractum": str(self.contractum)}
+
+
+def apply_step(expr, step):
+    """The term after step, given the term before it."""
+    # Paths do not record the definitions opened on the way to a redex.
+    parents = []
+    node = expr
+    for direction in step.path:
+        while isinstance(node, Global):
+            node = node.unfold()
+        parents.append((node, direction))
+        node = getattr(node, direction)
+
+    result = step.contractum
+    for parent, direction in reversed(parents):
+        if direction == 'body':
+            result = Abstraction(parent.param, result)
+        elif direction == 'left':
+            result = Application(result, parent.right)
+        else:
+            result = Application(parent.left, result)
+    return result
+
+
+def write_trace(steps, out):
+    """Write steps to the text file out, one JSON object per line."""
+    count = 0
+    for step in steps:
+        out.write(json.dumps(step.to_json(), ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def path_directions(path):
+    directions = []
+    while path is not None:
+        _, direction, path = path
+        directions.append(direction)
+    directions.reverse()
+    return tuple(directions)
+
+
+class RedexProfiler:
+    anonymous = "(anonymous)"
+
+    def __init__(self, definitions=None):
+        # Maps id(node) to (node, name); holding the node keeps the id valid.
+        self._origins = {}
+        self._classes = {}
+        self.totals = {}
+        self.steps = 0
+        if definitions:
+            self.add_definitions(definitions)
+
+    def add_definitions(self, definitions):
+        roots = {id(expr): name for name, expr in definitions.items()}
+
+        for name, expr in definitions.items():
+            if isinstance(expr, Abstraction):
+                self._classes.setdefault(to_debruijn(expr), name)
+
+            # Subterms belong to the innermost definition they appear in, so
+            # a definition that embeds PRED does not claim PRED's redexes.
+            stack = [expr]
+            while stack:
+                node = stack.pop()
+                owner = roots.get(id(node))
+                if owner is not None and owner != name:
+                    continue
+                if id(node) not in self._origins:
+                    self._origins[id(node)] = (node, name)
+                if isinstance(node, Abstraction):
+                    stack.append(node.body)
+                elif isinstance(node, Application):
+                    stack.append(node.right)
+                    stack.append(node.left)
+
+    def origin(self, redex):
+        function = redex.left
+        entry = self._origins.get(id(function))
+        if entry is not None:
+            return entry[1]
+        return self._classes.get(to_debruijn(function), self.anonymous)
+
+    def _inherit(self, contractum, name):
+        # Abstractions created by the substitution are copies of the applied
+        # function's body, so the redexes they form later count towards it.
+        stack = [contractum]
+        while stack:
+            node = stack.pop()
+            if id(node) in self._origins:
+                continue
+            if isinstance(node, Abstraction):
+                self._origins[id(node)] = (node, name)
+                stack.append(node.body)
+            elif isinstance(node, Application):
+                self._origins[id(node)] = (node, name)
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def __call__(self, event):
+        name = self.origin(event.redex)
+        if name != self.anonymous:
+            self._inherit(event.contractum, name)
+
+        entry = self.totals.get(name)
+        if entry is None:
+            entry = self.totals[name] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += event.substitution_time
+        entry[2] = max(entry[2], event.size)
+        self.steps += 1
+
+    def report(self):
+        rows = [(name, steps, substitution_time, max_size)
+                for name, (steps, substitution_time, max_size) in self.totals.items()]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows
+
+    def clear(self):
+        self.totals.clear()
+        self.steps = 0
@@ -1,4 +1,6 @@
+import sys
+
 from lambda_calculus.repl import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
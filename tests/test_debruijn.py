@@ -0,0 +1,32 @@
+import unittest
+
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.parser import parse
+from lambda_calculus.debruijn import Lam, App, Index, Free, to_debruijn
+
+
+class DeBruijnTest(unittest.TestCase):
+    def test_term_is_cached(self):
+        expr = parse("λx.λy.x (y z)")
+        self.assertIs(expr._debruijn, None)
+        term = to_debruijn(expr)
+        self.assertIs(expr._debruijn, term)
+        self.assertIs(to_debruijn(expr), term)
+
+    def test_cached_subterm_is_not_reused_where_it_is_bound(self):
+        body = Application(Variable('x'), Variable('y'))
+        self.assertIs(to_debruijn(body), App(Free('x'), Free('y')))
+        self.assertIs(to_debruijn(Abstraction('x', body)), Lam(App(Index(0), Free('y'))))
+        # Bound by an outer λ, but not by one inside the subterm.
+        closed = Abstraction('y', Variable('y'))
+        to_debruijn(closed)
+        self.assertIs(to_debruijn(Abstraction('y', Application(closed, Variable('y')))),
+                      Lam(App(Lam(Index(0)), Index(0))))
+
+    def test_alpha_equivalence(self):
+        self.assertTrue(parse("λx.λy.x y").is_alpha_equivalent(parse("λa.λb.a b")))
+        self.assertFalse(parse("λx.λy.x y").is_alpha_equivalent(parse("λa.λb.b a")))
+
+
+if __name__ == "__main__":
+    unittest.main()
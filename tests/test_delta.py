@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from lambda_calculus.syntax import Application, Abstraction, Variable
+from lambda_calculus.parser import parse
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import (
+    SUCC, PRED, MULT, POW, church_numeral, extract_church_numeral,
+)
+
+
+def apply(function, *arguments):
+    for argument in arguments:
+        function = Application(function, argument)
+    return function
+
+
+class DeltaReductionTest(unittest.TestCase):
+    def test_primitives_completed_by_a_beta_step(self):
+        # SUCC is only applied to a numeral once the outer redex is reduced.
+        expr = apply(Abstraction('n', apply(SUCC, apply(PRED, Variable('n')))),
+                     apply(MULT, church_numeral(3), church_numeral(4)))
+        result, _, converged = reduce_to_normal_form(expr, "delta")
+        self.assertTrue(converged)
+        self.assertEqual(extract_church_numeral(result), 12)
+
+    def test_agrees_with_normal_order(self):
+        expr = apply(parse("λf.λx.f (f x)"), apply(POW, church_numeral(2), church_numeral(3)))
+        expected, _, _ = reduce_to_normal_form(expr, "normal", 10**5)
+        result, _, converged = reduce_to_normal_form(expr, "delta")
+        self.assertTrue(converged)
+        self.assertTrue(result.is_alpha_equivalent(expected))
+
+    def test_steps_do_not_rescan_the_term(self):
+        # The whole term was delta-normalized before every β-step, which
+        # made this take seconds.
+        expr = parse("(λx.x x x) (λx.x x x)")
+        start = time.perf_counter()
+        _, steps, converged = reduce_to_normal_form(expr, "delta", 500)
+        self.assertEqual((steps, converged), (500, False))
+        self.assertLess(time.perf_counter() - start, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import define, link
+from lambda_calculus.encodings import ChurchNumeral
+from lambda_calculus.limits import evaluate
+
+
+def standard_definitions():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+    return definitions
+
+
+def best_time(run, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class DivergenceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.definitions = standard_definitions()
+
+    def evaluate(self, source):
+        return evaluate(link(parse(source), self.definitions), "normal", 10**5,
+                        timeout=10.0, detect_divergence=True)
+
+    def test_cycle(self):
+        result = self.evaluate("(λx.x x) (λx.x x)")
+        self.assertEqual((result.limit, result.cycle), ('cycle', 1))
+
+    def test_growth(self):
+        for source in ["(λx.x x x) (λx.x x x)",
+                       "(λf.(λx.f (x x)) (λx.f (x x))) (λf.λx.f x x) z"]:
+            self.assertEqual(self.evaluate(source).limit, 'growth', source)
+
+    def test_terminating_programs_are_not_stopped(self):
+        for source in ["POW TWO (MULT TWO THREE)", "PRED (POW THREE THREE)"]:
+            result = self.evaluate(source)
+            self.assertTrue(result.converged, source)
+            self.assertIsNone(result.limit, source)
+
+    def test_overhead_does_not_grow_with_the_redexes(self):
+        # Every redex of PRED n holds a chain as long as n; converting each
+        # one in full made detection over ten times slower here.
+        expr = Application(link(parse("PRED"), self.definitions),
+                           parse(str(ChurchNumeral(400))))
+        plain = best_time(lambda: evaluate(expr, "normal", 10**5))
+        detected = best_time(lambda: evaluate(expr, "normal", 10**5, detect_divergence=True))
+        self.assertLess(detected, 5 * plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.encodings import (
+    TRUE, FALSE, ZERO, ONE, TWO, THREE, SUB, IS_ZERO, LEQ, EQ, NIL, IS_NIL, HEAD,
+    church_numeral, extract_church_numeral, to_boolean, create_church_list,
+)
+
+
+def apply(function, *arguments):
+    for argument in arguments:
+        function = Application(function, argument)
+    return function
+
+
+def numeral(expr):
+    reduced, _, converged = reduce_to_normal_form(expr, "normal", 10**5)
+    assert converged
+    return extract_church_numeral(reduced)
+
+
+class ExportedDefinitionsTest(unittest.TestCase):
+    def test_definitions_are_closed(self):
+        for definition in (SUB, IS_ZERO, LEQ, EQ, NIL):
+            self.assertEqual(definition.free_variables(), frozenset())
+
+    def test_booleans(self):
+        self.assertIs(to_boolean(apply(IS_ZERO, ZERO)), True)
+        self.assertIs(to_boolean(apply(IS_ZERO, ONE)), False)
+        self.assertIs(to_boolean(apply(LEQ, TWO, THREE)), True)
+        self.assertIs(to_boolean(apply(EQ, TWO, TWO)), True)
+        self.assertIs(to_boolean(apply(EQ, TWO, THREE)), False)
+        self.assertIs(to_boolean(apply(IS_NIL, NIL)), True)
+        self.assertIs(to_boolean(TRUE), True)
+        self.assertIs(to_boolean(FALSE), False)
+
+    def test_subtraction(self):
+        self.assertEqual(numeral(apply(SUB, THREE, ONE)), 2)
+        self.assertEqual(numeral(apply(SUB, ONE, THREE)), 0)
+
+    def test_builders(self):
+        self.assertEqual(numeral(church_numeral(4)), 4)
+        self.assertEqual(numeral(apply(HEAD, create_church_list([2, 1], church_numeral))), 2)
+        self.assertEqual(create_church_list([]).free_variables(), frozenset())
+
+
+if __name__ == "__main__":
+    unittest.main()
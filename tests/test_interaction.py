@@ -0,0 +1,61 @@
+import unittest
+
+from lambda_calculus.parser import parse
+from lambda_calculus.prelude import load_prelude
+from lambda_calculus.definitions import define, link
+from lambda_calculus.semantics import reduce_to_normal_form
+from lambda_calculus.interaction import optimal_normalize
+from lambda_calculus.limits import evaluate
+
+
+def standard_definitions():
+    prelude = load_prelude()
+    definitions = {}
+    for name in prelude.standard_names:
+        define(definitions, name, prelude[name])
+    return definitions
+
+
+class OptimalReductionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.definitions = standard_definitions()
+
+    def assert_same_normal_form(self, source):
+        expr = link(parse(source), self.definitions)
+        expected, _, _ = reduce_to_normal_form(expr, "normal", 10**6)
+        result, _, finished = optimal_normalize(expr, 10**6)
+        self.assertTrue(finished, source)
+        self.assertTrue(result.is_alpha_equivalent(expected), source)
+
+    def test_definitions_used_more_than_once(self):
+        for source in ["POW TWO TWO", "POW TWO (SUCC TWO)", "MULT THREE (POW TWO TWO)",
+                       "EQ ONE (FIRST (PAIR TWO ZERO))", "SUB THREE ONE", "EQ TWO TWO"]:
+            self.assert_same_normal_form(source)
+
+    def test_arithmetic(self):
+        for source in ["PLUS TWO THREE", "MULT TWO THREE", "PRED (PRED THREE)",
+                       "IS_ZERO (SUB TWO THREE)", "LEQ THREE TWO", "OR TRUE FALSE"]:
+            self.assert_same_normal_form(source)
+
+    def test_self_application_of_a_numeral_is_unsupported(self):
+        # OR p q is p p q, so OR TWO ZERO applies TWO to a copy of itself.
+        for source in ["(λx.x x) TWO", "EQ ONE (FIRST (OR TWO ZERO))"]:
+            expr = link(parse(source), self.definitions)
+            stats = {}
+            result, _, converged = optimal_normalize(expr, 10**6, stats)
+            self.assertFalse(converged)
+            self.assertTrue(stats['unsupported'])
+            self.assertIs(result, expr)
+
+    def test_unsupported_terms_are_reported_by_evaluate(self):
+        omega = parse("(λx.x x) (λx.x x)")
+        result, _, converged = reduce_to_normal_form(omega, "optimal", 100)
+        self.assertFalse(converged)
+        expr = link(parse("(λx.x x) TWO"), self.definitions)
+        self.assertEqual(evaluate(expr, "optimal", 10**6).limit, 'unsupported')
+        self.assertEqual(evaluate(expr, "optimal", 10**6, timeout=60).limit, 'unsupported')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import time
+import unittest
+
+from lambda_calculus.syntax import Application
+from lambda_calculus.parser import parse
+from lambda_calculus.encodings import ChurchNumeral, PRED, POW, TWO
+from lambda_calculus.limits import evaluate
+
+
+def best_time(run, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class LimitsTest(unittest.TestCase):
+    def test_max_nodes_stops_growth(self):
+        expr = parse("(λx.x x x) (λx.x x x)")
+        for strategy in ("normal", "applicative", "need"):
+            result = evaluate(expr, strategy, 10**5, max_nodes=1000)
+            self.assertEqual(result.limit, 'nodes', strategy)
+            self.assertFalse(result.converged)
+
+    def test_limits_do_not_change_the_result(self):
+        expr = Application(PRED, parse(str(ChurchNumeral(50))))
+        for strategy in ("normal", "applicative"):
+            plain = evaluate(expr, strategy, 10**5)
+            limited = evaluate(expr, strategy, 10**5, max_nodes=10**6, timeout=60.0)
+            self.assertTrue(limited.converged)
+            self.assertEqual(limited.steps, plain.steps)
+            self.assertTrue(limited.expr.is_alpha_equivalent(plain.expr))
+
+    def test_max_nodes_overhead(self):
+        # Checked on every step, through an observer, this was many times
+        # slower in applicative order.
+        expr = Application(PRED, parse(str(ChurchNumeral(400))))
+        plain = best_time(lambda: evaluate(expr, "applicative", 10**5))
+        limited = best_time(lambda: evaluate(expr, "applicative", 10**5, max_nodes=10**7))
+        self.assertLess(limited, 3 * plain + 0.01)
+
+
+    def test_limits_keep_the_sharing_of_the_machines(self):
+        expr = Application(Application(POW, TWO), ChurchNumeral(5))
+        for strategy in ("machine", "need", "optimal"):
+            plain = evaluate(expr, strategy, 10**5)
+            limited = evaluate(expr, strategy, 10**5, max_nodes=10**6, timeout=60.0,
+                               check_every=5)
+            self.assertTrue(plain.converged and limited.converged, strategy)
+            self.assertEqual(limited.steps, plain.steps, strategy)
+            self.assertTrue(limited.expr.is_alpha_equivalent(plain.expr), strategy)
+
+    def test_machines_stop_on_max_nodes(self):
+        expr = parse("(λx.x x x) (λx.x x x)")
+        for strategy in ("machine", "need"):
+            result = evaluate(expr, strategy, 10**5, max_nodes=10000, check_every=5)
+            self.assertEqual(result.limit, 'nodes', strategy)
+            self.assertLess(result.steps, 2000)
+
+    def test_cycles_are_measured_in_steps(self):
+        omega = parse("(λx.x x) (λx.x x)")
+        for strategy in ("normal", "applicative", "machine", "need", "explicit", "delta",
+                         "whnf", "hnf"):
+            result = evaluate(omega, strategy, 10**4, timeout=60.0, detect_divergence=True)
+            self.assertEqual((result.limit, result.cycle), ('cycle', 1), strategy)
+
+    def test_machines_detect_growth(self):
+        expr = parse("(λx.x x x) (λx.x x x)")
+        for strategy in ("machine", "need"):
+            result = evaluate(expr, strategy, 10**5, timeout=60.0, detect_divergence=True)
+            self.assertEqual(result.limit, 'growth', strategy)
+
+
+if __name__ == "__main__":
+    unittest.main()
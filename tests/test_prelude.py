@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from lambda_calculus.prelude import Prelude
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CacheTest(unittest.TestCase):
+    def test_import_does_not_write_the_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, "cache")
+            env = dict(os.environ, LAMBDA_CALCULUS_CACHE_DIR=cache, PYTHONPATH=ROOT)
+            subprocess.run([sys.executable, "-c", "from lambda_calculus.encodings import ChurchNumeral; "
+                            "import lambda_calculus.limits, lambda_calculus.printer"],
+                           env=env, check=True)
+            self.assertFalse(os.path.exists(cache))
+            subprocess.run([sys.executable, "-c", "from lambda_calculus.encodings import SUB"],
+                           env=env, check=True)
+            self.assertEqual(len(os.listdir(cache)), 1)
+
+    def test_unwritable_cache_falls_back_to_source(self):
+        with tempfile.NamedTemporaryFile() as blocker:
+            # A directory cannot be created under a regular file.
+            prelude = Prelude(path=os.path.join(blocker.name, "prelude.bin"))
+            self.assertTrue(prelude.compiled)
+            self.assertIn('SUB', prelude.standard_names)
+            self.assertEqual(str(prelude['TRUE']), "λx.λy.x")
+            self.assertFalse(prelude.define('MINE', prelude['TRUE']))
+            self.assertIn('MINE', prelude.user_names)
+
+    def test_reuses_a_written_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prelude.bin")
+            self.assertTrue(Prelude(path=path).compiled)
+            reopened = Prelude(path=path)
+            self.assertFalse(reopened.compiled)
+            self.assertEqual(str(reopened['TRUE']), "λx.λy.x")
+
+
+if __name__ == "__main__":
+    unittest.main()
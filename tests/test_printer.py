@@ -0,0 +1,114 @@
+import random
+import re
+import unittest
+
+from lambda_calculus.syntax import Variable, Abstraction, Application
+from lambda_calculus.parser import parse
+from lambda_calculus.printer import format_expr
+
+
+def read_lets(text):
+    # The parser has no let, so bindings are inlined by substitution here.
+    tokens = re.findall(r"λ|\.|\(|\)|=|[A-Za-z][A-Za-z0-9_]*", text)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def term():
+        if peek() == 'let':
+            take()
+            name = take()
+            assert take() == '='
+            definition = term()
+            assert take() == 'in'
+            return term().substitute(name, definition)
+        if peek() == 'λ':
+            take()
+            param = take()
+            assert take() == '.'
+            return Abstraction(param, term())
+        expr = None
+        while peek() not in (None, ')', 'in'):
+            if peek() == '(':
+                take()
+                argument = term()
+                assert take() == ')'
+            elif peek() == 'λ':
+                argument = term()
+            else:
+                argument = Variable(take())
+            expr = argument if expr is None else Application(expr, argument)
+        return expr
+
+    expr = term()
+    assert position == len(tokens), text
+    return expr
+
+
+def random_dag(rng, size):
+    # Later nodes reuse earlier ones, so subterms are shared by identity
+    # and often appear under different binders.
+    nodes = [Variable(name) for name in "xyz"]
+    for _ in range(size):
+        if rng.random() < 0.3:
+            nodes.append(Abstraction(rng.choice("xyz"), rng.choice(nodes)))
+        else:
+            nodes.append(Application(rng.choice(nodes), rng.choice(nodes)))
+    return nodes[-1]
+
+
+class SharedPrintingTest(unittest.TestCase):
+    def assert_same_term(self, expr):
+        text = format_expr(expr, share=True, min_shared_size=2)
+        self.assertTrue(read_lets(text).is_alpha_equivalent(expr), text)
+
+    def test_binding_under_a_binder_of_the_same_name(self):
+        shared = parse("y z x")
+        expr = Application(
+            Application(
+                Application(Variable('t1'), Application(
+                    shared, Abstraction('z', Application(Application(Variable('z'), shared),
+                                                         Variable('z'))))),
+                Application(Variable('z'), shared)),
+            Variable('t1'))
+        self.assert_same_term(expr)
+        self.assertNotIn("let", format_expr(expr, share=True, min_shared_size=2))
+
+    def test_doubling_term_prints_linearly(self):
+        expr = Variable('one')
+        for _ in range(12):
+            expr = Application(Application(Variable('p'), expr), expr)
+        text = format_expr(expr, share=True)
+        self.assertLess(len(text), 1000)
+        self.assert_same_term(expr)
+
+    def test_random_dags_keep_their_meaning(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            self.assert_same_term(random_dag(rng, rng.randint(3, 10)))
+
+
+class TruncationTest(unittest.TestCase):
+    def test_width(self):
+        text = str(parse("λf.λx.f (f (f (f x)))"))
+        for width in range(1, len(text) + 2):
+            cut = format_expr(parse(text), max_width=width)
+            if len(text) <= width:
+                self.assertEqual(cut, text)
+            else:
+                self.assertEqual(len(cut), width)
+                self.assertTrue(text.startswith(cut[:-1]) and cut.endswith("…"))
+
+    def test_plain_output_matches_str(self):
+        expr = parse("(λx.x x) (λy.y (y z)) (w (λv.v))")
+        self.assertEqual(format_expr(expr), str(expr))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_repl(*args):
+    return subprocess.run([sys.executable, "-m", "lambda_calculus.repl", *args],
+                          cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+
+class ScriptTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.script = os.path.join(directory.name, "script.lc")
+        with open(self.script, "w", encoding="utf-8") as f:
+            f.write("PLUS ONE TWO\n")
+        self.missing = os.path.join(directory.name, "missing.lc")
+
+    def test_unreadable_script_is_reported_and_the_rest_run(self):
+        completed = run_repl(self.missing, self.script)
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn(f"cannot read {self.missing}", completed.stderr)
+        self.assertIn("PLUS ONE TWO", completed.stdout)
+
+    def test_unreadable_script_as_json(self):
+        completed = run_repl("--json", self.missing, self.script)
+        self.assertEqual(completed.returncode, 1)
+        entries = [json.loads(line) for line in completed.stdout.splitlines()]
+        self.assertEqual(entries[0]['script'], self.missing)
+        self.assertIn('error', entries[0])
+        self.assertEqual(entries[1]['input'], "PLUS ONE TWO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import unittest
+
+from lambda_calculus.server import EvaluationServer, encode_frame, read_frame
+
+
+async def exchange(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+class HttpTest(unittest.TestCase):
+    def post(self, headers, body=b""):
+        async def run():
+            server = await EvaluationServer(port=0, workers=1).start()
+            try:
+                return await exchange(server.port, b"POST /api/evaluate HTTP/1.1\r\n"
+                                      + headers + b"\r\n" + body)
+            finally:
+                await server.close()
+        return asyncio.run(run())
+
+    def test_missing_content_length(self):
+        self.assertTrue(self.post(b"").startswith(b"HTTP/1.1 411 "))
+
+    def test_bad_content_length(self):
+        for value in (b"ten", b"-1", b"1e3", b""):
+            response = self.post(b"Content-Length: " + value + b"\r\n")
+            self.assertTrue(response.startswith(b"HTTP/1.1 400 "), value)
+
+    def test_content_length_too_large(self):
+        response = self.post(b"Content-Length: 99999999999\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 413 "))
+
+    def test_evaluate(self):
+        # Reading to the end also checks that the connection is closed.
+        body = json.dumps({'expression': "PLUS ONE TWO"}).encode()
+        response = self.post(b"Content-Length: %d\r\n" % len(body), body)
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 "))
+        self.assertEqual(json.loads(response.split(b"\r\n\r\n", 1)[1])['numeral'], 3)
+
+
+class WebSocketTest(unittest.TestCase):
+    def exchange(self, messages):
+        async def run():
+            server = await EvaluationServer(port=0, workers=1).start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                writer.write(b"GET /ws HTTP/1.1\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZQ==\r\n\r\n")
+                await reader.readuntil(b"\r\n\r\n")
+                replies = []
+                for message in messages:
+                    writer.write(encode_frame(0x1, json.dumps(message).encode(), b"abcd"))
+                    _, _, payload = await read_frame(reader)
+                    replies.append(json.loads(payload))
+                writer.close()
+                return replies
+            finally:
+                await server.close()
+        return asyncio.run(run())
+
+    def test_define_with_wrong_types(self):
+        # Each of these used to end the connection instead of being answered.
+        replies = self.exchange([
+            {'type': 'define', 'id': 1, 'name': 1, 'expression': None},
+            {'type': 'define', 'id': 2, 'name': "X", 'expression': ["ONE"]},
+            [1],
+            {'type': 'define', 'id': 3, 'name': "X", 'expression': "SUCC ONE"},
+        ])
+        self.assertEqual([reply['type'] for reply in replies],
+                         ['error', 'error', 'error', 'defined'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -40,6 +40,55 @@ const varExprInput = document.getElementById('var-expr-input');
 const defineVarBtn = document.getElementById('define-var-btn');
 const themeToggleBtn = document.getElementById('theme-toggle');
 
+// When the page is served by `python -m lambda_calculus.server`, expressions
+// are evaluated there; the JavaScript evaluator is the offline fallback.
+let server = null;
+let serverVariables = null;
+let nextRequestId = 0;
+const pendingRequests = {};
+
+function connectServer() {
+    if (!window.WebSocket || !location.protocol.startsWith('http')) return;
+    
+    const scheme = location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${scheme}//${location.host}/ws`);
+    
+    socket.addEventListener('open', () => {
+        server = socket;
+        sendRequest({ type: 'variables' }, reply => {
+            serverVariables = reply.variables;
+            updateVariableList();
+        });
+    });
+    socket.addEventListener('message', event => {
+        const reply = JSON.parse(event.data);
+        const handler = pendingRequests[reply.id];
+        if (!handler) return;
+        if (reply.type !== 'progress') {
+            delete pendingRequests[reply.id];
+        }
+        handler(reply);
+    });
+    socket.addEventListener('close', () => {
+        if (server === socket) {
+            server = null;
+            serverVariables = null;
+            updateVariableList();
+        }
+        Object.keys(pendingRequests).forEach(id => {
+            pendingRequests[id]({ type: 'error', id: Number(id), message: 'Lost connection to the server' });
+            delete pendingRequests[id];
+        });
+    });
+}
+
+function sendRequest(message, handler) {
+    const id = ++nextRequestId;
+    pendingRequests[id] = handler;
+    server.send(JSON.stringify({ ...message, id }));
+    return id;
+}
+
 function updateInputDisplay() {
     const preview = document.createElement('div');
     preview.className = 'input-preview';
@@ -109,6 +158,8 @@ function init() {
     
     updateVariableList();
     
+    connectServer();
+    
     expressionInput.focus();
 }
 
@@ -155,10 +206,120 @@ function parseExpression(exprStr) {
     return resolveVariables(expr);
 }
 
+function evaluateRemotely(exprStr, strategy) {
+    const entryDiv = document.createElement('div');
+    entryDiv.className = 'evaluation-entry';
+    
+    const inputDiv = document.createElement('div');
+    inputDiv.className = 'evaluation-input';
+    inputDiv.textContent = exprStr.replace(/\\/g, 'λ');
+    entryDiv.appendChild(inputDiv);
+    
+    const outputDiv = document.createElement('div');
+    outputDiv.className = 'evaluation-output';
+    outputDiv.textContent = 'Evaluating...';
+    
+    const cancelButton = document.createElement('button');
+    cancelButton.textContent = 'Cancel';
+    cancelButton.style.marginLeft = '1rem';
+    outputDiv.appendChild(cancelButton);
+    entryDiv.appendChild(outputDiv);
+    evaluationHistory.prepend(entryDiv);
+    
+    const id = sendRequest({
+        type: 'evaluate',
+        expression: exprStr,
+        strategy: strategy === 'beta' ? 'normal' : strategy,
+    }, reply => {
+        if (reply.type === 'progress') {
+            outputDiv.firstChild.textContent = `Evaluating... ${reply.steps} steps, term size ${reply.size}`;
+            return;
+        }
+        outputDiv.textContent = '';
+        showRemoteResult(outputDiv, reply, strategy);
+    });
+    
+    cancelButton.addEventListener('click', () => {
+        if (server) {
+            server.send(JSON.stringify({ type: 'cancel', id }));
+        }
+        cancelButton.disabled = true;
+    });
+    
+    expressionInput.value = '';
+    expressionInput.focus();
+}
+
+function showRemoteResult(outputDiv, reply, strategy) {
+    if (reply.type === 'error') {
+        outputDiv.textContent = `Error: ${reply.message}`;
+        outputDiv.style.color = '#e74c3c';
+        return;
+    }
+    
+    if (reply.result === undefined) {
+        outputDiv.textContent = 'Cancelled.';
+        return;
+    }
+    
+    serverVariables['it'] = reply.result;
+    updateVariableList();
+    
+    if (strategy === 'step') {
+        outputDiv.textContent = reply.converged
+            ? 'Expression is already in normal form.'
+            : `Result: ${reply.result}`;
+        return;
+    }
+    
+    outputDiv.textContent = `Result: ${reply.result}`;
+    
+    const stepsDiv = document.createElement('div');
+    stepsDiv.className = 'evaluation-steps';
+    stepsDiv.textContent = reply.steps === 0
+        ? 'No reduction steps needed (already in normal form).'
+        : `Steps taken: ${reply.steps} (${(reply.elapsed * 1000).toFixed(1)} ms)`;
+    
+    const warnings = {
+        steps: 'Warning: May not be in normal form (reached maximum steps)',
+        deadline: 'Warning: Stopped at the time limit',
+        cancelled: 'Cancelled; showing the term reached so far',
+        cycle: `Stopped: the term repeats every ${reply.cycle} steps`,
+        growth: 'Stopped: the term keeps growing without reaching a normal form',
+        unsupported: 'Optimal reduction cannot handle this term; try another strategy',
+    };
+    if (reply.limit) {
+        const warningDiv = document.createElement('div');
+        warningDiv.textContent = warnings[reply.limit] || `Stopped: ${reply.limit} limit reached`;
+        warningDiv.style.color = '#e74c3c';
+        stepsDiv.appendChild(warningDiv);
+    }
+    outputDiv.appendChild(stepsDiv);
+    
+    if (reply.numeral !== null && reply.numeral !== undefined) {
+        const numeralDiv = document.createElement('div');
+        numeralDiv.textContent = `Church numeral value: ${reply.numeral}`;
+        numeralDiv.style.marginTop = '0.5rem';
+        outputDiv.appendChild(numeralDiv);
+    }
+    
+    if (reply.boolean !== null && reply.boolean !== undefined) {
+        const boolDiv = document.createElement('div');
+        boolDiv.textContent = `Boolean value: ${reply.boolean}`;
+        boolDiv.style.marginTop = '0.5rem';
+        outputDiv.appendChild(boolDiv);
+    }
+}
+
 function evaluateExpression(strategy = 'beta') {
     const exprStr = expressionInput.value.trim();
     if (!exprStr) return;
     
+    if (server) {
+        evaluateRemotely(exprStr, strategy);
+        return;
+    }
+    
     try {
         const expr = parseExpression(exprStr);
         let result, steps, normalForm, reductionSteps;
@@ -292,6 +453,26 @@ function defineVariable() {
         return;
     }
     
+    if (server) {
+        sendRequest({ type: 'define', name, expression: exprStr }, reply => {
+            const entryDiv = document.createElement('div');
+            entryDiv.className = 'evaluation-entry';
+            if (reply.type === 'defined') {
+                entryDiv.textContent = `Defined ${reply.name} = ${reply.expression}`;
+                entryDiv.style.color = '#2ecc71';
+                serverVariables[reply.name] = reply.expression;
+                updateVariableList();
+            } else {
+                entryDiv.textContent = `Error: ${reply.message}`;
+                entryDiv.style.color = '#e74c3c';
+            }
+            evaluationHistory.prepend(entryDiv);
+        });
+        varNameInput.value = '';
+        varExprInput.value = '';
+        return;
+    }
+    
     try {
         const expr = parseExpression(exprStr);
         variables[name] = expr;
@@ -318,7 +499,8 @@ function defineVariable() {
 function updateVariableList() {
     variableEntries.innerHTML = '';
     
-    Object.entries(variables).sort((a, b) => a[0].localeCompare(b[0])).forEach(([name, expr]) => {
+    const entries = serverVariables ? Object.entries(serverVariables) : Object.entries(variables);
+    entries.sort((a, b) => a[0].localeCompare(b[0])).forEach(([name, expr]) => {
         const varDiv = document.createElement('div');
         varDiv.className = 'variable-entry';
         